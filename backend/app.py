@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
@@ -9,14 +9,40 @@ from datetime import datetime, timezone, timedelta
 from flask_mail import Mail, Message
 from openai import OpenAI
 import json
-import sqlite3
+import hashlib
+import re
 from pathlib import Path
 import time
 from werkzeug.utils import secure_filename
-from tasks import start_meeting_recording, process_completed_recording
+from tasks import process_completed_recording
 from queue_manager import QueueManager
-from recording_tasks import cleanup_old_recordings
-from recording_manager import RecordingManager
+from recording_tasks import start_meeting_recording, stop_meeting_recording, cleanup_old_recordings, recording_manager
+from recording_scheduler import RecordingStartScheduler
+from room_presence import RoomPresence
+from rate_limiter import RateLimiter
+from meeting_ai import (
+    meeting_completion_args, meeting_cache_key, try_parse_meeting, default_meeting,
+    meeting_events, MeetingStreamParser
+)
+from sse import format_sse, SSE_HEADERS
+from llm_cache import LLMCache
+from concurrency_limiter import ConcurrencyLimiter
+from singleflight import SingleFlight
+from summarizer import MeetingSummarizer
+from transcript_store import TranscriptStore, SEGMENT_KINDS
+from search_index import SearchIndex, SEARCH_TYPES
+from pagination import encode_cursor, decode_cursor, page_size
+from http_cache import make_etag, parse_timestamp, not_modified, with_validators
+from status_events import status_events, recording_key, meeting_key
+from bulk_export import export_ndjson, parse_types, parse_date
+from meeting_search import search_meetings, index_attendees
+from usage_stats import read_stats
+from blob_codec import encode_text, decode_text
+from db import connection
+from migrations import run_migrations, MEETINGS_MIGRATIONS, RECORDINGS_MIGRATIONS
+from circuit_breaker import CircuitOpenError, daily_breaker, download_breaker, openai_breaker
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from concurrent.futures import ThreadPoolExecutor
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -33,31 +59,9 @@ load_dotenv()
 
 # Initialize database
 def init_db():
-    conn = sqlite3.connect('meetings.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS meetings (
-            meeting_id INTEGER PRIMARY KEY,
-            meeting_name TEXT NOT NULL,
-            description TEXT,
-            start_time INTEGER,
-            end_time INTEGER,
-            duration INTEGER,
-            agenda TEXT,
-            attendees TEXT,
-            room_name TEXT,
-            room_url TEXT,
-            created_at INTEGER,
-            transcription_status TEXT DEFAULT 'pending',
-            transcription_text TEXT,
-            transcription_error TEXT,
-            recording_file_path TEXT
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    """Bring meetings.db and recordings.db up to the current schema version"""
+    run_migrations('meetings.db', MEETINGS_MIGRATIONS)
+    run_migrations('database/recordings.db', RECORDINGS_MIGRATIONS)
 
 # Initialize the database when the app starts
 init_db()
@@ -80,15 +84,82 @@ if not os.getenv('OPENAI_API_KEY'):
 
 # Configuration
 DAILY_API_KEY = os.getenv('DAILY_API_KEY')
-DAILY_API_URL = 'https://api.daily.co/v1'  # Change back to domain name
+DAILY_API_URL = os.getenv('DAILY_API_URL', 'https://api.daily.co/v1')
 CORS_ORIGIN = os.getenv('CORS_ORIGIN', 'http://localhost:3000')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Daily.co calls from single and batch endpoints share one rate limit
+DAILY_RATE_LIMIT = float(os.getenv('DAILY_RATE_LIMIT', 5))  # requests per second
+# A burst below one token could never be reached, so rates under 1/s still allow one call
+daily_rate_limiter = RateLimiter(rate=DAILY_RATE_LIMIT, burst=max(1, int(DAILY_RATE_LIMIT)))
+
+# Batch room provisioning limits
+MAX_BATCH_ROOMS = int(os.getenv('MAX_BATCH_ROOMS', 50))
+BATCH_ROOM_WORKERS = int(os.getenv('BATCH_ROOM_WORKERS', 5))
+
+# Batch meeting structuring limits; OPENAI_MAX_CONCURRENCY still caps the fan-out
+MAX_BATCH_DESCRIPTIONS = int(os.getenv('MAX_BATCH_DESCRIPTIONS', 20))
+BATCH_DESCRIPTION_WORKERS = int(os.getenv('BATCH_DESCRIPTION_WORKERS', 5))
+
+# Transcript summarisation: parallel chunk summaries and how long to keep them
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', 4))
+SUMMARY_CACHE_TTL = float(os.getenv('SUMMARY_CACHE_TTL', 30 * 24 * 3600))  # seconds
+
+# Live transcript and chat segments accepted per append request
+MAX_SEGMENT_BATCH = int(os.getenv('MAX_SEGMENT_BATCH', 200))
+MAX_SEGMENT_PAGE = int(os.getenv('MAX_SEGMENT_PAGE', 500))
+MAX_SEARCH_RESULTS = int(os.getenv('MAX_SEARCH_RESULTS', 100))
+# Segments of each kind a session manifest may declare
+MAX_SESSION_SEGMENTS = int(os.getenv('MAX_SESSION_SEGMENTS', 100000))
+
+# Idle status event streams send a comment this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', 15))
+# Longest a status event stream stays open before the client reconnects
+SSE_MAX_STREAM_SECONDS = float(os.getenv('SSE_MAX_STREAM_SECONDS', 3600))
+
+# Start cloud recording when the first participant joins instead of at room creation
+LAZY_RECORDING_START = os.getenv('LAZY_RECORDING_START', 'True').lower() == 'true'
+
+# Cap on recording starts in flight at Daily.co, each spread by up to the jitter
+RECORDING_START_CONCURRENCY = int(os.getenv('RECORDING_START_CONCURRENCY', 4))
+RECORDING_START_JITTER = float(os.getenv('RECORDING_START_JITTER', 2))  # seconds
+
+# Upstream timeouts so a degraded dependency cannot hold a worker thread forever
+DAILY_TIMEOUT = float(os.getenv('DAILY_TIMEOUT', 10))  # seconds
+DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', 60))  # seconds without data before a download is abandoned
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 60))  # seconds
+
+# Process-wide cap on concurrent OpenAI calls, so bursts queue instead of hitting rate limits
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 8))
+
 # Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, max_retries=1)
 
 print("Initialized OpenAI client...")
 
+# Structured meetings are cached so repeated descriptions skip the model call
+meeting_cache = LLMCache(
+    db_path=os.getenv('LLM_CACHE_DB', 'llm_cache.db'),
+    ttl_seconds=float(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600)),
+    max_memory_entries=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 512)),
+    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 10000))
+)
+
+openai_limiter = ConcurrencyLimiter('openai', OPENAI_MAX_CONCURRENCY)
+openai_flight = SingleFlight('openai')
+
+def completion_key(kwargs):
+    """Key identifying a chat completion by its exact arguments"""
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _create_completion(**kwargs):
+    with openai_limiter:
+        return openai_breaker.call(client.chat.completions.create, **kwargs)
+
+def create_completion(**kwargs):
+    """Chat completion under the OpenAI concurrency cap, shared by identical in-flight requests"""
+    return openai_flight.do(completion_key(kwargs), _create_completion, **kwargs)
+
 # Email configuration
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
 app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
@@ -102,37 +173,54 @@ mail = Mail(app)
 # Initialize queue manager
 queue_manager = QueueManager()
 
+# Track who is in each room so recording follows actual occupancy
+room_presence = RoomPresence()
+
+def start_recording(meeting_id, room_url, queue_wait=None):
+    """Start a room's recording, releasing its guard on failure so the next join retries"""
+    # Runs once a scheduler slot is free; the room may have emptied meanwhile
+    if not room_presence.recording_wanted(meeting_id):
+        print(f"Room {meeting_id} emptied before its recording started, skipping")
+        return None
+
+    try:
+        unique_id = start_meeting_recording(meeting_id, room_url, queue_wait=queue_wait)
+    except Exception:
+        room_presence.recording_failed(meeting_id)
+        raise
+
+    # A stop that arrived while Daily.co was starting found nothing to stop
+    if not room_presence.recording_wanted(meeting_id):
+        print(f"Room {meeting_id} emptied while its recording started, stopping")
+        stop_meeting_recording(meeting_id)
+    return unique_id
+
+# Recording starts run on their own bounded pool so a burst of meetings
+# neither floods Daily.co nor blocks the queue behind retries
+recording_scheduler = RecordingStartScheduler(
+    start_recording,
+    max_concurrent=RECORDING_START_CONCURRENCY,
+    max_jitter=RECORDING_START_JITTER
+)
+
 # Register task handlers
-queue_manager.register_handler('start_recording', start_meeting_recording)
+queue_manager.register_handler('start_recording', recording_scheduler.submit)
+queue_manager.register_handler('stop_recording', stop_meeting_recording)
 queue_manager.register_handler('process_recording', process_completed_recording)
 queue_manager.register_handler('cleanup_recordings', cleanup_old_recordings)
 
 # Start queue manager
 queue_manager.start()
 
-# Initialize recording manager
-recording_manager = RecordingManager()
-
 # Helper function to generate random room name
 def generate_room_name(length=12):
     """Generate a random room name using letters and numbers"""
     characters = string.ascii_letters + string.digits
     return ''.join(random.choice(characters) for _ in range(length))
 
-def create_room(name, properties=None):
-    if properties is None:
-        properties = {}
-
-    # Extract meeting metadata (not to be sent to Daily.co API)
-    meeting_metadata = {
-        'meeting_name': properties.get('meeting_name', 'Untitled Meeting'),
-        'start_time': properties.get('start_time'),
-        'end_time': properties.get('end_time'),
-        'duration': properties.get('duration')
-    }
-
-    # Daily.co API supported properties only
-    room_data = {
+def room_request_body(name):
+    """Daily.co room creation payload (Daily.co API supported properties only)"""
+    return {
         'name': name,
         'properties': {
             'exp': int(time.time()) + 24 * 60 * 60,  # 24 hours from now
@@ -154,6 +242,18 @@ def create_room(name, properties=None):
         }
     }
 
+def create_room(name, properties=None):
+    if properties is None:
+        properties = {}
+
+    # Extract meeting metadata (not to be sent to Daily.co API)
+    meeting_metadata = {
+        'meeting_name': properties.get('meeting_name', 'Untitled Meeting'),
+        'start_time': properties.get('start_time'),
+        'end_time': properties.get('end_time'),
+        'duration': properties.get('duration')
+    }
+
     try:
         # Get current UTC timestamp
         current_time = int(datetime.now(timezone.utc).timestamp())
@@ -163,7 +263,7 @@ def create_room(name, properties=None):
         end_timestamp = current_time + (int(duration) * 3600)
 
         # API request data
-        data = room_data
+        data = room_request_body(name)
 
         print(f"Creating room with data: {data}")  # Debug log
 
@@ -174,14 +274,16 @@ def create_room(name, properties=None):
         for attempt in range(max_retries):
             try:
                 # Make API request to Daily.co
-                response = requests.post(
+                daily_rate_limiter.acquire()
+                response = daily_breaker.call(
+                    requests.post,
                     f"{DAILY_API_URL}/rooms",
                     headers={
                         "Authorization": f"Bearer {DAILY_API_KEY}",
                         "Content-Type": "application/json"
                     },
                     json=data,
-                    timeout=10,  # Add timeout
+                    timeout=DAILY_TIMEOUT,  # Add timeout
                     verify=True  # Ensure SSL verification
                 )
 
@@ -225,6 +327,8 @@ def create_room(name, properties=None):
                         "error": f"Error creating room after {max_retries} attempts: {str(e)}"
                     }
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error creating room: {str(e)}")  # Debug log
         return {
@@ -240,12 +344,14 @@ def join_room(room_name):
     """
     try:
         # Validate room existence with Daily.co API
-        response = requests.get(
+        response = daily_breaker.call(
+            requests.get,
             f"{DAILY_API_URL}/rooms/{room_name}",
             headers={
                 "Authorization": f"Bearer {DAILY_API_KEY}",
                 "Content-Type": "application/json"
-            }
+            },
+            timeout=DAILY_TIMEOUT
         )
 
         if response.status_code == 200:
@@ -269,12 +375,76 @@ def join_room(room_name):
                 "error": f"Failed to validate room: {response.text}"
             }
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         return {
             "success": False,
             "error": f"Error joining room: {str(e)}"
         }
 
+def create_meeting_token(room_name, participant_name, is_owner=False, expires_in_hours=24):
+    """
+    Create a meeting token for a room
+    :param room_name: Name of the room the token grants access to
+    :param participant_name: Display name of the participant
+    :param is_owner: Whether the token grants host privileges
+    :param expires_in_hours: Number of hours until the token expires
+    :return: Token details or error
+    """
+    try:
+        daily_rate_limiter.acquire()
+        response = daily_breaker.call(
+            requests.post,
+            f"{DAILY_API_URL}/meeting-tokens",
+            headers={
+                "Authorization": f"Bearer {DAILY_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "properties": {
+                    "room_name": room_name,
+                    "user_name": participant_name,
+                    "is_owner": is_owner,
+                    "exp": int(time.time()) + int(expires_in_hours) * 60 * 60
+                }
+            },
+            timeout=DAILY_TIMEOUT
+        )
+
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": {
+                    "token": response.json()["token"]
+                }
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to create meeting token: {response.text}"
+            }
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error creating meeting token: {str(e)}"
+        }
+
+INVITATION_SUBJECT = "Invitation to Join Video Meeting"
+
+def invitation_html(room_url, host_name):
+    """HTML body of a room invitation email"""
+    return f"""
+            <h2>Video Meeting Invitation</h2>
+            <p>{host_name} has invited you to join a video meeting.</p>
+            <p>Click the link below to join:</p>
+            <p><a href="{room_url}">{room_url}</a></p>
+            <p>This is a secure, peer-to-peer video chat.</p>
+            """
+
 def invite_to_room(room_url, invitee_email, host_name="A user"):
     """
     Send an email invitation to join a room
@@ -285,15 +455,9 @@ def invite_to_room(room_url, invitee_email, host_name="A user"):
     """
     try:
         msg = Message(
-            subject="Invitation to Join Video Meeting",
+            subject=INVITATION_SUBJECT,
             recipients=[invitee_email],
-            html=f"""
-            <h2>Video Meeting Invitation</h2>
-            <p>{host_name} has invited you to join a video meeting.</p>
-            <p>Click the link below to join:</p>
-            <p><a href="{room_url}">{room_url}</a></p>
-            <p>This is a secure, peer-to-peer video chat.</p>
-            """
+            html=invitation_html(room_url, host_name)
         )
         mail.send(msg)
         return {
@@ -306,6 +470,70 @@ def invite_to_room(room_url, invitee_email, host_name="A user"):
             "error": f"Failed to send invitation: {str(e)}"
         }
 
+def build_meeting_details(data):
+    """Extract the stored meeting fields from a room creation request"""
+    return {
+        'meeting_name': data.get('meeting_name'),
+        'description': data.get('description'),
+        'start_time': data.get('start_time'),
+        'end_time': data.get('end_time'),
+        'duration': data.get('duration'),
+        'agenda': data.get('agenda', []),
+        'attendees': data.get('attendees', [])
+    }
+
+def meeting_row(meeting_id, meeting_details, room_data):
+    """Build the meetings table row for a created room"""
+    return (
+        meeting_id,
+        meeting_details['meeting_name'],
+        meeting_details['description'],
+        meeting_details['start_time'],
+        meeting_details['end_time'],
+        meeting_details['duration'],
+        json.dumps(meeting_details['agenda']),
+        json.dumps(meeting_details['attendees']),
+        room_data['name'],
+        room_data['url'],
+        int(time.time())
+    )
+
+INSERT_MEETING_SQL = '''
+    INSERT INTO meetings (
+        meeting_id, meeting_name, description, start_time, 
+        end_time, duration, agenda, attendees, 
+        room_name, room_url, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def save_meetings(rows):
+    """
+    Insert meeting rows and their attendees in one transaction, queueing
+    recordings unless they start on join. Rows built with a meeting_id of
+    None get one allocated by SQLite. Returns the meeting IDs in row order.
+    """
+    with connection('meetings.db') as conn:
+        meeting_ids = [
+            conn.execute(INSERT_MEETING_SQL + ' RETURNING meeting_id', row).fetchone()[0]
+            for row in rows
+        ]
+        # Row layout matches meeting_row: attendees JSON at 7, created_at at 10
+        index_attendees(conn, [
+            (meeting_id, row[10], json.loads(row[7]))
+            for meeting_id, row in zip(meeting_ids, rows)
+        ])
+
+    # With lazy start the participant webhook queues the recording instead
+    if LAZY_RECORDING_START:
+        return meeting_ids
+
+    # Row layout matches meeting_row: room_name and room_url sit at 8 and 9
+    queue_manager.enqueue_many('start_recording', [
+        {'meeting_id': row[8], 'room_url': row[9]}
+        for row in rows
+    ])
+    return meeting_ids
+
 # Route to create a new room
 @app.route('/api/rooms', methods=['POST'])
 def create_room_endpoint():
@@ -317,57 +545,19 @@ def create_room_endpoint():
         base_name = data.get('name', 'meeting').lower().replace(' ', '-')
         unique_room_name = f"{base_name}-{timestamp}"
         
-        meeting_details = {
-            'meeting_name': data.get('meeting_name'),
-            'description': data.get('description'),
-            'start_time': data.get('start_time'),
-            'end_time': data.get('end_time'),
-            'duration': data.get('duration'),
-            'agenda': data.get('agenda', []),
-            'attendees': data.get('attendees', [])
-        }
+        meeting_details = build_meeting_details(data)
 
         # Create the room with Daily.co
         result = create_room(unique_room_name, meeting_details)
         
         if result['success']:
-            # Store meeting details in database
-            conn = sqlite3.connect('meetings.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO meetings (
-                    meeting_id, meeting_name, description, start_time, 
-                    end_time, duration, agenda, attendees, 
-                    room_name, room_url, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                meeting_details['meeting_name'],
-                meeting_details['description'],
-                meeting_details['start_time'],
-                meeting_details['end_time'],
-                meeting_details['duration'],
-                json.dumps(meeting_details['agenda']),
-                json.dumps(meeting_details['attendees']),
-                result['data']['name'],
-                result['data']['url'],
-                timestamp
-            ))
-            
-            conn.commit()
-            conn.close()
-
-            # Queue recording task
-            queue_manager.enqueue('start_recording', {
-                'meeting_id': result['data']['name'],
-                'room_url': result['data']['url']
-            })
+            # Store meeting details in database; SQLite allocates the ID
+            meeting_id, = save_meetings([meeting_row(None, meeting_details, result['data'])])
             
             return jsonify({
                 'success': True,
                 'url': result['data']['url'],
-                'meeting_id': timestamp
+                'meeting_id': meeting_id
             })
         else:
             return jsonify({
@@ -375,6 +565,8 @@ def create_room_endpoint():
                 'error': result['error']
             }), 400
             
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error in create_room_endpoint: {str(e)}")
         return jsonify({
@@ -382,6 +574,115 @@ def create_room_endpoint():
             'error': str(e)
         }), 500
 
+def provision_room(room_name, meeting_details, host_name=None):
+    """Create a Daily.co room and optionally mint a host token for it"""
+    try:
+        result = create_room(room_name, meeting_details)
+    except CircuitOpenError as e:
+        return {'success': False, 'error': str(e)}
+    if not result['success'] or not host_name:
+        return result
+
+    try:
+        token = create_meeting_token(result['data']['name'], host_name, is_owner=True)
+    except CircuitOpenError as e:
+        token = {'success': False, 'error': str(e)}
+    if token['success']:
+        result['data']['host_token'] = token['data']['token']
+    else:
+        # The room exists, so report the token failure without failing the item
+        result['data']['token_error'] = token['error']
+    return result
+
+# Route to create several rooms at once
+@app.route('/api/rooms/batch', methods=['POST'])
+def create_rooms_batch_endpoint():
+    """Endpoint to create many rooms concurrently under the shared Daily.co rate limit"""
+    try:
+        data = request.get_json() or {}
+        rooms = data.get('rooms')
+
+        if not isinstance(rooms, list) or not rooms:
+            return jsonify({'success': False, 'error': 'rooms must be a non-empty list'}), 400
+        if len(rooms) > MAX_BATCH_ROOMS:
+            return jsonify({
+                'success': False,
+                'error': f'A batch can contain at most {MAX_BATCH_ROOMS} rooms'
+            }), 400
+
+        # Meeting IDs are allocated by SQLite when the rows are saved
+        timestamp = int(time.time())
+        items = []
+        for index, room in enumerate(rooms):
+            if not isinstance(room, dict) or not isinstance(room.get('name', 'meeting'), str):
+                items.append({'index': index, 'error': 'Each room must be an object with a string name'})
+                continue
+            base_name = room.get('name', 'meeting').lower().replace(' ', '-')
+            items.append({
+                'index': index,
+                'room_name': f"{base_name}-{timestamp}-{index}",
+                'meeting_details': build_meeting_details(room),
+                'host_name': room.get('host_name', data.get('host_name')) if data.get('mint_host_tokens', True) else None
+            })
+
+        def provision_item(item):
+            # Reject rows the meetings table would refuse before touching Daily.co
+            if 'error' in item:
+                return {'success': False, 'error': item['error']}
+            if not item['meeting_details']['meeting_name']:
+                return {'success': False, 'error': 'Missing required field: meeting_name'}
+            return provision_room(item['room_name'], item['meeting_details'], item['host_name'])
+
+        # Create the rooms with Daily.co concurrently
+        with ThreadPoolExecutor(max_workers=min(BATCH_ROOM_WORKERS, len(items))) as executor:
+            outcomes = list(executor.map(provision_item, items))
+
+        created = [(item, outcome) for item, outcome in zip(items, outcomes) if outcome['success']]
+
+        if created:
+            # Store all meeting details in one transaction and queue recordings in bulk
+            meeting_ids = save_meetings([
+                meeting_row(None, item['meeting_details'], outcome['data'])
+                for item, outcome in created
+            ])
+            for (item, _), meeting_id in zip(created, meeting_ids):
+                item['meeting_id'] = meeting_id
+
+        results = []
+        for item, outcome in zip(items, outcomes):
+            if outcome['success']:
+                entry = {
+                    'index': item['index'],
+                    'success': True,
+                    'url': outcome['data']['url'],
+                    'room_name': outcome['data']['name'],
+                    'meeting_id': item['meeting_id']
+                }
+                for key in ('host_token', 'token_error'):
+                    if key in outcome['data']:
+                        entry[key] = outcome['data'][key]
+            else:
+                entry = {
+                    'index': item['index'],
+                    'success': False,
+                    'error': outcome['error']
+                }
+            results.append(entry)
+
+        return jsonify({
+            'success': len(created) == len(items),
+            'created': len(created),
+            'failed': len(items) - len(created),
+            'results': results
+        })
+
+    except Exception as e:
+        print(f"Error in create_rooms_batch_endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # Route to join an existing room
 @app.route('/api/rooms/<room_name>', methods=['GET'])
 def join_room_endpoint(room_name):
@@ -420,7 +721,9 @@ def create_meeting_endpoint():
         print(f"Creating meeting with details: {meeting_details}")
         
         # Create a Daily.co room
-        response = requests.post(
+        daily_rate_limiter.acquire()
+        response = daily_breaker.call(
+            requests.post,
             f"{DAILY_API_URL}/rooms",
             headers={
                 "Authorization": f"Bearer {DAILY_API_KEY}",
@@ -438,7 +741,8 @@ def create_meeting_endpoint():
                     'enable_recording': "cloud",
                     'enable_network_ui': True
                 }
-            }
+            },
+            timeout=DAILY_TIMEOUT
         )
         
         print(f"Daily.co API response: {response.status_code} - {response.text}")
@@ -455,6 +759,8 @@ def create_meeting_endpoint():
         print(f"Returning meeting data: {result}")
         return jsonify(result)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error creating meeting: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -463,6 +769,26 @@ def create_meeting_endpoint():
 def test():
     return jsonify({"message": "API is working"})
 
+def structure_meeting(description):
+    """Structured meeting for a description, from the cache or from OpenAI"""
+    cache_key = meeting_cache_key(description)
+    cached = meeting_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # OpenAI API call
+    response = create_completion(**meeting_completion_args(description))
+
+    # Get the response content and parse it into a validated meeting
+    result_str = response.choices[0].message.content.strip()
+    meeting = try_parse_meeting(result_str)
+    if meeting is None:
+        # Return a default meeting structure instead of an error, uncached
+        return default_meeting(description)
+
+    meeting_cache.set(cache_key, meeting)
+    return meeting
+
 @app.route('/api/process-description', methods=['POST'])
 def process_description():
     """Process meeting description with OpenAI"""
@@ -475,82 +801,164 @@ def process_description():
 
         print(f"Processing description: {description}")
 
-        # OpenAI API call
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a meeting assistant. Your task is to always generate a structured meeting from any input, no matter how brief. If the input lacks details, use reasonable defaults and expand on the topic creatively while staying relevant.
-
-For example, if given just "team meeting", you might create a general team sync meeting with standard agenda items.
-
-Always return a valid JSON object with these exact keys:
-{
-    "title": "string",
-    "description": "string (minimum 50 words, expand the topic creatively if needed)",
-    "duration": number (in minutes, default to 30 if not specified),
-    "agenda": ["string"] (at least 3 items, use standard meeting items if not specified),
-    "attendees": ["string"] (suggest relevant team members based on the context)
-}
-
-Never return an error message or invalid JSON. Always provide a valid meeting structure."""
-                },
-                {
-                    "role": "user",
-                    "content": description
-                }
-            ],
-            max_tokens=1500,
-            temperature=0.7
-        )
-
-        # Get the response content
-        result_str = response.choices[0].message.content.strip()
-        print(f"Raw OpenAI response: {result_str}")
-
-        # Parse the response
-        try:
-            result = json.loads(result_str)
-            print(f"Processed result: {result}")
-            
-            # Validate and ensure minimum requirements
-            validated_result = {
-                "title": result.get("title", "Team Meeting"),
-                "description": result.get("description", "A team meeting to discuss project updates and align on objectives."),
-                "duration": result.get("duration", 30),
-                "agenda": result.get("agenda", ["Project Updates", "Team Discussion", "Action Items"]),
-                "attendees": result.get("attendees", ["Team Lead", "Team Members"])
-            }
-            
-            return jsonify(validated_result)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing OpenAI response: {e}")
-            print(f"Failed to parse: {result_str}")
-            # Return a default meeting structure instead of an error
-            default_meeting = {
-                "title": "Team Meeting",
-                "description": "A team meeting to discuss " + description + ". We will review current progress, address any challenges, and align on next steps. This meeting will help ensure everyone is on the same page and has clear action items.",
-                "duration": 30,
-                "agenda": ["Project Updates", "Team Discussion", "Action Items"],
-                "attendees": ["Team Lead", "Team Members"]
-            }
-            return jsonify(default_meeting)
+        return jsonify(structure_meeting(description))
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error processing description: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/process-description/batch', methods=['POST'])
+def process_description_batch():
+    """Structure many meeting descriptions, serving cached ones without calling OpenAI"""
+    try:
+        data = request.get_json() or {}
+        descriptions = data.get('descriptions')
+
+        if not isinstance(descriptions, list) or not descriptions:
+            return jsonify({'success': False, 'error': 'descriptions must be a non-empty list'}), 400
+        if len(descriptions) > MAX_BATCH_DESCRIPTIONS:
+            return jsonify({
+                'success': False,
+                'error': f'A batch can contain at most {MAX_BATCH_DESCRIPTIONS} descriptions'
+            }), 400
+
+        print(f"Processing {len(descriptions)} descriptions in a batch")
+
+        results = [None] * len(descriptions)
+        pending = {}  # cache key -> (description, indexes)
+        for index, description in enumerate(descriptions):
+            if not isinstance(description, str) or not description.strip():
+                results[index] = {'index': index, 'success': False, 'error': 'No description provided'}
+                continue
+
+            cache_key = meeting_cache_key(description)
+            cached = meeting_cache.get(cache_key)
+            if cached is not None:
+                results[index] = {'index': index, 'success': True, 'cached': True, 'meeting': cached}
+            else:
+                # Descriptions that normalise the same are only sent once
+                pending.setdefault(cache_key, (description, []))[1].append(index)
+
+        def structure_item(description):
+            try:
+                return {'success': True, 'meeting': structure_meeting(description)}
+            except Exception as e:
+                print(f"Error processing description in batch: {str(e)}")
+                return {'success': False, 'error': str(e)}
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(BATCH_DESCRIPTION_WORKERS, len(pending))) as executor:
+                outcomes = list(executor.map(structure_item, [description for description, _ in pending.values()]))
+
+            for (_, indexes), outcome in zip(pending.values(), outcomes):
+                for index in indexes:
+                    if outcome['success']:
+                        results[index] = {'index': index, 'success': True, 'cached': False, 'meeting': outcome['meeting']}
+                    else:
+                        results[index] = {'index': index, 'success': False, 'error': outcome['error']}
+
+        succeeded = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': succeeded == len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        })
+
+    except Exception as e:
+        print(f"Error in process_description_batch: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/process-description/stream', methods=['POST'])
+def process_description_stream():
+    """Stream a structured meeting as Server-Sent Events while OpenAI generates it"""
+    data = request.get_json()
+    description = data.get('description') if data else None
+
+    if not description:
+        return jsonify({'error': 'No description provided'}), 400
+
+    print(f"Streaming description: {description}")
+
+    cache_key = meeting_cache_key(description)
+    cached = meeting_cache.get(cache_key)
+
+    # Fail fast so an open circuit is still a 503. Streams are not coalesced,
+    # but hold a concurrency slot from when the response is first read until
+    # it finishes, so a response that is never read holds nothing.
+    if cached is None:
+        openai_breaker.check()
+
+    def generate():
+        if cached is not None:
+            for event, payload in meeting_events(cached):
+                yield format_sse(event, payload)
+            yield format_sse('done', cached)
+            return
+
+        parser = MeetingStreamParser()
+        openai_limiter.acquire()
+        try:
+            stream = openai_breaker.call(
+                client.chat.completions.create,
+                stream=True,
+                **meeting_completion_args(description)
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                yield format_sse('token', {'text': delta})
+                for event, payload in parser.feed(delta):
+                    yield format_sse(event, payload)
+        except Exception as e:
+            print(f"Error streaming description: {str(e)}")
+            yield format_sse('error', {'error': str(e)})
+            return
+        finally:
+            openai_limiter.release()
+
+        # The final object is validated exactly like the non-streaming endpoint
+        meeting = try_parse_meeting(parser.buffer.strip())
+        if meeting is None:
+            meeting = default_meeting(description)
+        else:
+            meeting_cache.set(cache_key, meeting)
+        yield format_sse('done', meeting)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy'})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics, including upstream circuit breaker state"""
+    return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+@app.errorhandler(CircuitOpenError)
+def handle_circuit_open(e):
+    """Fail fast with a 503 while an upstream circuit is open"""
+    response = jsonify({
+        'success': False,
+        'error': str(e),
+        'upstream': e.upstream
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
 @app.route('/api/test-openai', methods=['GET'])
 def test_openai():
     try:
         print("Testing OpenAI connection...")
-        completion = client.chat.completions.create(
+        completion = create_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "user", "content": "Say hello"}
@@ -559,6 +967,8 @@ def test_openai():
         response = completion.choices[0].message.content
         print(f"OpenAI response: {response}")
         return jsonify({"response": response})
+    except CircuitOpenError:
+        raise
     except Exception as e:
         error_msg = str(e)
         print(f"OpenAI Test Error: {error_msg}")
@@ -571,7 +981,7 @@ def test_meeting_processing():
         description = data.get('description', '')
         
         # Process with OpenAI
-        response = client.chat.completions.create(
+        response = create_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a meeting assistant. Extract key details from meeting descriptions."},
@@ -583,6 +993,8 @@ def test_meeting_processing():
             "success": True,
             "response": response.choices[0].message.content
         })
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error processing meeting: {str(e)}")
         return jsonify({
@@ -594,37 +1006,226 @@ def test_meeting_processing():
 db_dir = Path('database')
 db_dir.mkdir(exist_ok=True)
 
-# Initialize database
-def init_db():
-    conn = sqlite3.connect('database/recordings.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS recordings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meeting_id TEXT,
-            recording_url TEXT,
-            recording_file_path TEXT,
-            participants TEXT,
-            transcript TEXT,
-            chat_messages TEXT,
-            end_time TEXT,
-            created_at TEXT,
-            transcription_status TEXT DEFAULT 'pending',
-            transcription_text TEXT,
-            transcription_error TEXT
+transcript_store = TranscriptStore()
+search_index = SearchIndex()
+
+# Chunk summaries live in their own table of the LLM cache database, keyed
+# by content hash and prompt version, so their TTL and size cap stay separate
+summarizer = MeetingSummarizer(
+    create_completion,
+    LLMCache(
+        db_path=os.getenv('LLM_CACHE_DB', 'llm_cache.db'),
+        ttl_seconds=SUMMARY_CACHE_TTL,
+        table='summary_cache'
+    ),
+    workers=SUMMARY_WORKERS
+)
+
+def summarize_transcript(meeting_id):
+    """Queue handler summarising a meeting's latest stored transcription"""
+    with connection('database/recordings.db') as conn:
+        row = conn.execute('''
+            SELECT transcription_text FROM recordings
+            WHERE meeting_id = ? AND transcription_text IS NOT NULL
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        ''', (meeting_id,)).fetchone()
+
+    if not row:
+        raise Exception(f"No transcription found for meeting {meeting_id}")
+
+    summarizer.summarize_meeting(meeting_id, decode_text(row[0]))
+    status_events.publish('summary', {'meeting_id': meeting_id, 'status': 'completed'}, meeting_key(meeting_id))
+
+queue_manager.register_handler('summarize_transcript', summarize_transcript)
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def validate_segments(segments):
+    """Return an error message for a malformed segment batch, or None"""
+    if not isinstance(segments, list) or not segments:
+        return 'segments must be a non-empty list'
+    if len(segments) > MAX_SEGMENT_BATCH:
+        return f'A batch can contain at most {MAX_SEGMENT_BATCH} segments'
+    for segment in segments:
+        if not isinstance(segment, dict):
+            return 'Each segment must be an object'
+        if segment.get('kind') not in SEGMENT_KINDS:
+            return f"kind must be one of {', '.join(SEGMENT_KINDS)}"
+        if not isinstance(segment.get('seq'), int) or segment['seq'] < 0:
+            return 'seq must be a non-negative integer'
+        if not isinstance(segment.get('text'), str):
+            return 'text must be a string'
+        for key in ('start', 'end'):
+            if segment.get(key) is not None and not isinstance(segment[key], int):
+                return f'{key} must be an integer number of milliseconds'
+    return None
+
+@app.route('/api/transcripts/<session_id>/segments', methods=['POST'])
+def append_transcript_segments(session_id):
+    """Append live transcript and chat segments for a meeting in progress"""
+    try:
+        if not SESSION_ID_PATTERN.match(session_id):
+            return jsonify({'error': 'Invalid session id'}), 400
+
+        data = request.get_json() or {}
+        segments = data.get('segments')
+        error = validate_segments(segments)
+        if error:
+            return jsonify({'error': error}), 400
+
+        accepted = transcript_store.append_segments(session_id, segments)
+
+        return jsonify({
+            'success': True,
+            'accepted': accepted,
+            'duplicates': len(segments) - accepted
+        }), 200
+
+    except Exception as e:
+        print(f"Error appending transcript segments: {str(e)}")
+        return jsonify({'error': 'Failed to append transcript segments'}), 500
+
+def segments_response(session_id):
+    """Segments of a session by time range (start/end in ms) or by page (after a seq)"""
+    kind = request.args.get('kind', 'transcript')
+    if kind not in SEGMENT_KINDS:
+        return jsonify({'error': f"kind must be one of {', '.join(SEGMENT_KINDS)}"}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 100)), MAX_SEGMENT_PAGE))
+        start = request.args.get('start', type=int)
+        end = request.args.get('end', type=int)
+        after = int(request.args.get('after', -1))
+    except ValueError:
+        return jsonify({'error': 'limit and after must be integers'}), 400
+
+    if start is not None:
+        segments = transcript_store.get_segments_in_range(session_id, kind, start, end, limit)
+    else:
+        segments = transcript_store.get_segments_page(session_id, kind, after, limit)
+
+    return jsonify({
+        'session_id': session_id,
+        'kind': kind,
+        'segments': segments,
+        'next_after': segments[-1]['seq'] if start is None and len(segments) == limit else None
+    }), 200
+
+@app.route('/api/transcripts/<session_id>/segments', methods=['GET'])
+def get_transcript_segments(session_id):
+    """Read a session's segments by time range or page, e.g. while it is still live"""
+    try:
+        return segments_response(session_id)
+    except Exception as e:
+        print(f"Error reading transcript segments: {str(e)}")
+        return jsonify({'error': 'Failed to read transcript segments'}), 500
+
+@app.route('/api/meetings/<meeting_id>/segments', methods=['GET'])
+def get_meeting_segments(meeting_id):
+    """Read a finished meeting's transcript or chat segments by time range or page"""
+    try:
+        session = transcript_store.get_session(meeting_id)
+        if not session:
+            return jsonify({'error': 'Transcript not found'}), 404
+        return segments_response(session['session_id'])
+    except Exception as e:
+        print(f"Error reading meeting segments: {str(e)}")
+        return jsonify({'error': 'Failed to read meeting segments'}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search over transcripts, chat and meeting names and descriptions"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Missing query parameter q'}), 400
+
+        types = request.args.get('type', ','.join(SEARCH_TYPES)).split(',')
+        if any(t not in SEARCH_TYPES for t in types):
+            return jsonify({'error': f"type must be a comma-separated subset of {', '.join(SEARCH_TYPES)}"}), 400
+
+        limit = max(1, min(request.args.get('limit', 20, type=int), MAX_SEARCH_RESULTS))
+
+        return jsonify({
+            'query': query,
+            'results': search_index.search(query, types, limit)
+        }), 200
+
+    except Exception as e:
+        print(f"Error searching: {str(e)}")
+        return jsonify({'error': 'Search failed'}), 500
+
+@app.route('/api/meetings/search', methods=['GET'])
+def search_meetings_endpoint():
+    """Meetings filtered by attendee, date range and name, newest first, one page at a time"""
+    try:
+        since = parse_date(request.args.get('since'))
+        until = parse_date(request.args.get('until'))
+        page = search_meetings(
+            'meetings.db',
+            attendee=request.args.get('attendee'),
+            since=since,
+            until=until,
+            name=request.args.get('name'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor')
         )
-    ''')
-    conn.commit()
-    conn.close()
+        return jsonify(page), 200
 
-# Initialize database on startup
-init_db()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching meetings: {str(e)}")
+        return jsonify({'error': 'Meeting search failed'}), 500
+
+@app.route('/api/stats', methods=['GET'])
+def usage_stats():
+    """Meeting counts, recording statuses and minutes, and transcription backlog by day"""
+    try:
+        since = parse_date(request.args.get('since'))
+        until = parse_date(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        return jsonify(read_stats('meetings.db', 'database/recordings.db', since, until)), 200
+    except Exception as e:
+        print(f"Error reading stats: {str(e)}")
+        return jsonify({'error': 'Failed to read stats'}), 500
+
+@app.route('/api/export', methods=['GET'])
+def export():
+    """Stream meetings, recordings and transcript segments as NDJSON, optionally by date range"""
+    try:
+        types = parse_types(request.args.get('type'))
+        since = parse_date(request.args.get('since'))
+        until = parse_date(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        try:
+            yield from export_ndjson(types, since, until)
+        except Exception as e:
+            # Headers are already sent, so the failure goes in the stream
+            print(f"Error exporting: {str(e)}")
+            yield json.dumps({'type': 'error', 'error': 'Export failed'}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': 'attachment; filename="export.ndjson"',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/save-recording-metadata', methods=['POST'])
 def save_recording_metadata():
     try:
         data = request.json
         
+        # Clients that streamed their segments only send a manifest of counts
+        session_id = data.get('sessionId')
+        if session_id is not None:
+            return save_session_manifest(data)
+
         # Validate required fields
         required_fields = ['participants', 'transcript', 'chatMessages', 'recordingUrl', 'endTime']
         for field in required_fields:
@@ -635,103 +1236,215 @@ def save_recording_metadata():
         meeting_id = f"meeting_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
         # Connect to database
-        conn = sqlite3.connect('database/recordings.db')
+        with connection('database/recordings.db') as conn:
+            c = conn.cursor()
+
+            # Insert recording metadata
+            c.execute('''
+                INSERT INTO recordings (
+                    meeting_id,
+                    recording_url,
+                    participants,
+                    transcript,
+                    chat_messages,
+                    end_time,
+                    created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                meeting_id,
+                data['recordingUrl'],
+                json.dumps(data['participants']),
+                encode_text(json.dumps(data['transcript'])),
+                encode_text(json.dumps(data['chatMessages'])),
+                data['endTime'],
+                datetime.now().isoformat()
+            ))
+
+        return jsonify({
+            'message': 'Recording metadata saved successfully',
+            'meeting_id': meeting_id
+        }), 200
+
+    except Exception as e:
+        print(f"Error saving recording metadata: {str(e)}")
+        return jsonify({'error': 'Failed to save recording metadata'}), 500
+
+def save_session_manifest(data):
+    """Finish a meeting whose segments were appended live, checking none are missing"""
+    session_id = data['sessionId']
+    manifest = data.get('manifest') or {}
+
+    if not isinstance(session_id, str) or not SESSION_ID_PATTERN.match(session_id):
+        return jsonify({'error': 'Invalid session id'}), 400
+    for field in ['participants', 'recordingUrl', 'endTime']:
+        if field not in data:
+            return jsonify({'error': f'Missing required field: {field}'}), 400
+    if any(not isinstance(manifest.get(kind, 0), int) or manifest.get(kind, 0) < 0 for kind in SEGMENT_KINDS):
+        return jsonify({'error': 'manifest counts must be non-negative integers'}), 400
+    if any(manifest.get(kind, 0) > MAX_SESSION_SEGMENTS for kind in SEGMENT_KINDS):
+        return jsonify({'error': f'manifest counts must be at most {MAX_SESSION_SEGMENTS}'}), 400
+
+    # The client resends whatever is missing, one batch at a time, and then retries the save
+    missing = transcript_store.missing_segments(session_id, manifest, MAX_SEGMENT_BATCH)
+    if missing:
+        return jsonify({'error': 'Segments missing', 'missing': missing}), 409
+
+    with connection('database/recordings.db') as conn:
+        # A retried save gets the meeting the first one created. Taking the
+        # write lock first makes a concurrent save of the session wait for it.
+        conn.execute('BEGIN IMMEDIATE')
+        existing = transcript_store.session_meeting(session_id, conn)
+        if existing:
+            return jsonify({
+                'message': 'Recording metadata saved successfully',
+                'meeting_id': existing
+            }), 200
+
+        meeting_id = f"meeting_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         c = conn.cursor()
 
-        # Insert recording metadata
+        # transcript and chat_messages stay NULL; they are read back from the segments
         c.execute('''
             INSERT INTO recordings (
                 meeting_id,
                 recording_url,
                 participants,
-                transcript,
-                chat_messages,
                 end_time,
                 created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?)
         ''', (
             meeting_id,
             data['recordingUrl'],
             json.dumps(data['participants']),
-            json.dumps(data['transcript']),
-            json.dumps(data['chatMessages']),
             data['endTime'],
             datetime.now().isoformat()
         ))
+        transcript_store.finalize(session_id, meeting_id, manifest, conn)
 
-        conn.commit()
-        conn.close()
-
-        return jsonify({
-            'message': 'Recording metadata saved successfully',
-            'meeting_id': meeting_id
-        }), 200
-
-    except Exception as e:
-        print(f"Error saving recording metadata: {str(e)}")
-        return jsonify({'error': 'Failed to save recording metadata'}), 500
+    return jsonify({
+        'message': 'Recording metadata saved successfully',
+        'meeting_id': meeting_id
+    }), 200
 
 # Add endpoint to retrieve recording metadata
 @app.route('/api/recording/<meeting_id>', methods=['GET'])
 def get_recording_metadata(meeting_id):
     try:
-        conn = sqlite3.connect('database/recordings.db')
-        c = conn.cursor()
-        
-        c.execute('SELECT * FROM recordings WHERE meeting_id = ?', (meeting_id,))
-        record = c.fetchone()
+        # An unchanged poll is answered from the row version alone
+        version = latest_saved_meeting(meeting_id, ['id', 'version', 'updated_at'])
+        if not version:
+            return jsonify({'error': 'Recording not found'}), 404
+        cached = not_modified(make_etag(*version[:2]), parse_timestamp(version[2]))
+        if cached:
+            return cached
+
+        columns = ['id', 'meeting_id', 'recording_url', 'participants', 'transcript', 
+                  'chat_messages', 'end_time', 'created_at', 'updated_at', 'version']
+        record = latest_saved_meeting(meeting_id, columns)
         
         if not record:
             return jsonify({'error': 'Recording not found'}), 404
 
         # Convert record to dictionary
-        columns = ['id', 'meeting_id', 'recording_url', 'participants', 'transcript', 
-                  'chat_messages', 'end_time', 'created_at']
         record_dict = dict(zip(columns, record))
 
         # Parse JSON strings back to objects
         record_dict['participants'] = json.loads(record_dict['participants'])
-        record_dict['transcript'] = json.loads(record_dict['transcript'])
-        record_dict['chat_messages'] = json.loads(record_dict['chat_messages'])
 
-        return jsonify(record_dict), 200
+        session = transcript_store.get_session(meeting_id)
+        if session:
+            # Streamed meetings keep their lines as segments rather than JSON blobs
+            record_dict['transcript'] = transcript_store.get_segments(session['session_id'], 'transcript')
+            record_dict['chat_messages'] = transcript_store.get_segments(session['session_id'], 'chat')
+        else:
+            record_dict['transcript'] = json.loads(decode_text(record_dict['transcript']))
+            record_dict['chat_messages'] = json.loads(decode_text(record_dict['chat_messages']))
+
+        return with_validators(
+            jsonify(record_dict),
+            make_etag(record_dict['id'], record_dict['version']),
+            parse_timestamp(record_dict['updated_at'])
+        ), 200
 
     except Exception as e:
         print(f"Error retrieving recording metadata: {str(e)}")
         return jsonify({'error': 'Failed to retrieve recording metadata'}), 500
 
+def latest_saved_meeting(meeting_id, columns):
+    """The given columns of a meeting's latest saved recording row, or None"""
+    # Cloud recording rows share the table, so only saved meetings match
+    with connection('database/recordings.db') as conn:
+        return conn.execute(f'''
+            SELECT {', '.join(columns)} FROM recordings
+            WHERE meeting_id = ? AND participants IS NOT NULL
+            ORDER BY created_at DESC LIMIT 1
+        ''', (meeting_id,)).fetchone()
+
 # Add endpoint to retrieve all recordings
-@app.route('/api/recordings', methods=['GET'])
+# Meetings saved through /api/save-recording-metadata; /api/recordings lists cloud recordings
+@app.route('/api/saved-recordings', methods=['GET'])
 def get_all_recordings():
+    """List saved meetings newest first, one page at a time"""
     try:
-        conn = sqlite3.connect('database/recordings.db')
-        c = conn.cursor()
-        
-        c.execute('SELECT * FROM recordings ORDER BY created_at DESC')
-        records = c.fetchall()
-        
-        if not records:
-            return jsonify([]), 200
+        limit = page_size(request.args.get('limit', type=int))
+        after = decode_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        # Transcript, chat and participants are only loaded when asked for
+        heavy_fields = [f for f in request.args.get('include', '').split(',') if f]
+        if any(f not in ('participants', 'transcript', 'chat_messages') for f in heavy_fields):
+            return jsonify({'error': 'include must be a subset of participants, transcript, chat_messages'}), 400
+
+        # The page's row versions decide whether anything changed
+        etag = make_etag(heavy_fields, saved_meeting_page(['id', 'version'], after, limit))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        columns = ['id', 'meeting_id', 'recording_url', 'end_time', 'created_at'] + heavy_fields
+        records = saved_meeting_page(columns, after, limit)
 
-        # Convert records to list of dictionaries
-        columns = ['id', 'meeting_id', 'recording_url', 'participants', 'transcript', 
-                  'chat_messages', 'end_time', 'created_at']
         meetings = []
-        
-        for record in records:
+        for record in records[:limit]:
             record_dict = dict(zip(columns, record))
             # Parse JSON strings back to objects
-            record_dict['participants'] = json.loads(record_dict['participants'])
-            record_dict['transcript'] = json.loads(record_dict['transcript'])
-            record_dict['chat_messages'] = json.loads(record_dict['chat_messages'])
+            for field in heavy_fields:
+                if record_dict[field] is not None:
+                    record_dict[field] = json.loads(decode_text(record_dict[field]))
             meetings.append(record_dict)
 
-        return jsonify(meetings), 200
+        last = records[limit - 1] if len(records) > limit else None
+        return with_validators(jsonify({
+            'recordings': meetings,
+            'next_cursor': encode_cursor(last[4], last[0]) if last else None
+        }), etag), 200
 
     except Exception as e:
         print(f"Error retrieving recordings: {str(e)}")
         return jsonify({'error': 'Failed to retrieve recordings'}), 500
 
+def saved_meeting_page(columns, after, limit):
+    """One page of saved meeting rows newest first, plus one look-ahead row"""
+    with connection('database/recordings.db') as conn:
+        c = conn.cursor()
+
+        # Cloud recording rows share the table; saved meetings have participants
+        if after:
+            c.execute(f'''
+                SELECT {', '.join(columns)} FROM recordings
+                WHERE participants IS NOT NULL AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            ''', (*after, limit + 1))
+        else:
+            c.execute(f'''
+                SELECT {', '.join(columns)} FROM recordings
+                WHERE participants IS NOT NULL
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            ''', (limit + 1,))
+        return c.fetchall()
+
 # Add webhook endpoint for Daily.co recording notifications
 @app.route('/api/webhooks/daily-recording', methods=['POST'])
 def daily_recording_webhook():
@@ -751,18 +1464,15 @@ def daily_recording_webhook():
                 return jsonify({'error': 'Missing required fields'}), 400
                 
             # Store recording URL in database
-            conn = sqlite3.connect('database/recordings.db')
-            c = conn.cursor()
-            
-            # Update or insert recording record
-            c.execute('''
-                INSERT OR REPLACE INTO recordings 
-                (meeting_id, recording_url, transcription_status, created_at)
-                VALUES (?, ?, 'pending', datetime('now'))
-            ''', (room_name, recording_url))
-            
-            conn.commit()
-            conn.close()
+            with connection('database/recordings.db') as conn:
+                c = conn.cursor()
+
+                # Update or insert recording record
+                c.execute('''
+                    INSERT OR REPLACE INTO recordings 
+                    (meeting_id, recording_url, transcription_status, created_at)
+                    VALUES (?, ?, 'pending', datetime('now'))
+                ''', (room_name, recording_url))
             
             # Trigger transcription process
             process_recording_transcription(room_name, recording_url)
@@ -775,11 +1485,71 @@ def daily_recording_webhook():
         print(f"Error processing webhook: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def get_room_url(room_name):
+    """Look up the stored URL of a room created through this API"""
+    with connection('meetings.db') as conn:
+        row = conn.execute(
+            'SELECT room_url FROM meetings WHERE room_name = ? LIMIT 1',
+            (room_name,)
+        ).fetchone()
+        return row[0] if row else None
+
+# Webhook endpoint for Daily.co participant join/leave events
+@app.route('/api/webhooks/daily-participants', methods=['POST'])
+def daily_participants_webhook():
+    """Start recording on the first join and stop it when the room empties"""
+    try:
+        data = request.get_json() or {}
+        event_type = data.get('type')
+
+        if event_type not in ('participant.joined', 'participant.left'):
+            return jsonify({'message': 'Ignored webhook type'}), 200
+
+        payload = data.get('payload', {})
+        room_name = payload.get('room')
+        session_id = payload.get('session_id') or payload.get('user_id')
+
+        if not room_name or not session_id:
+            return jsonify({'error': 'Missing required fields'}), 400
+
+        action = None
+        if event_type == 'participant.joined':
+            if room_presence.participant_joined(room_name, session_id):
+                room_url = get_room_url(room_name)
+                if room_url:
+                    queue_manager.enqueue('start_recording', {
+                        'meeting_id': room_name,
+                        'room_url': room_url
+                    })
+                    action = 'recording_started'
+                else:
+                    # Not a room this API created; leave the guard clear
+                    room_presence.recording_failed(room_name)
+                    print(f"No stored room URL for {room_name}, not recording")
+        else:
+            if room_presence.participant_left(room_name, session_id):
+                queue_manager.enqueue('stop_recording', {'meeting_id': room_name})
+                action = 'recording_stopped'
+
+        return jsonify({
+            'message': 'Participant webhook processed successfully',
+            'participants': room_presence.participant_count(room_name),
+            'action': action
+        }), 200
+
+    except Exception as e:
+        print(f"Error processing participant webhook: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 def process_recording_transcription(meeting_id, recording_url):
     """Process recording transcription using OpenAI Whisper API"""
     try:
         # Download the recording file
-        response = requests.get(recording_url)
+        response = download_breaker.call(
+            requests.get,
+            recording_url,
+            timeout=(DAILY_TIMEOUT, DOWNLOAD_TIMEOUT)
+        )
         if response.status_code != 200:
             raise Exception(f"Failed to download recording: {response.text}")
             
@@ -793,47 +1563,169 @@ def process_recording_transcription(meeting_id, recording_url):
             f.write(response.content)
             
         # Transcribe using OpenAI Whisper API
-        with open(recording_filepath, 'rb') as f:
-            transcript = client.audio.transcriptions.create(
+        with open(recording_filepath, 'rb') as f, openai_limiter:
+            transcript = openai_breaker.call(
+                client.audio.transcriptions.create,
                 file=f,
-                model="whisper-1"
+                model="whisper-1",
+                response_format="verbose_json"
             )
             
-        # Store transcription and recording filepath in database
-        conn = sqlite3.connect('database/recordings.db')
-        c = conn.cursor()
+        # Keep Whisper's timed segments so players can seek without the full text
+        whisper_segments = getattr(transcript, 'segments', None) or []
+        if whisper_segments:
+            session_id = f"recording-{meeting_id}"
+            transcript_store.append_segments(session_id, [
+                {
+                    'kind': 'transcript',
+                    'seq': seq,
+                    'text': segment['text'].strip(),
+                    'start': int(segment['start'] * 1000),
+                    'end': int(segment['end'] * 1000)
+                }
+                for seq, segment in enumerate(whisper_segments)
+            ])
+            transcript_store.finalize(session_id, meeting_id, {'transcript': len(whisper_segments)})
         
-        c.execute('''
-            UPDATE recordings 
-            SET transcription_status = 'completed',
-                transcription_text = ?,
-                recording_file_path = ?
-            WHERE meeting_id = ?
-        ''', (transcript.text, recording_filepath, meeting_id))
+        # Store transcription and recording filepath in database. This comes after
+        # the segments so the row version only changes once both are readable
+        with connection('database/recordings.db') as conn:
+            c = conn.cursor()
+
+            c.execute('''
+                UPDATE recordings 
+                SET transcription_status = 'completed',
+                    transcription_text = ?,
+                    recording_file_path = ?
+                WHERE meeting_id = ?
+            ''', (encode_text(transcript.text), recording_filepath, meeting_id))
+        status_events.publish('transcription', {'meeting_id': meeting_id, 'status': 'completed'}, meeting_key(meeting_id))
         
-        conn.commit()
-        conn.close()
+        # Summarise in the background; long transcripts take several model calls
+        queue_manager.enqueue('summarize_transcript', {'meeting_id': meeting_id})
         
     except Exception as e:
         print(f"Error processing transcription: {str(e)}")
         # Update database with error status
-        conn = sqlite3.connect('database/recordings.db')
-        c = conn.cursor()
-        
-        c.execute('''
-            UPDATE recordings 
-            SET transcription_status = 'error',
-                transcription_error = ?
-            WHERE meeting_id = ?
-        ''', (str(e), meeting_id))
-        
-        conn.commit()
-        conn.close()
+        with connection('database/recordings.db') as conn:
+            c = conn.cursor()
+
+            c.execute('''
+                UPDATE recordings 
+                SET transcription_status = 'error',
+                    transcription_error = ?
+                WHERE meeting_id = ?
+            ''', (str(e), meeting_id))
+        status_events.publish('transcription', {'meeting_id': meeting_id, 'status': 'error'}, meeting_key(meeting_id))
         
         # Clean up recording file if it exists
         if 'recording_filepath' in locals() and os.path.exists(recording_filepath):
             os.remove(recording_filepath)
 
+@app.route('/api/meetings/<meeting_id>/summary', methods=['GET'])
+def get_meeting_summary(meeting_id):
+    """Get the stored summary, decisions and action items for a meeting"""
+    try:
+        summary = summarizer.get_summary(meeting_id)
+        if not summary:
+            return jsonify({'error': 'Summary not found'}), 404
+        return jsonify(summary), 200
+    except Exception as e:
+        print(f"Error retrieving summary: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/meetings/<meeting_id>/summary', methods=['POST'])
+def resummarize_meeting(meeting_id):
+    """Queue a new summary, e.g. after a prompt change; unchanged chunks come from the cache"""
+    try:
+        task_id = queue_manager.enqueue('summarize_transcript', {'meeting_id': meeting_id})
+        return jsonify({'success': True, 'task_id': task_id}), 202
+    except Exception as e:
+        print(f"Error queueing summary: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def status_stream(subscription, snapshot):
+    """SSE stream of a snapshot of the current state followed by live status events"""
+    def generate():
+        # A disconnected client is only noticed on a failed write, which some
+        # servers never report, so every stream ends after a while and the
+        # browser reconnects for a fresh snapshot
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        try:
+            yield format_sse('snapshot', snapshot)
+            while not subscription.closed and time.monotonic() < deadline:
+                item = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if item is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield format_sse(*item)
+        finally:
+            status_events.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+def recording_snapshot(unique_id):
+    """Current status of a recording for its event stream, or None if it does not exist"""
+    recording = recording_manager.get_recording_metadata(unique_id)
+    if not recording:
+        return None
+    return {
+        'unique_id': unique_id,
+        'meeting_id': recording['meeting_id'],
+        'status': recording['status']
+    }
+
+def meeting_snapshot(meeting_id):
+    """Current recording and transcription status of a meeting for its event stream"""
+    recording = recording_manager.get_latest_recording(meeting_id)
+    with connection('database/recordings.db') as conn:
+        # Transcriptions live on the rows written by the Daily.co webhook
+        row = conn.execute('''
+            SELECT transcription_status FROM recordings
+            WHERE meeting_id = ? AND unique_id IS NULL
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        ''', (meeting_id,)).fetchone()
+
+    # A meeting may not have a recording yet; the stream waits for it
+    return {
+        'meeting_id': meeting_id,
+        'recording': {
+            'unique_id': recording['unique_id'],
+            'status': recording['status']
+        } if recording else None,
+        'transcription_status': row[0] if row else None
+    }
+
+@app.route('/api/recordings/<unique_id>/events', methods=['GET'])
+def recording_status_events(unique_id):
+    """Stream a recording's status transitions instead of polling it"""
+    # Subscribe before reading the snapshot so no transition falls in between
+    subscription = status_events.subscribe(recording_key(unique_id))
+    try:
+        snapshot = recording_snapshot(unique_id)
+    except Exception as e:
+        status_events.unsubscribe(subscription)
+        print(f"Error getting recording: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    if not snapshot:
+        status_events.unsubscribe(subscription)
+        return jsonify({'error': 'Recording not found'}), 404
+
+    return status_stream(subscription, snapshot)
+
+@app.route('/api/meetings/<meeting_id>/events', methods=['GET'])
+def meeting_status_events(meeting_id):
+    """Stream recording, transcription and summary progress for a meeting"""
+    subscription = status_events.subscribe(meeting_key(meeting_id))
+    try:
+        snapshot = meeting_snapshot(meeting_id)
+    except Exception as e:
+        status_events.unsubscribe(subscription)
+        print(f"Error reading meeting status: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return status_stream(subscription, snapshot)
+
 # Add endpoint to serve recording files
 @app.route('/api/recordings/<path:filename>')
 def serve_recording(filename):
@@ -869,16 +1761,14 @@ def upload_recording():
         # Save the recording file
         recording_file.save(filepath)
         
-        # Update the database with the recording file path
-        conn = sqlite3.connect('database/recordings.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE meetings 
-            SET recording_file_path = ? 
-            WHERE meeting_id = ?
-        ''', (filepath, meeting_id))
-        conn.commit()
-        conn.close()
+        # Update the meeting with the recording file path
+        with connection('meetings.db') as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE meetings 
+                SET recording_file_path = ? 
+                WHERE meeting_id = ?
+            ''', (filepath, meeting_id))
         
         return jsonify({
             'message': 'Recording uploaded successfully',
@@ -894,11 +1784,24 @@ def upload_recording():
 def get_recording(unique_id):
     """Get recording metadata by unique ID"""
     try:
+        # An unchanged poll is answered from the row version alone
+        version = recording_manager.get_recording_version(unique_id)
+        if not version:
+            return jsonify({'error': 'Recording not found'}), 404
+        cached = not_modified(make_etag(unique_id, version[0]), parse_timestamp(version[1]))
+        if cached:
+            return cached
+
         recording = recording_manager.get_recording_metadata(unique_id)
         if not recording:
             return jsonify({'error': 'Recording not found'}), 404
             
-        return jsonify(recording)
+        # Validators come from the copy being sent, which the cache may hold back briefly
+        return with_validators(
+            jsonify(recording),
+            make_etag(unique_id, recording['version']),
+            parse_timestamp(recording['updated_at'])
+        )
         
     except Exception as e:
         print(f"Error getting recording: {str(e)}")
@@ -906,12 +1809,29 @@ def get_recording(unique_id):
 
 @app.route('/api/recordings', methods=['GET'])
 def list_recordings():
-    """List all recordings"""
+    """List recordings newest first, one page at a time"""
     try:
         status = request.args.get('status')
-        recordings = recording_manager.list_recordings(status)
-        return jsonify(recordings)
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        include_metadata = 'metadata' in request.args.get('include', '').split(',')
+
+        # The page's row versions decide whether anything changed
+        etag = make_etag(include_metadata, recording_manager.list_versions(status, limit, cursor))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        page = recording_manager.list_recordings(
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            include_metadata=include_metadata
+        )
+        return with_validators(jsonify(page), etag)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error listing recordings: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,566 @@
+"""
+Async serving mode for the I/O-bound API.
+
+The endpoints that spend their time waiting on Daily.co, OpenAI or SMTP are
+served by a Quart app with async upstream clients, so an in-flight call costs a
+coroutine instead of a worker thread. So are the long-lived streams: status
+events and the NDJSON export. Every other route falls through to the existing
+Flask app on hypercorn's thread pool, where a request holds a thread until its
+response is fully written, and a client that disconnects from a streamed
+response goes unnoticed. Keep streaming routes here. Run it with:
+
+    hypercorn asgi:application --bind 0.0.0.0:5000
+"""
+import asyncio
+import importlib.util
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from pathlib import Path
+
+import aiohttp
+import aiosmtplib
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from openai import AsyncOpenAI
+from quart import Quart, Response, request, jsonify
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+from bulk_export import export_ndjson, parse_date, parse_types
+from circuit_breaker import CircuitOpenError, daily_breaker, openai_breaker
+from meeting_ai import (
+    meeting_completion_args, meeting_cache_key, try_parse_meeting, default_meeting,
+    meeting_events, MeetingStreamParser
+)
+from sse import format_sse, SSE_HEADERS
+from status_events import status_events, recording_key, meeting_key
+
+
+def load_sync_app():
+    """Import backend/app.py, which the app/ package shadows for a plain import"""
+    spec = importlib.util.spec_from_file_location('utom_meet_app', Path(__file__).with_name('app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['utom_meet_app'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# The Flask app owns the database, queue manager and all remaining routes
+sync_app = load_sync_app()
+
+app = Quart(__name__)
+
+# Upper bound on concurrent upstream connections held by this process
+MAX_UPSTREAM_CONNECTIONS = int(os.getenv('MAX_UPSTREAM_CONNECTIONS', 2000))
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 30))  # seconds
+
+# Async upstream clients, created once the event loop is running
+http_session = None
+openai_client = None
+
+
+@app.before_serving
+async def open_clients():
+    global http_session, openai_client
+    # aiohttp rather than httpx: its connection pool holds up under thousands
+    # of concurrent requests where httpx's degrades sharply
+    http_session = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=sync_app.DAILY_TIMEOUT),
+        connector=aiohttp.TCPConnector(limit=MAX_UPSTREAM_CONNECTIONS)
+    )
+    openai_client = AsyncOpenAI(
+        api_key=sync_app.OPENAI_API_KEY,
+        timeout=sync_app.OPENAI_TIMEOUT,
+        max_retries=1
+    )
+
+
+@app.after_serving
+async def close_clients():
+    await http_session.close()
+    await openai_client.close()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    """Mirror the Flask CORS policy for routes served here"""
+    if request.headers.get('Origin') == sync_app.CORS_ORIGIN:
+        response.headers['Access-Control-Allow-Origin'] = sync_app.CORS_ORIGIN
+        response.headers['Vary'] = 'Origin'
+    return response
+
+
+@app.errorhandler(CircuitOpenError)
+async def handle_circuit_open(e):
+    """Fail fast with a 503 while an upstream circuit is open"""
+    response = jsonify({
+        'success': False,
+        'error': str(e),
+        'upstream': e.upstream
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+
+async def _create_completion(**kwargs):
+    async with sync_app.openai_limiter:
+        return await openai_breaker.call_async(openai_client.chat.completions.create, **kwargs)
+
+
+async def create_completion(**kwargs):
+    """Async counterpart of app.create_completion, sharing its cap and in-flight calls"""
+    return await sync_app.openai_flight.do_async(sync_app.completion_key(kwargs), _create_completion, **kwargs)
+
+
+class DailyResponse:
+    """Fully read Daily.co response exposing the attributes the sync code uses"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+async def daily_request(method, path, **kwargs):
+    """Call the Daily.co API and read the whole response body"""
+    async with http_session.request(
+        method,
+        f"{sync_app.DAILY_API_URL}{path}",
+        headers={
+            "Authorization": f"Bearer {sync_app.DAILY_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        **kwargs
+    ) as response:
+        return DailyResponse(response.status, await response.text())
+
+
+async def create_room(name, properties=None):
+    """Async counterpart of app.create_room with the same retry behaviour"""
+    if properties is None:
+        properties = {}
+
+    meeting_name = properties.get('meeting_name', 'Untitled Meeting')
+    current_time = int(datetime.now(timezone.utc).timestamp())
+    duration = properties.get('duration') or 24  # Default 24 hours
+    end_timestamp = current_time + (int(duration) * 3600)
+
+    max_retries = 3
+    retry_delay = 2  # seconds
+
+    for attempt in range(max_retries):
+        try:
+            await sync_app.daily_rate_limiter.acquire_async()
+            response = await daily_breaker.call_async(
+                daily_request,
+                'POST',
+                '/rooms',
+                json=sync_app.room_request_body(name)
+            )
+
+            if response.status_code == 200:
+                room_data = response.json()
+                return {
+                    "success": True,
+                    "data": {
+                        "name": room_data["name"],
+                        "url": room_data["url"],
+                        "meeting_name": meeting_name,
+                        "start_time": current_time,
+                        "end_time": end_timestamp,
+                    }
+                }
+            elif response.status_code == 429:  # Rate limit
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay)
+                    continue
+                return {
+                    "success": False,
+                    "error": "Rate limit exceeded. Please try again later."
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to create room: {response.text}"
+                }
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt < max_retries - 1:
+                print(f"Attempt {attempt + 1} failed: {str(e)}")
+                await asyncio.sleep(retry_delay)
+                continue
+            return {
+                "success": False,
+                "error": f"Error creating room after {max_retries} attempts: {str(e)}"
+            }
+
+
+async def join_room(room_name):
+    """Async counterpart of app.join_room"""
+    try:
+        response = await daily_breaker.call_async(daily_request, 'GET', f'/rooms/{room_name}')
+
+        if response.status_code == 200:
+            room_data = response.json()
+            return {
+                "success": True,
+                "data": {
+                    "name": room_data["name"],
+                    "url": room_data["url"],
+                    "exists": True
+                }
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": "Room not found"
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to validate room: {response.text}"
+            }
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error joining room: {str(e)}"
+        }
+
+
+async def invite_to_room(room_url, invitee_email, host_name="A user"):
+    """Async counterpart of app.invite_to_room using aiosmtplib"""
+    config = sync_app.app.config
+    try:
+        message = EmailMessage()
+        message['Subject'] = sync_app.INVITATION_SUBJECT
+        message['From'] = config['MAIL_DEFAULT_SENDER']
+        message['To'] = invitee_email
+        message.set_content(sync_app.invitation_html(room_url, host_name), subtype='html')
+
+        await aiosmtplib.send(
+            message,
+            hostname=config['MAIL_SERVER'],
+            port=config['MAIL_PORT'],
+            start_tls=config['MAIL_USE_TLS'],
+            username=config['MAIL_USERNAME'],
+            password=config['MAIL_PASSWORD'],
+            timeout=SMTP_TIMEOUT
+        )
+        return {
+            "success": True,
+            "message": f"Invitation sent to {invitee_email}"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to send invitation: {str(e)}"
+        }
+
+
+@app.route('/api/rooms', methods=['POST'])
+async def create_room_endpoint():
+    """Endpoint to create a new room with meeting details"""
+    try:
+        data = await request.get_json()
+        timestamp = int(time.time())
+        base_name = data.get('name', 'meeting').lower().replace(' ', '-')
+        unique_room_name = f"{base_name}-{timestamp}"
+
+        meeting_details = sync_app.build_meeting_details(data)
+
+        result = await create_room(unique_room_name, meeting_details)
+
+        if result['success']:
+            # SQLite and the queue are local, so run them off the event loop
+            meeting_id, = await asyncio.to_thread(
+                sync_app.save_meetings,
+                [sync_app.meeting_row(None, meeting_details, result['data'])]
+            )
+
+            return jsonify({
+                'success': True,
+                'url': result['data']['url'],
+                'meeting_id': meeting_id
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': result['error']
+            }), 400
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error in create_room_endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/rooms/<room_name>', methods=['GET'])
+async def join_room_endpoint(room_name):
+    """Endpoint to join an existing room"""
+    result = await join_room(room_name)
+
+    if result["success"]:
+        return jsonify(result["data"]), 200
+    else:
+        return jsonify({"error": result["error"]}), 404 if "not found" in result["error"].lower() else 500
+
+
+@app.route('/api/rooms/invite', methods=['POST'])
+async def invite_to_room_endpoint():
+    """Endpoint to send room invitation"""
+    data = await request.get_json()
+
+    if not data or 'email' not in data or 'room_url' not in data:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    result = await invite_to_room(
+        room_url=data['room_url'],
+        invitee_email=data['email'],
+        host_name=data.get('host_name', 'A user')
+    )
+
+    if result["success"]:
+        return jsonify({"message": result["message"]}), 200
+    else:
+        return jsonify({"error": result["error"]}), 500
+
+
+@app.route('/api/process-description', methods=['POST'])
+async def process_description():
+    """Process meeting description with OpenAI"""
+    try:
+        data = await request.get_json()
+        description = data.get('description')
+
+        if not description:
+            return jsonify({'error': 'No description provided'}), 400
+
+        print(f"Processing description: {description}")
+
+        cache_key = meeting_cache_key(description)
+        cached = await asyncio.to_thread(sync_app.meeting_cache.get, cache_key)
+        if cached is not None:
+            return jsonify(cached)
+
+        response = await create_completion(**meeting_completion_args(description))
+
+        result_str = response.choices[0].message.content.strip()
+        meeting = try_parse_meeting(result_str)
+        if meeting is None:
+            return jsonify(default_meeting(description))
+
+        await asyncio.to_thread(sync_app.meeting_cache.set, cache_key, meeting)
+        return jsonify(meeting)
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error processing description: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/process-description/stream', methods=['POST'])
+async def process_description_stream():
+    """Stream a structured meeting as Server-Sent Events while OpenAI generates it"""
+    data = await request.get_json()
+    description = data.get('description') if data else None
+
+    if not description:
+        return jsonify({'error': 'No description provided'}), 400
+
+    print(f"Streaming description: {description}")
+
+    cache_key = meeting_cache_key(description)
+    cached = await asyncio.to_thread(sync_app.meeting_cache.get, cache_key)
+
+    if cached is None:
+        openai_breaker.check()
+
+    async def generate():
+        if cached is not None:
+            for event, payload in meeting_events(cached):
+                yield format_sse(event, payload)
+            yield format_sse('done', cached)
+            return
+
+        parser = MeetingStreamParser()
+        # Taken once the response is read, so an unread response holds no slot
+        await sync_app.openai_limiter.acquire_async()
+        try:
+            stream = await openai_breaker.call_async(
+                openai_client.chat.completions.create,
+                stream=True,
+                **meeting_completion_args(description)
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                yield format_sse('token', {'text': delta})
+                for event, payload in parser.feed(delta):
+                    yield format_sse(event, payload)
+        except Exception as e:
+            print(f"Error streaming description: {str(e)}")
+            yield format_sse('error', {'error': str(e)})
+            return
+        finally:
+            sync_app.openai_limiter.release()
+
+        meeting = try_parse_meeting(parser.buffer.strip())
+        if meeting is None:
+            meeting = default_meeting(description)
+        else:
+            await asyncio.to_thread(sync_app.meeting_cache.set, cache_key, meeting)
+        yield format_sse('done', meeting)
+
+    return generate(), 200, {'Content-Type': 'text/event-stream', **SSE_HEADERS}
+
+
+def status_stream(subscription, snapshot):
+    """
+    Async counterpart of app.status_stream. An idle viewer costs a coroutine
+    awaiting its subscription, and a disconnect cancels it at once, which
+    ends the subscription.
+    """
+    async def generate():
+        try:
+            yield format_sse('snapshot', snapshot)
+            while not subscription.closed:
+                item = await subscription.get_async(sync_app.SSE_KEEPALIVE_SECONDS)
+                if item is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield format_sse(*item)
+        finally:
+            status_events.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+    response.timeout = sync_app.SSE_MAX_STREAM_SECONDS
+    return response
+
+
+@app.route('/api/recordings/<unique_id>/events', methods=['GET'])
+async def recording_status_events(unique_id):
+    """Stream a recording's status transitions instead of polling it"""
+    # Subscribe before reading the snapshot so no transition falls in between
+    subscription = status_events.subscribe_async(recording_key(unique_id))
+    try:
+        snapshot = await asyncio.to_thread(sync_app.recording_snapshot, unique_id)
+    except Exception as e:
+        status_events.unsubscribe(subscription)
+        print(f"Error getting recording: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    if not snapshot:
+        status_events.unsubscribe(subscription)
+        return jsonify({'error': 'Recording not found'}), 404
+
+    return status_stream(subscription, snapshot)
+
+
+@app.route('/api/meetings/<meeting_id>/events', methods=['GET'])
+async def meeting_status_events(meeting_id):
+    """Stream recording, transcription and summary progress for a meeting"""
+    subscription = status_events.subscribe_async(meeting_key(meeting_id))
+    try:
+        snapshot = await asyncio.to_thread(sync_app.meeting_snapshot, meeting_id)
+    except Exception as e:
+        status_events.unsubscribe(subscription)
+        print(f"Error reading meeting status: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return status_stream(subscription, snapshot)
+
+
+# NDJSON lines read per trip to a worker thread
+EXPORT_LINES_PER_READ = 500
+
+
+def read_lines(lines, count):
+    """Up to count lines from an iterator, with any error raised after the lines read before it"""
+    chunk = []
+    try:
+        chunk.extend(itertools.islice(lines, count))
+    except Exception as e:
+        return chunk, e
+    return chunk, None
+
+
+@app.route('/api/export', methods=['GET'])
+async def export():
+    """Stream meetings, recordings and transcript segments as NDJSON, optionally by date range"""
+    try:
+        types = parse_types(request.args.get('type'))
+        since = parse_date(request.args.get('since'))
+        until = parse_date(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async def generate():
+        # Each read is a few short keyset queries on a worker thread, so a
+        # slow client waiting on the rest holds no thread, and a disconnect
+        # stops the export between reads
+        lines = export_ndjson(types, since, until)
+        while True:
+            chunk, error = await asyncio.to_thread(read_lines, lines, EXPORT_LINES_PER_READ)
+            if chunk:
+                yield ''.join(chunk)
+            if error:
+                # Headers are already sent, so the failure goes in the stream
+                print(f"Error exporting: {str(error)}")
+                yield json.dumps({'type': 'error', 'error': 'Export failed'}) + '\n'
+                return
+            if not chunk:
+                return
+
+    response = Response(generate(), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': 'attachment; filename="export.ndjson"',
+        'X-Accel-Buffering': 'no'
+    })
+    # Large exports legitimately outlast Quart's default response timeout
+    response.timeout = None
+    return response
+
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return jsonify({'status': 'healthy', 'mode': 'async'})
+
+
+# Everything not routed above is served by the Flask app in a thread pool
+wsgi_fallback = AsyncioWSGIMiddleware(
+    sync_app.app,
+    max_body_size=int(os.getenv('WSGI_MAX_BODY_SIZE', 512 * 1024 * 1024))
+)
+
+
+def is_async_route(scope):
+    # CORS preflights are answered by flask-cors on the Flask side
+    if scope['method'] == 'OPTIONS':
+        return False
+    adapter = app.url_map.bind('')
+    try:
+        adapter.match(scope['path'], method=scope['method'])
+        return True
+    except (NotFound, MethodNotAllowed):
+        return False
+
+
+async def application(scope, receive, send):
+    """ASGI entry point dispatching between the async and the Flask routes"""
+    if scope['type'] == 'http' and not is_async_route(scope):
+        await wsgi_fallback(scope, receive, send)
+    else:
+        await app(scope, receive, send)
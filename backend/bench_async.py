@@ -0,0 +1,173 @@
+"""
+Compare the Flask sync path with the async serving mode under slow upstreams.
+
+Starts a fake Daily.co API that answers after a fixed delay, then fires
+concurrent GET /api/rooms/<name> requests at the Flask server and at the
+ASGI server in turn and reports throughput and latency for each.
+
+    python bench_async.py --requests 2000 --concurrency 500 --delay 0.5
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_upstream(port, delay):
+    """Fake Daily.co API that sleeps `delay` seconds per request"""
+    from aiohttp import web
+
+    async def get_room(request):
+        await asyncio.sleep(delay)
+        name = request.match_info['name']
+        return web.json_response({'name': name, 'url': f'https://example.daily.co/{name}'})
+
+    upstream = web.Application()
+    upstream.router.add_get('/v1/rooms/{name}', get_room)
+    web.run_app(upstream, host='127.0.0.1', port=port, backlog=4096, print=None)
+
+
+def run_flask(port):
+    """Serve backend/app.py with the threaded Werkzeug server"""
+    sys.path.insert(0, BACKEND_DIR)
+    from asgi import load_sync_app
+    load_sync_app().app.run(host='127.0.0.1', port=port, threaded=True)
+
+
+def start(args, env, cwd):
+    return subprocess.Popen(
+        [sys.executable] + args,
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def load(base_url, total, concurrency):
+    """Fire `total` requests with at most `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=120),
+        connector=aiohttp.TCPConnector(limit=concurrency)
+    ) as session:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.get(f'{base_url}/api/rooms/bench-{i}') as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--delay', type=float, default=0.5, help='upstream latency in seconds')
+    parser.add_argument('--upstream', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--flask', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.upstream:
+        return run_upstream(args.upstream, args.delay)
+    if args.flask:
+        return run_flask(args.flask)
+
+    upstream_port, flask_port, asgi_port = free_port(), free_port(), free_port()
+    workdir = tempfile.mkdtemp(prefix='utom_bench_')
+    os.makedirs(os.path.join(workdir, 'recordings'), exist_ok=True)
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        DAILY_API_URL=f'http://127.0.0.1:{upstream_port}/v1',
+        DAILY_API_KEY=os.getenv('DAILY_API_KEY', 'bench'),
+        OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'bench'),
+        # Keep the breaker out of the way of a deliberately slow upstream
+        DAILY_CIRCUIT_SLOW_SECONDS='60'
+    )
+    script = os.path.abspath(__file__)
+
+    processes = [start([script, '--upstream', str(upstream_port), '--delay', str(args.delay)], env, workdir)]
+    try:
+        wait_for(f'http://127.0.0.1:{upstream_port}/v1/rooms/ready')
+
+        servers = {
+            'flask (threaded WSGI)': (
+                [script, '--flask', str(flask_port)],
+                f'http://127.0.0.1:{flask_port}'
+            ),
+            'asgi (hypercorn)': (
+                ['-m', 'hypercorn', 'asgi:application', '--bind', f'127.0.0.1:{asgi_port}', '--backlog', '4096'],
+                f'http://127.0.0.1:{asgi_port}'
+            )
+        }
+
+        print(f"{args.requests} requests, {args.concurrency} concurrent, upstream delay {args.delay}s")
+        for name, (command, base_url) in servers.items():
+            server = start(command, env, workdir)
+            processes.append(server)
+            wait_for(f'{base_url}/api/health')
+            result = asyncio.run(load(base_url, args.requests, args.concurrency))
+            print(
+                f"{name:24} {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+                f"errors {result['errors']}"
+            )
+            server.terminate()
+            server.wait()
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Measure recordings.db size and read latency before and after compressing the
+transcript, chat and transcription columns.
+
+Builds a scratch database of synthetic meetings in the legacy layout, times
+full-row reads and the lightweight listing query, then runs the compression
+migration with VACUUM and times the same reads again.
+
+    python bench_compression.py --rows 2000 --lines 400
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from blob_codec import compress_existing_rows, decode_text
+
+WORDS = (
+    'agenda budget customer deadline design follow launch meeting metrics next '
+    'owner plan quarter release review roadmap risk scope ship sprint status team '
+    'timeline update week'
+).split()
+
+
+def build_database(path, rows, lines):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE recordings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id TEXT,
+            recording_url TEXT,
+            participants TEXT,
+            transcript TEXT,
+            chat_messages TEXT,
+            transcription_text TEXT,
+            metadata TEXT,
+            end_time TEXT,
+            created_at TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_recordings_created ON recordings(created_at, id)')
+
+    rng = random.Random(42)
+    speakers = ['Ada', 'Grace', 'Linus', 'Margaret']
+
+    def sentence():
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + '.'
+
+    for i in range(rows):
+        transcript = [
+            {'speaker': rng.choice(speakers), 'text': sentence(), 'timestamp': f'2024-01-01T10:{n % 60:02d}:00'}
+            for n in range(lines)
+        ]
+        chat = [{'sender': rng.choice(speakers), 'message': sentence()} for _ in range(lines // 10)]
+        conn.execute('''
+            INSERT INTO recordings (meeting_id, recording_url, participants, transcript, chat_messages,
+                                    transcription_text, metadata, end_time, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            f'meeting_{i}',
+            f'https://example.com/{i}.mp4',
+            json.dumps(speakers),
+            json.dumps(transcript),
+            json.dumps(chat),
+            ' '.join(line['text'] for line in transcript),
+            json.dumps({'room_name': f'room-{i}'}),
+            '2024-01-01T11:00:00',
+            f'2024-01-01T{i:08d}'
+        ))
+    conn.commit()
+    conn.close()
+
+
+def time_reads(path, rows, samples):
+    """Median milliseconds for one full-row read and for one 50-row listing page"""
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    try:
+        full = []
+        for _ in range(samples):
+            meeting_id = f'meeting_{rng.randrange(rows)}'
+            started = time.perf_counter()
+            row = conn.execute(
+                'SELECT transcript, chat_messages, transcription_text FROM recordings WHERE meeting_id = ?',
+                (meeting_id,)
+            ).fetchone()
+            json.loads(decode_text(row[0]))
+            json.loads(decode_text(row[1]))
+            decode_text(row[2])
+            full.append((time.perf_counter() - started) * 1000)
+
+        listing = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            conn.execute('''
+                SELECT id, meeting_id, recording_url, end_time, created_at FROM recordings
+                ORDER BY created_at DESC, id DESC LIMIT 50
+            ''').fetchall()
+            listing.append((time.perf_counter() - started) * 1000)
+    finally:
+        conn.close()
+    return statistics.median(full), statistics.median(listing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--lines', type=int, default=400, help='Transcript lines per meeting')
+    parser.add_argument('--samples', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'recordings.db')
+        build_database(path, args.rows, args.lines)
+
+        size_before = os.path.getsize(path)
+        full_before, listing_before = time_reads(path, args.rows, args.samples)
+
+        started = time.perf_counter()
+        compress_existing_rows(path, vacuum=True)
+        migration_seconds = time.perf_counter() - started
+
+        size_after = os.path.getsize(path)
+        full_after, listing_after = time_reads(path, args.rows, args.samples)
+
+    print(f"{'':<22}{'before':>12}{'after':>12}")
+    print(f"{'database size (MB)':<22}{size_before / 1e6:>12.1f}{size_after / 1e6:>12.1f}")
+    print(f"{'full read p50 (ms)':<22}{full_before:>12.3f}{full_after:>12.3f}")
+    print(f"{'listing page p50 (ms)':<22}{listing_before:>12.3f}{listing_after:>12.3f}")
+    print(f"migration took {migration_seconds:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Compare per-operation sqlite3 connections with the pooled WAL connections
+from db.py under a concurrent request mix.
+
+Each simulated request looks up a recording by unique id, and every
+`--write-every`th one also updates its status and enqueues a task, the
+same statements RecordingManager and QueueManager issue. Both modes run
+the identical workload on a fresh database and report requests per second.
+
+    python bench_db.py --threads 8 --seconds 5 --rows 5000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import db
+
+
+@contextmanager
+def per_operation_connection(db_path):
+    """What every call site did before db.py: connect, default journal, close"""
+    conn = sqlite3.connect(db_path)
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def prepare(directory, journal_mode, rows):
+    recordings_db = os.path.join(directory, 'recordings.db')
+    queue_db = os.path.join(directory, 'queue.db')
+
+    conn = sqlite3.connect(recordings_db)
+    conn.execute(f'PRAGMA journal_mode={journal_mode}')
+    conn.execute('''
+        CREATE TABLE recordings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unique_id TEXT UNIQUE NOT NULL,
+            meeting_id TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            metadata TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO recordings (unique_id, meeting_id, metadata) VALUES (?, ?, ?)',
+        [(f'rec_{i}', f'meeting_{i}', json.dumps({'room_name': f'room-{i}'})) for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(queue_db)
+    conn.execute(f'PRAGMA journal_mode={journal_mode}')
+    conn.execute('''
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    conn.close()
+    return recordings_db, queue_db
+
+
+def run(connect, recordings_db, queue_db, threads, seconds, rows, write_every):
+    """Requests completed per second across `threads` workers, plus the median latency in ms"""
+    deadline = time.monotonic() + seconds
+    counts, latencies, errors = [0] * threads, [[] for _ in range(threads)], []
+
+    def worker(index):
+        rng = random.Random(index)
+        n = 0
+        while time.monotonic() < deadline:
+            unique_id = f'rec_{rng.randrange(rows)}'
+            started = time.perf_counter()
+            try:
+                with connect(recordings_db) as conn:
+                    row = conn.execute(
+                        'SELECT unique_id, meeting_id, status, metadata FROM recordings WHERE unique_id = ?',
+                        (unique_id,)
+                    ).fetchone()
+                    json.loads(row[3])
+                if n % write_every == 0:
+                    with connect(recordings_db) as conn:
+                        conn.execute(
+                            'UPDATE recordings SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE unique_id = ?',
+                            ('processing', unique_id)
+                        )
+                    with connect(queue_db) as conn:
+                        conn.execute(
+                            'INSERT INTO tasks (task_type, payload) VALUES (?, ?)',
+                            ('process_recording', json.dumps({'recording_id': unique_id}))
+                        )
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+                continue
+            latencies[index].append((time.perf_counter() - started) * 1000)
+            counts[index] += 1
+            n += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    all_latencies = [ms for per_thread in latencies for ms in per_thread]
+    return sum(counts) / seconds, statistics.median(all_latencies), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--write-every', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name, journal_mode, connect in [
+        ('per-operation', 'DELETE', per_operation_connection),
+        ('pooled WAL', 'WAL', db.connection)
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            recordings_db, queue_db = prepare(tmp, journal_mode, args.rows)
+            results[name] = run(
+                connect, recordings_db, queue_db, args.threads, args.seconds, args.rows, args.write_every
+            )
+            for path in (recordings_db, queue_db):
+                db.get_pool(path).close_all()
+
+    print(f"{'':<16}{'req/s':>10}{'p50 ms':>10}{'errors':>10}")
+    for name, (rps, p50, errors) in results.items():
+        print(f"{name:<16}{rps:>10.0f}{p50:>10.3f}{errors:>10}")
+    baseline, pooled = results['per-operation'][0], results['pooled WAL'][0]
+    print(f"speedup: {pooled / baseline:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
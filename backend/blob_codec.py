@@ -0,0 +1,95 @@
+import sqlite3
+import zlib
+from typing import Optional, Union
+
+# Stored values starting with this marker are zlib-compressed UTF-8. The
+# trailing byte is the format version, so a later codec can be told apart.
+COMPRESSED_MARKER = b'UZ\x01'
+
+# Values shorter than this stay plain TEXT; compressing them saves little and
+# keeps small JSON readable by SQLite's json functions
+COMPRESS_MIN_BYTES = 1024
+COMPRESSION_LEVEL = 6
+
+# Large text and JSON columns stored compressed
+COMPRESSED_COLUMNS = {
+    'recordings': ('transcript', 'chat_messages', 'transcription_text', 'metadata')
+}
+
+
+def encode_text(text: Optional[str]) -> Union[str, bytes, None]:
+    """Value to store for `text`: a compressed BLOB when that is smaller, otherwise the text itself"""
+    if text is None:
+        return None
+    data = text.encode('utf-8')
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text
+    packed = COMPRESSED_MARKER + zlib.compress(data, COMPRESSION_LEVEL)
+    return packed if len(packed) < len(data) else text
+
+
+def decode_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """Text of a stored value, whether compressed or written before compression existed"""
+    if isinstance(value, bytes):
+        if value.startswith(COMPRESSED_MARKER):
+            return zlib.decompress(value[len(COMPRESSED_MARKER):]).decode('utf-8')
+        return value.decode('utf-8')
+    return value
+
+
+def compress_column(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    batch_size: int = 500,
+    commit: bool = True
+) -> int:
+    """
+    Compress the existing plain-text values of one column in batches,
+    committing after each unless the caller owns the transaction. Returns
+    rows rewritten.
+    """
+    converted, last_rowid = 0, 0
+    while True:
+        # length() counts characters, so this only pre-filters; encode_text decides
+        rows = conn.execute(f'''
+            SELECT rowid, {column} FROM {table}
+            WHERE rowid > ? AND typeof({column}) = 'text' AND length({column}) >= ?
+            ORDER BY rowid LIMIT ?
+        ''', (last_rowid, COMPRESS_MIN_BYTES // 4, batch_size)).fetchall()
+        if not rows:
+            return converted
+
+        updates = []
+        for rowid, text in rows:
+            value = encode_text(text)
+            if isinstance(value, bytes):
+                updates.append((value, rowid))
+        conn.executemany(f'UPDATE {table} SET {column} = ? WHERE rowid = ?', updates)
+        if commit:
+            conn.commit()
+
+        converted += len(updates)
+        last_rowid = rows[-1][0]
+
+
+def compress_existing_rows(db_path: str = 'database/recordings.db', vacuum: bool = False) -> dict:
+    """
+    Compress every large value in COMPRESSED_COLUMNS that is still plain text.
+    Safe to re-run; columns missing from this database are skipped.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        converted = {}
+        for table, columns in COMPRESSED_COLUMNS.items():
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+            for column in columns:
+                if column in existing:
+                    converted[f'{table}.{column}'] = compress_column(conn, table, column)
+
+        # Freed pages are only returned to the filesystem by a VACUUM
+        if vacuum:
+            conn.execute('VACUUM')
+        return converted
+    finally:
+        conn.close()
@@ -0,0 +1,201 @@
+"""
+Dump meetings, recordings and transcript segments as NDJSON, one object
+per line tagged with its `type`. Rows are read in keyset batches of
+--batch-size, each a short query of its own, so memory stays flat and no
+read transaction stays open while the output drains.
+
+    python bulk_export.py --type meetings,recordings --since 2026-01-01 --until 2026-02-01 > dump.ndjson
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from blob_codec import decode_text
+from db import connection
+
+EXPORT_TYPES = ('meetings', 'recordings', 'transcripts')
+EXPORT_BATCH_SIZE = 500
+
+MEETING_COLUMNS = [
+    'meeting_id', 'meeting_name', 'description', 'start_time', 'end_time', 'duration',
+    'agenda', 'attendees', 'room_name', 'room_url', 'created_at',
+    'transcription_status', 'transcription_text', 'transcription_error', 'recording_file_path'
+]
+RECORDING_COLUMNS = [
+    'id', 'unique_id', 'meeting_id', 'recording_id', 'room_name', 'room_url', 'recording_url',
+    'recording_file_path', 'status', 'metadata', 'participants', 'transcript', 'chat_messages',
+    'end_time', 'transcription_status', 'transcription_text', 'transcription_error',
+    'created_at', 'updated_at'
+]
+SEGMENT_COLUMNS = [
+    'session_id', 'kind', 'seq', 'meeting_id', 'speaker', 'text', 'timestamp',
+    'start_ms', 'end_ms', 'received_at'
+]
+
+# Stored as JSON text, possibly compressed; exported as nested values
+JSON_COLUMNS = {'agenda', 'attendees', 'metadata', 'participants', 'transcript', 'chat_messages'}
+TEXT_COLUMNS = {'transcription_text'}
+
+
+def parse_date(value: Optional[str]) -> Optional[str]:
+    """Validate a YYYY-MM-DD bound (UTC). Raises ValueError if malformed."""
+    if not value:
+        return None
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+    return value
+
+
+def day_timestamp(day: str) -> int:
+    """Unix timestamp of midnight UTC at the start of a YYYY-MM-DD day"""
+    return int(datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+def _decode(columns: Sequence[str], row: Tuple) -> Dict[str, Any]:
+    record = dict(zip(columns, row))
+    for column in JSON_COLUMNS.intersection(record):
+        if record[column] is not None:
+            record[column] = json.loads(decode_text(record[column]))
+    for column in TEXT_COLUMNS.intersection(record):
+        if record[column] is not None:
+            record[column] = decode_text(record[column])
+    return record
+
+
+def _keyset_rows(
+    db_path: str,
+    table: str,
+    columns: List[str],
+    key: List[str],
+    conditions: List[str],
+    params: List[Any],
+    batch_size: int
+) -> Iterator[Tuple]:
+    """
+    Rows of `table` in ascending `key` order, which must be unique and lead
+    `columns`. Every batch seeks past the last key seen, so each one costs
+    the same however deep into the table the export is.
+    """
+    order = ', '.join(key)
+    after = None
+    while True:
+        where, args = list(conditions), list(params)
+        if after is not None:
+            where.append(f"({order}) > ({', '.join('?' * len(key))})")
+            args.extend(after)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+
+        with connection(db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT {', '.join(columns)} FROM {table}
+                {where_sql}
+                ORDER BY {order} LIMIT ?
+            ''', (*args, batch_size)).fetchall()
+
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after = rows[-1][:len(key)]
+
+
+def export_meetings(db_path: str, since: Optional[str], until: Optional[str], batch_size: int) -> Iterator[Dict[str, Any]]:
+    # created_at is a Unix timestamp here
+    conditions, params = [], []
+    if since:
+        conditions.append('created_at >= ?')
+        params.append(day_timestamp(since))
+    if until:
+        conditions.append('created_at < ?')
+        params.append(day_timestamp(until))
+
+    for row in _keyset_rows(db_path, 'meetings', MEETING_COLUMNS, ['meeting_id'], conditions, params, batch_size):
+        yield _decode(MEETING_COLUMNS, row)
+
+
+def export_recordings(db_path: str, since: Optional[str], until: Optional[str], batch_size: int) -> Iterator[Dict[str, Any]]:
+    # created_at is ISO text in one of two layouts; a bare date compares correctly with both
+    conditions, params = [], []
+    if since:
+        conditions.append('created_at >= ?')
+        params.append(since)
+    if until:
+        conditions.append('created_at < ?')
+        params.append(until)
+
+    for row in _keyset_rows(db_path, 'recordings', RECORDING_COLUMNS, ['id'], conditions, params, batch_size):
+        yield _decode(RECORDING_COLUMNS, row)
+
+
+def export_transcripts(db_path: str, since: Optional[str], until: Optional[str], batch_size: int) -> Iterator[Dict[str, Any]]:
+    conditions, params = [], []
+    if since:
+        conditions.append('received_at >= ?')
+        params.append(day_timestamp(since))
+    if until:
+        conditions.append('received_at < ?')
+        params.append(day_timestamp(until))
+
+    # Sessions are joined on their primary key for the meeting each one belongs to
+    table = 'transcript_segments LEFT JOIN transcript_sessions USING (session_id)'
+    key = ['session_id', 'kind', 'seq']
+    for row in _keyset_rows(db_path, table, SEGMENT_COLUMNS, key, conditions, params, batch_size):
+        yield dict(zip(SEGMENT_COLUMNS, row))
+
+
+def export_ndjson(
+    types: Sequence[str] = EXPORT_TYPES,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    meetings_db: str = 'meetings.db',
+    recordings_db: str = 'database/recordings.db',
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    NDJSON lines for the requested types created in [since, until), each
+    a YYYY-MM-DD date or None for no bound
+    """
+    sources = {
+        'meetings': lambda: export_meetings(meetings_db, since, until, batch_size),
+        'recordings': lambda: export_recordings(recordings_db, since, until, batch_size),
+        'transcripts': lambda: export_transcripts(recordings_db, since, until, batch_size)
+    }
+    for export_type in types:
+        for record in sources[export_type]():
+            yield json.dumps({'type': export_type, **record}) + '\n'
+
+
+def parse_types(value: Optional[str]) -> List[str]:
+    """Export types from a comma-separated list, all of them if empty. Raises ValueError if unknown."""
+    types = [t for t in (value or '').split(',') if t] or list(EXPORT_TYPES)
+    unknown = [t for t in types if t not in EXPORT_TYPES]
+    if unknown:
+        raise ValueError(f"type must be a subset of {', '.join(EXPORT_TYPES)}")
+    return types
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--type', default=','.join(EXPORT_TYPES), help='Comma-separated subset of ' + ', '.join(EXPORT_TYPES))
+    parser.add_argument('--since', help='First day to include, YYYY-MM-DD (UTC)')
+    parser.add_argument('--until', help='First day to exclude, YYYY-MM-DD (UTC)')
+    parser.add_argument('--meetings-db', default='meetings.db')
+    parser.add_argument('--recordings-db', default='database/recordings.db')
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        types = parse_types(args.type)
+        since, until = parse_date(args.since), parse_date(args.until)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for line in export_ndjson(types, since, until, args.meetings_db, args.recordings_db, args.batch_size):
+        sys.stdout.write(line)
+
+
+if __name__ == '__main__':
+    main()
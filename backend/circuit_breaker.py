@@ -0,0 +1,254 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import aiohttp
+import botocore.exceptions
+import openai
+import requests
+from prometheus_client import Counter, Gauge
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = Gauge(
+    'upstream_circuit_state',
+    'Circuit breaker state per upstream (0=closed, 1=half-open, 2=open)',
+    ['upstream']
+)
+upstream_calls = Counter(
+    'upstream_calls_total',
+    'Calls made through an upstream circuit breaker',
+    ['upstream', 'outcome']
+)
+
+
+# Errors raised when an upstream could not be reached or did not answer in time
+TRANSPORT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+    aiohttp.ClientConnectionError,
+    openai.APIConnectionError,
+    botocore.exceptions.ConnectionError,
+    botocore.exceptions.HTTPClientError
+)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an upstream client's error, if any"""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status
+    if isinstance(error, botocore.exceptions.ClientError):
+        return error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code
+    return None
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an exception means the upstream is unhealthy: a transport error,
+    a timeout, or a 5xx or 429 answer. Anything else, such as a 400 for a bad
+    request, is the caller's problem and must not trip the breaker.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status == 429
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, upstream: str, retry_after: int):
+        super().__init__(f"{upstream} is temporarily unavailable")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.8,
+        slow_call_seconds: float = 10,
+        window_size: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30,
+        is_failure: Optional[Callable[[Any], bool]] = None,
+        is_failure_exception: Callable[[BaseException], bool] = is_upstream_failure
+    ):
+        """
+        Trip after too many failed or slow calls among the last `window_size`
+        calls, fail fast for `reset_timeout` seconds, then let one probe through.
+        `is_failure` judges returned results and `is_failure_exception` raised
+        errors; an error it rejects counts as an answered call.
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.is_failure_exception = is_failure_exception
+
+        self.calls = deque(maxlen=window_size)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+        circuit_state.labels(upstream=name).set(STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str):
+        self.state = state
+        circuit_state.labels(upstream=self.name).set(STATE_VALUES[state])
+        print(f"Circuit for {self.name} is now {state}")
+
+    def _before_call(self) -> bool:
+        """Reserve a call slot, returning whether it is the half-open probe"""
+        with self.lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(self.name, self.retry_after())
+                self._set_state(HALF_OPEN)
+
+            if self.state == HALF_OPEN:
+                if self.probe_in_flight:
+                    raise CircuitOpenError(self.name, self.retry_after())
+                self.probe_in_flight = True
+                return True
+
+            return False
+
+    def _after_call(self, is_probe: bool, failed: bool, slow: bool):
+        with self.lock:
+            if is_probe:
+                self.probe_in_flight = False
+                if failed or slow:
+                    self.opened_at = time.monotonic()
+                    self._set_state(OPEN)
+                else:
+                    self.calls.clear()
+                    self._set_state(CLOSED)
+                return
+
+            self.calls.append((failed, slow))
+            if self.state != CLOSED or len(self.calls) < self.min_calls:
+                return
+
+            failure_rate = sum(1 for f, _ in self.calls if f) / len(self.calls)
+            slow_rate = sum(1 for _, s in self.calls if s) / len(self.calls)
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _release(self, is_probe: bool):
+        """End a call that was cancelled or interrupted without judging the upstream"""
+        if is_probe:
+            with self.lock:
+                # Still half-open, so the next call becomes the probe
+                self.probe_in_flight = False
+
+    def check(self):
+        """Raise CircuitOpenError if a call made now would be rejected, without making one"""
+        with self.lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(self.name, self.retry_after())
+            if self.state == HALF_OPEN and self.probe_in_flight:
+                raise CircuitOpenError(self.name, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Seconds until the next probe is allowed"""
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def _record(self, is_probe: bool, started: float, result: Any = None, error: bool = False):
+        failed = error or bool(self.is_failure and self.is_failure(result))
+        slow = time.monotonic() - started >= self.slow_call_seconds
+        self._after_call(is_probe, failed=failed, slow=slow)
+        outcome = 'failure' if failed else 'slow' if slow else 'success'
+        upstream_calls.labels(upstream=self.name, outcome=outcome).inc()
+
+    def _admit(self) -> bool:
+        try:
+            return self._before_call()
+        except CircuitOpenError:
+            upstream_calls.labels(upstream=self.name, outcome='rejected').inc()
+            raise
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run `func` through the breaker, raising CircuitOpenError while open"""
+        is_probe = self._admit()
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(is_probe, started, error=self.is_failure_exception(e))
+            raise
+        except BaseException:
+            # KeyboardInterrupt or SystemExit must not leave the probe slot taken
+            self._release(is_probe)
+            raise
+
+        self._record(is_probe, started, result)
+        return result
+
+    async def call_async(self, func: Callable, *args, **kwargs):
+        """Await coroutine function `func` through the breaker"""
+        is_probe = self._admit()
+        started = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._record(is_probe, started, error=self.is_failure_exception(e))
+            raise
+        except BaseException:
+            # asyncio.CancelledError, e.g. on client disconnect, ends the probe too
+            self._release(is_probe)
+            raise
+
+        self._record(is_probe, started, result)
+        return result
+
+
+def _breaker_from_env(name: str, slow_call_seconds: float, **kwargs) -> CircuitBreaker:
+    """Build a breaker whose thresholds can be tuned with <NAME>_CIRCUIT_* variables"""
+    prefix = f"{name.upper()}_CIRCUIT"
+    return CircuitBreaker(
+        name,
+        failure_rate_threshold=float(os.getenv(f'{prefix}_FAILURE_RATE', 0.5)),
+        slow_call_seconds=float(os.getenv(f'{prefix}_SLOW_SECONDS', slow_call_seconds)),
+        reset_timeout=float(os.getenv(f'{prefix}_RESET_SECONDS', 30)),
+        **kwargs
+    )
+
+
+# One breaker per upstream, shared by the API and the queue handlers.
+# Daily.co answers 5xx instead of raising, so those responses count as failures.
+daily_breaker = _breaker_from_env(
+    'daily',
+    slow_call_seconds=5,
+    is_failure=lambda response: response.status_code >= 500
+)
+openai_breaker = _breaker_from_env('openai', slow_call_seconds=30)
+s3_breaker = _breaker_from_env('s3', slow_call_seconds=10)
+# Recording files come from Daily.co's storage and take minutes, not seconds,
+# so they get their own breaker rather than skewing daily_breaker's slow rate
+download_breaker = _breaker_from_env(
+    'download',
+    slow_call_seconds=300,
+    is_failure=lambda response: response.status_code >= 500 or response.status_code == 429
+)
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from prometheus_client import Gauge, Histogram
+
+upstream_in_flight = Gauge(
+    'upstream_in_flight',
+    'Calls currently holding an upstream concurrency slot',
+    ['upstream']
+)
+upstream_waiting = Gauge(
+    'upstream_waiting',
+    'Calls queued for an upstream concurrency slot',
+    ['upstream']
+)
+upstream_queue_wait = Histogram(
+    'upstream_queue_wait_seconds',
+    'Time spent waiting for an upstream concurrency slot',
+    ['upstream'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+)
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int):
+        """
+        Process-wide cap of `limit` concurrent calls to an upstream, shared by
+        worker threads and the event loop. Waiters are served first come,
+        first served.
+        """
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    def _enter_or_queue(self, waiter) -> bool:
+        """Take a slot if one is free and nobody is queued, otherwise queue `waiter`"""
+        with self.lock:
+            if self.active < self.limit and not self.waiters:
+                self.active += 1
+                upstream_in_flight.labels(upstream=self.name).set(self.active)
+                return True
+            self.waiters.append(waiter)
+            upstream_waiting.labels(upstream=self.name).set(len(self.waiters))
+            return False
+
+    def acquire(self):
+        """Block the calling thread until a slot is free"""
+        started = time.monotonic()
+        event = threading.Event()
+        if not self._enter_or_queue(event):
+            event.wait()
+        upstream_queue_wait.labels(upstream=self.name).observe(time.monotonic() - started)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a slot is free"""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._enter_or_queue((loop, future)):
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self.lock:
+                    queued = (loop, future) in self.waiters
+                    if queued:
+                        self.waiters.remove((loop, future))
+                        upstream_waiting.labels(upstream=self.name).set(len(self.waiters))
+                # A slot handed over just before cancellation must be passed on
+                if not queued and future.done() and not future.cancelled():
+                    self.release()
+                raise
+        upstream_queue_wait.labels(upstream=self.name).observe(time.monotonic() - started)
+
+    def _wake(self, future: asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        """Hand the slot to the next waiter, or free it"""
+        with self.lock:
+            if self.waiters:
+                waiter = self.waiters.popleft()
+                upstream_waiting.labels(upstream=self.name).set(len(self.waiters))
+            else:
+                waiter = None
+                self.active -= 1
+                upstream_in_flight.labels(upstream=self.name).set(self.active)
+
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        elif waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._wake, future)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The smoke scripts talk to a running server; they are run by hand, not collected
+collect_ignore = ['test_api.py', 'test_app.py', 'test_cors.py', 'test_openai.py']
+
+
+@pytest.fixture(scope='session')
+def backend(tmp_path_factory):
+    """
+    The ASGI module with the Flask app loaded behind it, working out of a
+    scratch directory so the relative database paths land there
+    """
+    os.environ.setdefault('DAILY_API_KEY', 'test')
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-test')
+    os.environ.setdefault('LAZY_RECORDING_START', 'true')
+    sys.path.insert(0, BACKEND_DIR)
+
+    workdir = tmp_path_factory.mktemp('backend')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import asgi
+        # Tests drive the queue themselves
+        asgi.sync_app.queue_manager.stop()
+        yield asgi
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def sync_app(backend):
+    return backend.sync_app
+
+
+@pytest.fixture
+def client(sync_app):
+    return sync_app.app.test_client()
+
+
+@pytest.fixture
+def daily_room(sync_app, backend, monkeypatch):
+    """Stub Daily.co room creation on both the Flask and the ASGI side"""
+    def room(name):
+        return {'success': True, 'data': {'name': name, 'url': f'https://example.daily.co/{name}'}}
+
+    async def create_room_async(name, properties=None):
+        return room(name)
+
+    monkeypatch.setattr(sync_app, 'create_room', lambda name, properties=None: room(name))
+    monkeypatch.setattr(backend, 'create_room', create_room_async)
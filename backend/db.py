@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Applied to every pooled connection. WAL lets readers run alongside a writer,
+# and NORMAL only fsyncs at checkpoints, which is still crash-safe under WAL.
+BUSY_TIMEOUT_MS = 10000
+CACHED_STATEMENTS = 256
+MAX_IDLE_CONNECTIONS = 16
+
+
+class ConnectionPool:
+    def __init__(self, db_path: str, max_idle: int = MAX_IDLE_CONNECTIONS):
+        """
+        Reusable connections to one database file. A connection is lent to
+        one thread at a time and keeps its prepared statement cache between
+        loans, so repeated queries skip both connection setup and parsing.
+        """
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=CACHED_STATEMENTS,
+            check_same_thread=False
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return self._open()
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection, closing it if the pool already has enough idle ones"""
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+        return pool
+
+
+@contextmanager
+def connection(db_path: str):
+    """
+    Borrow a pooled connection to `db_path`. An open transaction is committed
+    when the block exits normally and rolled back if it raises, so the next
+    borrower always starts clean.
+    """
+    pool = get_pool(db_path)
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
@@ -0,0 +1,42 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+# Pollers may keep a copy but must revalidate it every time
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong validator for whatever identifies one version of a response"""
+    return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()[:24]
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """SQLite CURRENT_TIMESTAMP text (UTC) as a datetime, or None"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Attach ETag, Last-Modified and Cache-Control to a response"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    An empty 304 if the request's If-None-Match (or, without one,
+    If-Modified-Since) still matches, else None
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
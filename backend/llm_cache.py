@@ -0,0 +1,161 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Gauge
+from db import connection
+
+llm_cache_lookups = Counter(
+    'llm_cache_lookups_total',
+    'LLM result cache lookups by outcome (memory, disk or miss)',
+    ['result']
+)
+llm_cache_evictions = Counter(
+    'llm_cache_evictions_total',
+    'LLM result cache entries evicted by tier and reason',
+    ['tier', 'reason']
+)
+llm_cache_entries = Gauge(
+    'llm_cache_memory_entries',
+    'Entries held in the in-memory LLM result cache'
+)
+
+
+# A memory hit writes last_used_at back to disk at most this often per entry,
+# so hot entries are not trimmed from the table while sparing a write per hit
+LAST_USED_REFRESH_SECONDS = 60
+
+
+def normalise_prompt(text: str) -> str:
+    """Case- and whitespace-insensitive form of a user prompt"""
+    return ' '.join(text.lower().split())
+
+
+class LLMCache:
+    def __init__(
+        self,
+        db_path: str = 'llm_cache.db',
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_entries: int = 512,
+        max_entries: int = 10000,
+        table: str = 'llm_cache'
+    ):
+        """
+        Bounded in-memory LRU in front of a SQLite table. Entries expire after
+        `ttl_seconds`; each tier evicts its least recently used entries once
+        it holds more than its limit. Caches with different limits need
+        their own `table`, or each would trim the other's entries.
+        """
+        self.db_path = db_path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        """Create the persistent cache table"""
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            ''')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_last_used ON {self.table}(last_used_at)')
+
+    @staticmethod
+    def make_key(prompt: str, model: str, prompt_version: str) -> str:
+        """Cache key for a prompt answered by `model` under `prompt_version`"""
+        raw = json.dumps([normalise_prompt(prompt), model, prompt_version])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, value: Dict[str, Any], created_at: float, used_at: float):
+        with self.lock:
+            self.memory[key] = (value, created_at, used_at)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_memory_entries:
+                self.memory.popitem(last=False)
+                llm_cache_evictions.labels(tier='memory', reason='size').inc()
+            llm_cache_entries.set(len(self.memory))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for `key`, or None if missing or expired"""
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                value, created_at, used_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    llm_cache_lookups.labels(result='memory').inc()
+                    refresh = now - used_at >= LAST_USED_REFRESH_SECONDS
+                    if refresh:
+                        self.memory[key] = (value, created_at, now)
+                else:
+                    del self.memory[key]
+                    llm_cache_evictions.labels(tier='memory', reason='ttl').inc()
+                    llm_cache_entries.set(len(self.memory))
+                    entry = None
+
+        if entry is not None:
+            if refresh:
+                with connection(self.db_path) as conn:
+                    conn.execute(f'UPDATE {self.table} SET last_used_at = ? WHERE cache_key = ?', (now, key))
+            return value
+
+        with connection(self.db_path) as conn:
+            row = conn.execute(
+                f'SELECT value, created_at FROM {self.table} WHERE cache_key = ?',
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                llm_cache_lookups.labels(result='miss').inc()
+                return None
+
+            value, created_at = json.loads(row[0]), row[1]
+            if now - created_at >= self.ttl_seconds:
+                conn.execute(f'DELETE FROM {self.table} WHERE cache_key = ?', (key,))
+                conn.commit()
+                llm_cache_evictions.labels(tier='disk', reason='ttl').inc()
+                llm_cache_lookups.labels(result='miss').inc()
+                return None
+
+            conn.execute(f'UPDATE {self.table} SET last_used_at = ? WHERE cache_key = ?', (now, key))
+            conn.commit()
+
+        self._remember(key, value, created_at, now)
+        llm_cache_lookups.labels(result='disk').inc()
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store `value` in both tiers, trimming the table to `max_entries`"""
+        now = time.time()
+        self._remember(key, value, now, now)
+
+        with connection(self.db_path) as conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (cache_key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now)
+            )
+            cursor = conn.execute(f'''
+                DELETE FROM {self.table} WHERE cache_key IN (
+                    SELECT cache_key FROM {self.table}
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            if cursor.rowcount > 0:
+                llm_cache_evictions.labels(tier='disk', reason='size').inc(cursor.rowcount)
+            conn.commit()
@@ -0,0 +1,190 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from llm_cache import LLMCache
+
+# Model settings for turning a free-form description into a structured meeting
+MEETING_MODEL = "gpt-4"
+MEETING_MAX_TOKENS = 1500
+MEETING_TEMPERATURE = 0.7
+
+# Bump whenever the prompt or settings change so cached results are not reused
+MEETING_PROMPT_VERSION = "1"
+
+MEETING_SYSTEM_PROMPT = """You are a meeting assistant. Your task is to always generate a structured meeting from any input, no matter how brief. If the input lacks details, use reasonable defaults and expand on the topic creatively while staying relevant.
+
+For example, if given just "team meeting", you might create a general team sync meeting with standard agenda items.
+
+Always return a valid JSON object with these exact keys:
+{
+    "title": "string",
+    "description": "string (minimum 50 words, expand the topic creatively if needed)",
+    "duration": number (in minutes, default to 30 if not specified),
+    "agenda": ["string"] (at least 3 items, use standard meeting items if not specified),
+    "attendees": ["string"] (suggest relevant team members based on the context)
+}
+
+Never return an error message or invalid JSON. Always provide a valid meeting structure."""
+
+
+def meeting_completion_args(description: str) -> Dict[str, Any]:
+    """Arguments for the chat completion that structures a meeting description"""
+    return {
+        "model": MEETING_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": MEETING_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": description
+            }
+        ],
+        "max_tokens": MEETING_MAX_TOKENS,
+        "temperature": MEETING_TEMPERATURE
+    }
+
+
+def meeting_cache_key(description: str) -> str:
+    """Cache key for a description under the current model and prompt"""
+    return LLMCache.make_key(description, MEETING_MODEL, MEETING_PROMPT_VERSION)
+
+
+def validate_meeting(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Ensure a parsed meeting has every key, filling in defaults"""
+    return {
+        "title": result.get("title", "Team Meeting"),
+        "description": result.get("description", "A team meeting to discuss project updates and align on objectives."),
+        "duration": result.get("duration", 30),
+        "agenda": result.get("agenda", ["Project Updates", "Team Discussion", "Action Items"]),
+        "attendees": result.get("attendees", ["Team Lead", "Team Members"])
+    }
+
+
+def default_meeting(description: str) -> Dict[str, Any]:
+    """Meeting structure used when the model response cannot be parsed"""
+    return {
+        "title": "Team Meeting",
+        "description": "A team meeting to discuss " + description + ". We will review current progress, address any challenges, and align on next steps. This meeting will help ensure everyone is on the same page and has clear action items.",
+        "duration": 30,
+        "agenda": ["Project Updates", "Team Discussion", "Action Items"],
+        "attendees": ["Team Lead", "Team Members"]
+    }
+
+
+def try_parse_meeting(result_str: str) -> Optional[Dict[str, Any]]:
+    """Parse the raw model output, returning None if it is not valid JSON"""
+    print(f"Raw OpenAI response: {result_str}")
+
+    try:
+        result = json.loads(result_str)
+        print(f"Processed result: {result}")
+        return validate_meeting(result)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing OpenAI response: {e}")
+        print(f"Failed to parse: {result_str}")
+        return None
+
+
+def meeting_events(meeting: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Field and item events for an already complete meeting, in streaming order"""
+    events = []
+    for field, value in meeting.items():
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                events.append(('item', {'field': field, 'index': index, 'value': item}))
+        events.append(('field', {'field': field, 'value': value}))
+    return events
+
+
+class MeetingStreamParser:
+    """
+    Incrementally scan streamed model output for the meeting JSON object,
+    reporting each top-level field, and each item of a top-level array, as
+    soon as its value is complete
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.key = None
+        self.value_start = None
+        self.item_start = None
+        self.item_index = 0
+
+    def _decode(self, end: int, start: int):
+        text = self.buffer[start:end].strip()
+        if not text:
+            return None, False
+        try:
+            return json.loads(text), True
+        except ValueError:
+            return None, False
+
+    def _emit_item(self, events: list):
+        value, ok = self._decode(self.pos, self.item_start)
+        if ok:
+            events.append(('item', {'field': self.key, 'index': self.item_index, 'value': value}))
+            self.item_index += 1
+
+    def _emit_field(self, events: list):
+        value, ok = self._decode(self.pos, self.value_start)
+        if ok:
+            events.append(('field', {'field': self.key, 'value': value}))
+        self.key = None
+        self.value_start = None
+
+    def feed(self, text: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume the next chunk of output, returning newly completed events"""
+        self.buffer += text
+        events = []
+
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.value_start is None:
+                        self.key = json.loads(self.buffer[self.string_start:self.pos + 1])
+            elif ch == '"':
+                self.in_string = True
+                self.string_start = self.pos
+            elif ch == ':' and self.depth == 1 and self.key is not None and self.value_start is None:
+                self.value_start = self.pos + 1
+            elif ch in '{[':
+                if ch == '[' and self.depth == 1 and self.value_start is not None:
+                    self.item_start = self.pos + 1
+                    self.item_index = 0
+                self.depth += 1
+            elif ch in '}]':
+                if ch == ']' and self.depth == 2 and self.item_start is not None:
+                    self._emit_item(events)
+                    self.item_start = None
+                self.depth -= 1
+                if self.depth == 0 and self.value_start is not None:
+                    self._emit_field(events)
+                elif self.depth == 1 and self.value_start is not None:
+                    # Containers end at the closing bracket, so report them right away
+                    self.pos += 1
+                    self._emit_field(events)
+                    continue
+            elif ch == ',':
+                if self.depth == 2 and self.item_start is not None:
+                    self._emit_item(events)
+                    self.item_start = self.pos + 1
+                elif self.depth == 1 and self.value_start is not None:
+                    self._emit_field(events)
+
+            self.pos += 1
+
+        return events
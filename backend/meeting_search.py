@@ -0,0 +1,104 @@
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from bulk_export import day_timestamp
+from db import connection
+from pagination import encode_cursor, decode_cursor, page_size
+
+SEARCH_COLUMNS = [
+    'meeting_id', 'meeting_name', 'description', 'start_time', 'end_time',
+    'duration', 'attendees', 'room_name', 'room_url', 'created_at'
+]
+
+
+def attendee_key(attendee: Any) -> Optional[str]:
+    """How an attendee is indexed and matched: trimmed and lowercased name or email"""
+    if isinstance(attendee, dict):
+        attendee = attendee.get('email') or attendee.get('name')
+    if not isinstance(attendee, str) or not attendee.strip():
+        return None
+    return attendee.strip().lower()
+
+
+def attendee_keys(attendees: Any) -> List[str]:
+    """Distinct attendee keys of a meeting's attendee list"""
+    if not isinstance(attendees, list):
+        return []
+    return list(dict.fromkeys(key for key in map(attendee_key, attendees) if key))
+
+
+def index_attendees(conn: sqlite3.Connection, meetings: Iterable[tuple]):
+    """Add meeting_attendees rows for (meeting_id, created_at, attendees) tuples"""
+    conn.executemany(
+        'INSERT OR IGNORE INTO meeting_attendees (attendee, created_at, meeting_id) VALUES (?, ?, ?)',
+        [
+            (key, created_at or 0, meeting_id)
+            for meeting_id, created_at, attendees in meetings
+            for key in attendee_keys(attendees)
+        ]
+    )
+
+
+def search_meetings(
+    db_path: str,
+    attendee: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    name: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    One page of meetings newest first, created in [since, until) (YYYY-MM-DD)
+    and optionally attended by `attendee` or with `name` in their name.
+    Raises ValueError for a malformed cursor.
+    """
+    limit = page_size(limit)
+    after = decode_cursor(cursor)
+
+    # With an attendee the join table's (attendee, created_at, meeting_id)
+    # key drives the query; otherwise the meetings (created_at) index does
+    if attendee:
+        source = 'meeting_attendees a JOIN meetings m ON m.meeting_id = a.meeting_id'
+        sort, conditions, params = 'a', ['a.attendee = ?'], [attendee_key(attendee)]
+    else:
+        source = 'meetings m'
+        sort, conditions, params = 'm', [], []
+
+    if since:
+        conditions.append(f'{sort}.created_at >= ?')
+        params.append(day_timestamp(since))
+    if until:
+        conditions.append(f'{sort}.created_at < ?')
+        params.append(day_timestamp(until))
+    if after:
+        conditions.append(f'({sort}.created_at, {sort}.meeting_id) < (?, ?)')
+        params.extend(after)
+    if name:
+        # Checked row by row while walking the index in date order
+        escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("m.meeting_name LIKE ? ESCAPE '\\'")
+        params.append(f'%{escaped}%')
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    with connection(db_path) as conn:
+        rows = conn.execute(f'''
+            SELECT {', '.join(f'm.{c}' for c in SEARCH_COLUMNS)}
+            FROM {source}
+            {where}
+            ORDER BY {sort}.created_at DESC, {sort}.meeting_id DESC
+            LIMIT ?
+        ''', (*params, limit + 1)).fetchall()
+
+    meetings = []
+    for row in rows[:limit]:
+        meeting = dict(zip(SEARCH_COLUMNS, row))
+        meeting['attendees'] = json.loads(meeting['attendees']) if meeting['attendees'] else []
+        meetings.append(meeting)
+
+    last = rows[limit - 1] if len(rows) > limit else None
+    return {
+        'meetings': meetings,
+        'next_cursor': encode_cursor(last[9] or 0, last[0]) if last else None
+    }
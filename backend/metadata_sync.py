@@ -0,0 +1,127 @@
+import atexit
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from prometheus_client import Counter, Gauge
+
+metadata_uploads = Counter(
+    's3_metadata_uploads_total',
+    'metadata.json uploads by the write-behind flusher',
+    ['writer', 'result']
+)
+metadata_coalesced = Counter(
+    's3_metadata_coalesced_total',
+    'Metadata updates replaced by a newer one before they were uploaded',
+    ['writer']
+)
+metadata_pending = Gauge(
+    's3_metadata_pending',
+    'Recordings with metadata waiting to be uploaded',
+    ['writer']
+)
+
+
+class MetadataWriteBehind:
+    def __init__(
+        self,
+        name: str,
+        upload: Callable[[str, Dict[str, Any]], None],
+        interval: float = 1.0,
+        max_batch: int = 50,
+        workers: int = 4
+    ):
+        """
+        Write-behind mirror of recording metadata. `put` only records the
+        latest document per key; a background thread uploads whatever is
+        pending every `interval` seconds, up to `max_batch` keys at a time
+        over `workers` parallel calls to `upload(key, document)`.
+        """
+        self.name = name
+        self.upload = upload
+        self.interval = interval
+        self.max_batch = max_batch
+        self.workers = workers
+        self.pending = {}
+        self.lock = threading.Lock()
+        # One flush at a time, so two versions of a key are never uploaded out of order
+        self.flush_lock = threading.Lock()
+        self.thread = None
+
+    def _start(self):
+        # Called with the lock held
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            atexit.register(self.flush_all)
+
+    def put(self, key: str, document: Dict[str, Any]):
+        """Queue `document` as the latest metadata for `key`"""
+        with self.lock:
+            if key in self.pending:
+                metadata_coalesced.labels(writer=self.name).inc()
+            self.pending[key] = copy.deepcopy(document)
+            metadata_pending.labels(writer=self.name).set(len(self.pending))
+            self._start()
+
+    def discard(self, key: str):
+        """
+        Drop a queued upload, e.g. when the recording's objects are being
+        deleted. Waits for a flush in progress first, so once this returns
+        no upload of `key` is running or about to be retried.
+        """
+        with self.flush_lock, self.lock:
+            self.pending.pop(key, None)
+            metadata_pending.labels(writer=self.name).set(len(self.pending))
+
+    def _upload_one(self, item) -> bool:
+        key, document = item
+        try:
+            self.upload(key, document)
+        except Exception as e:
+            print(f"Error uploading metadata for {key}: {str(e)}")
+            metadata_uploads.labels(writer=self.name, result='error').inc()
+            return False
+        metadata_uploads.labels(writer=self.name, result='ok').inc()
+        return True
+
+    def flush(self) -> int:
+        """Upload one batch of pending documents. Returns how many were uploaded."""
+        with self.flush_lock:
+            return self._flush_batch()
+
+    def _flush_batch(self) -> int:
+        with self.lock:
+            batch = list(self.pending.items())[:self.max_batch]
+            for key, _ in batch:
+                del self.pending[key]
+            metadata_pending.labels(writer=self.name).set(len(self.pending))
+        if not batch:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batch))) as executor:
+            results = list(executor.map(self._upload_one, batch))
+
+        # Failed uploads are retried next round unless a newer version arrived meanwhile
+        with self.lock:
+            for (key, document), uploaded in zip(batch, results):
+                if not uploaded:
+                    self.pending.setdefault(key, document)
+            metadata_pending.labels(writer=self.name).set(len(self.pending))
+
+        return sum(results)
+
+    def flush_all(self):
+        """Upload everything pending, stopping early if a whole batch fails"""
+        while self.pending:
+            if self.flush() == 0:
+                break
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            # Keep going while full batches succeed, so a backlog drains quickly
+            while self.flush() == self.max_batch:
+                pass
@@ -0,0 +1,395 @@
+import json
+import sqlite3
+from datetime import datetime
+from typing import Callable, List
+
+from blob_codec import COMPRESSED_COLUMNS, compress_column, decode_text
+from db import connection
+from meeting_search import index_attendees
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def run_migrations(db_path: str, migrations: List[Migration]) -> int:
+    """
+    Apply the migrations the database has not seen yet, tracked by PRAGMA
+    user_version. Each one runs in its own BEGIN IMMEDIATE transaction
+    together with the version bump, so concurrent starts apply it once and
+    a failed migration leaves the previous version intact.
+    """
+    with connection(db_path) as conn:
+        while True:
+            conn.execute('BEGIN IMMEDIATE')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version >= len(migrations):
+                conn.rollback()
+                return version
+
+            migrations[version](conn)
+            conn.execute(f'PRAGMA user_version = {version + 1}')
+            conn.commit()
+            print(f"Migrated {db_path} to schema version {version + 1}")
+
+
+def _meetings_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS meetings (
+            meeting_id INTEGER PRIMARY KEY,
+            meeting_name TEXT NOT NULL,
+            description TEXT,
+            start_time INTEGER,
+            end_time INTEGER,
+            duration INTEGER,
+            agenda TEXT,
+            attendees TEXT,
+            room_name TEXT,
+            room_url TEXT,
+            created_at INTEGER,
+            transcription_status TEXT DEFAULT 'pending',
+            transcription_text TEXT,
+            transcription_error TEXT,
+            recording_file_path TEXT
+        )
+    ''')
+
+    # Room URL lookups by name from the participant webhook
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_meetings_room_name ON meetings(room_name)')
+
+
+def _meeting_attendees(conn: sqlite3.Connection):
+    """
+    Attendees normalised into a join table for filtered search. The key
+    carries created_at, so one attendee's meetings come back in date order
+    straight from the index. Existing meetings are backfilled.
+    """
+    conn.execute('''
+        CREATE TABLE meeting_attendees (
+            attendee TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            meeting_id INTEGER NOT NULL,
+            PRIMARY KEY (attendee, created_at, meeting_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX idx_meeting_attendees_meeting ON meeting_attendees(meeting_id)')
+    conn.execute('CREATE INDEX idx_meetings_created ON meetings(created_at, meeting_id)')
+
+    index_attendees(conn, (
+        (meeting_id, created_at, json.loads(attendees))
+        for meeting_id, created_at, attendees in conn.execute(
+            'SELECT meeting_id, created_at, attendees FROM meetings WHERE attendees IS NOT NULL'
+        ).fetchall()
+    ))
+
+
+def _meeting_rollups(conn: sqlite3.Connection):
+    """Meetings created per UTC day, kept current by triggers and backfilled"""
+    conn.execute('''
+        CREATE TABLE meeting_daily_stats (
+            day TEXT PRIMARY KEY,
+            meetings INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TRIGGER meeting_daily_stats_insert AFTER INSERT ON meetings
+        WHEN NEW.created_at IS NOT NULL
+        BEGIN
+            INSERT INTO meeting_daily_stats (day, meetings)
+            VALUES (date(NEW.created_at, 'unixepoch'), 1)
+            ON CONFLICT (day) DO UPDATE SET meetings = meetings + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER meeting_daily_stats_delete AFTER DELETE ON meetings
+        WHEN OLD.created_at IS NOT NULL
+        BEGIN
+            UPDATE meeting_daily_stats SET meetings = meetings - 1
+            WHERE day = date(OLD.created_at, 'unixepoch');
+        END
+    ''')
+    conn.execute('''
+        INSERT INTO meeting_daily_stats (day, meetings)
+        SELECT date(created_at, 'unixepoch'), COUNT(*) FROM meetings
+        WHERE created_at IS NOT NULL
+        GROUP BY 1
+    ''')
+
+
+def _room_presence(conn: sqlite3.Connection):
+    """
+    Who is in each room and whether it is being recorded. Earlier versions
+    created these tables from RoomPresence itself, hence IF NOT EXISTS.
+    """
+    # One row per live participant session, so duplicate webhooks are harmless
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS room_participants (
+            room_name TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            joined_at INTEGER,
+            PRIMARY KEY (room_name, session_id)
+        )
+    ''')
+    # recording_active is the idempotency guard for start/stop
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS room_recordings (
+            room_name TEXT PRIMARY KEY,
+            recording_active INTEGER DEFAULT 0,
+            started_at INTEGER,
+            stopped_at INTEGER
+        )
+    ''')
+
+
+MEETINGS_MIGRATIONS: List[Migration] = [
+    _meetings_table,
+    _meeting_attendees,
+    _meeting_rollups,
+    _room_presence
+]
+
+
+def _unified_recordings_table(conn: sqlite3.Connection):
+    """
+    One recordings table for both writers: RecordingManager's cloud
+    recordings (unique_id, status, metadata) and app.py's saved meetings
+    (participants, transcript, chat, transcription). Whichever of the two
+    old layouts exists is copied across.
+    """
+    conn.execute('''
+        CREATE TABLE recordings_unified (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unique_id TEXT UNIQUE,
+            meeting_id TEXT,
+            recording_id TEXT,
+            room_name TEXT,
+            room_url TEXT,
+            recording_url TEXT,
+            recording_file_path TEXT,
+            status TEXT DEFAULT 'pending',
+            metadata TEXT,
+            participants TEXT,
+            transcript TEXT,
+            chat_messages TEXT,
+            end_time TEXT,
+            transcription_status TEXT DEFAULT 'pending',
+            transcription_text TEXT,
+            transcription_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    existing = _columns(conn, 'recordings')
+    if existing:
+        shared = ', '.join(c for c in _columns(conn, 'recordings_unified') if c in existing)
+        conn.execute(f'INSERT INTO recordings_unified ({shared}) SELECT {shared} FROM recordings')
+        conn.execute('DROP TABLE recordings')
+    conn.execute('ALTER TABLE recordings_unified RENAME TO recordings')
+
+    # unique_id lookups use the UNIQUE constraint's index
+    conn.execute('CREATE INDEX idx_recordings_meeting ON recordings(meeting_id, created_at)')
+    conn.execute('CREATE INDEX idx_recordings_created ON recordings(created_at, id)')
+    conn.execute('CREATE INDEX idx_recordings_status_created ON recordings(status, created_at, id)')
+
+
+def _recording_versions(conn: sqlite3.Connection):
+    """
+    A row version for ETags. The trigger bumps it, and refreshes updated_at,
+    on every update, so writers that never touch either column still count.
+    """
+    conn.execute('ALTER TABLE recordings ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+    conn.execute('''
+        CREATE TRIGGER recordings_version AFTER UPDATE ON recordings
+        WHEN NEW.version = OLD.version
+        BEGIN
+            UPDATE recordings
+            SET version = OLD.version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = NEW.id;
+        END
+    ''')
+
+
+# Which rows each rollup kind counts, and the status column it counts by.
+# Cloud recordings have a unique_id; rows from the Daily.co recording
+# webhook have neither a unique_id nor participants and get transcribed.
+ROLLUP_KINDS = {
+    'recording': ('{row}.unique_id IS NOT NULL', 'status'),
+    'transcription': ('{row}.unique_id IS NULL AND {row}.participants IS NULL', 'transcription_status')
+}
+
+
+def _rollup_change(kind: str, row: str, delta: int) -> str:
+    """Trigger statement adding `delta` to the count of `row`'s (day, kind, status)"""
+    condition, column = ROLLUP_KINDS[kind]
+    condition = condition.format(row=row)
+    return f'''
+        INSERT INTO recording_daily_stats (day, kind, status, count)
+        SELECT date({row}.created_at), '{kind}', {row}.{column}, {delta}
+        WHERE {condition} AND {row}.{column} IS NOT NULL AND date({row}.created_at) IS NOT NULL
+        ON CONFLICT (day, kind, status) DO UPDATE SET count = count + {delta};
+    '''
+
+
+def _recording_rollups(conn: sqlite3.Connection):
+    """
+    Per-day rollups of recording and transcription statuses and of time
+    spent recording, maintained by triggers so that every writer keeps
+    them current in the same transaction. Counts are by the row's creation
+    day; recording time is by the day recording started, measured between
+    the status changes into and out of `recording`.
+    """
+    conn.execute('''
+        CREATE TABLE recording_daily_stats (
+            day TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, kind, status)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE recording_daily_seconds (
+            day TEXT PRIMARY KEY,
+            seconds REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('ALTER TABLE recordings ADD COLUMN recording_started_at TIMESTAMP')
+
+    kinds = list(ROLLUP_KINDS)
+    conn.execute(f'''
+        CREATE TRIGGER recording_daily_stats_insert AFTER INSERT ON recordings
+        BEGIN
+            {''.join(_rollup_change(kind, 'NEW', 1) for kind in kinds)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER recording_daily_stats_update
+        AFTER UPDATE OF status, transcription_status ON recordings
+        WHEN OLD.status IS NOT NEW.status OR OLD.transcription_status IS NOT NEW.transcription_status
+        BEGIN
+            {''.join(_rollup_change(kind, 'OLD', -1) + _rollup_change(kind, 'NEW', 1) for kind in kinds)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER recording_daily_stats_delete AFTER DELETE ON recordings
+        BEGIN
+            {''.join(_rollup_change(kind, 'OLD', -1) for kind in kinds)}
+        END
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER recording_started AFTER UPDATE OF status ON recordings
+        WHEN NEW.status = 'recording' AND OLD.status IS NOT 'recording'
+        BEGIN
+            UPDATE recordings SET recording_started_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER recording_daily_seconds_stop AFTER UPDATE OF status ON recordings
+        WHEN OLD.status = 'recording' AND NEW.status IS NOT 'recording'
+             AND OLD.recording_started_at IS NOT NULL
+        BEGIN
+            INSERT INTO recording_daily_seconds (day, seconds)
+            VALUES (
+                date(OLD.recording_started_at),
+                (julianday('now') - julianday(OLD.recording_started_at)) * 86400
+            )
+            ON CONFLICT (day) DO UPDATE SET seconds = seconds + excluded.seconds;
+        END
+    ''')
+
+    # Backfill. Recordings in progress count from their last update; past
+    # ones from the start and stop times in their metadata.
+    for kind, (condition, column) in ROLLUP_KINDS.items():
+        condition = condition.format(row='recordings')
+        conn.execute(f'''
+            INSERT INTO recording_daily_stats (day, kind, status, count)
+            SELECT date(created_at), '{kind}', {column}, COUNT(*) FROM recordings
+            WHERE {condition} AND {column} IS NOT NULL AND date(created_at) IS NOT NULL
+            GROUP BY 1, 3
+        ''')
+    conn.execute("UPDATE recordings SET recording_started_at = updated_at WHERE status = 'recording'")
+
+    seconds = {}
+    for (metadata,) in conn.execute(
+        "SELECT metadata FROM recordings WHERE unique_id IS NOT NULL AND metadata IS NOT NULL"
+    ).fetchall():
+        metadata = json.loads(decode_text(metadata))
+        try:
+            started = datetime.fromisoformat(metadata['start_time'])
+            stopped = datetime.fromisoformat(metadata['stop_time'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        day = started.date().isoformat()
+        seconds[day] = seconds.get(day, 0) + max((stopped - started).total_seconds(), 0)
+    conn.executemany('INSERT INTO recording_daily_seconds (day, seconds) VALUES (?, ?)', seconds.items())
+
+
+def _transcript_tables(conn: sqlite3.Connection):
+    """
+    Live transcript segments and the session manifests tying them to saved
+    meetings. Earlier versions created the tables from TranscriptStore,
+    hence IF NOT EXISTS; the session index by meeting is new.
+    """
+    # One row per transcript line or chat message; (session, kind, seq) makes
+    # retried uploads idempotent. WITHOUT ROWID clusters a session's rows
+    # by that key, so a page of segments is one contiguous b-tree range.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transcript_segments (
+            session_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            speaker TEXT,
+            text TEXT NOT NULL,
+            timestamp TEXT,
+            start_ms INTEGER,
+            end_ms INTEGER,
+            received_at INTEGER,
+            PRIMARY KEY (session_id, kind, seq)
+        ) WITHOUT ROWID
+    ''')
+
+    # Seek by time within a session for players jumping to a position
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transcript_segments_start
+        ON transcript_segments(session_id, kind, start_ms)
+    ''')
+
+    # Written once at meeting end with the segment counts the client sent
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transcript_sessions (
+            session_id TEXT PRIMARY KEY,
+            meeting_id TEXT,
+            transcript_count INTEGER,
+            chat_count INTEGER,
+            finalized_at INTEGER
+        )
+    ''')
+
+    # A meeting's latest session, read by every segment page and metadata fetch
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transcript_sessions_meeting
+        ON transcript_sessions(meeting_id, finalized_at)
+    ''')
+
+
+def _compressed_values(conn: sqlite3.Connection):
+    """
+    Compress the large values written before the app compressed them. The
+    space they free is reused by new rows; only a VACUUM returns it to the
+    filesystem.
+    """
+    for column in COMPRESSED_COLUMNS['recordings']:
+        compress_column(conn, 'recordings', column, commit=False)
+
+
+RECORDINGS_MIGRATIONS: List[Migration] = [
+    _unified_recordings_table,
+    _recording_versions,
+    _recording_rollups,
+    _transcript_tables,
+    _compressed_values
+]
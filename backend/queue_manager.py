@@ -1,9 +1,10 @@
-import sqlite3
 import json
 import time
 from datetime import datetime
 import threading
+from concurrent.futures import Future
 from pathlib import Path
+from db import connection
 
 class QueueManager:
     def __init__(self, db_path='queue.db'):
@@ -13,35 +14,40 @@ class QueueManager:
         self.handlers = {}
 
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_type TEXT NOT NULL,
-                payload TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                started_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                error TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        with connection(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    error TEXT
+                )
+            ''')
 
     def enqueue(self, task_type, payload):
         """Add a task to the queue"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            'INSERT INTO tasks (task_type, payload) VALUES (?, ?)',
-            (task_type, json.dumps(payload))
-        )
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return task_id
+        with connection(self.db_path) as conn:
+            cursor = conn.execute(
+                'INSERT INTO tasks (task_type, payload) VALUES (?, ?)',
+                (task_type, json.dumps(payload))
+            )
+        return cursor.lastrowid
+
+    def enqueue_many(self, task_type, payloads):
+        """Add several tasks of the same type in a single transaction"""
+        if not payloads:
+            return 0
+
+        with connection(self.db_path) as conn:
+            cursor = conn.executemany(
+                'INSERT INTO tasks (task_type, payload) VALUES (?, ?)',
+                [(task_type, json.dumps(payload)) for payload in payloads]
+            )
+        return cursor.rowcount
 
     def register_handler(self, task_type, handler):
         """Register a function to handle a specific task type"""
@@ -55,57 +61,57 @@ class QueueManager:
         if not handler:
             return
             
-        try:
-            # Mark task as started
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
+        # Mark task as started
+        with connection(self.db_path) as conn:
+            conn.execute(
                 'UPDATE tasks SET status = ?, started_at = CURRENT_TIMESTAMP WHERE id = ?',
                 ('processing', task_id)
             )
-            conn.commit()
-            
-            # Execute handler
+
+        # The connection goes back to the pool while the handler runs
+        try:
             result = handler(**json.loads(payload))
-            
-            # Mark task as completed
-            cursor.execute(
-                'UPDATE tasks SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
-                ('completed', task_id)
-            )
-            conn.commit()
-            
         except Exception as e:
-            # Mark task as failed
-            cursor.execute(
-                'UPDATE tasks SET status = ?, error = ? WHERE id = ?',
-                ('failed', str(e), task_id)
-            )
-            conn.commit()
-            print(f"Error processing task {task_id}: {str(e)}")
-            
-        finally:
-            conn.close()
+            self.finish_task(task_id, e)
+            return
+
+        if isinstance(result, Future):
+            # Handlers that hand work to a pool keep the task open until it is done
+            result.add_done_callback(lambda future: self.finish_task(task_id, future.exception()))
+        else:
+            self.finish_task(task_id)
+
+    def finish_task(self, task_id, error=None):
+        """Mark a task completed, or failed with `error`"""
+        if error is None:
+            with connection(self.db_path) as conn:
+                conn.execute(
+                    'UPDATE tasks SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
+                    ('completed', task_id)
+                )
+        else:
+            with connection(self.db_path) as conn:
+                conn.execute(
+                    'UPDATE tasks SET status = ?, error = ? WHERE id = ?',
+                    ('failed', str(error), task_id)
+                )
+            print(f"Error processing task {task_id}: {str(error)}")
 
     def run(self, interval=1):
         """Start processing tasks"""
         self.running = True
         
         while self.running:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Get pending tasks
-            cursor.execute(
-                'SELECT id, task_type, payload FROM tasks WHERE status = ? ORDER BY created_at ASC LIMIT 1',
-                ('pending',)
-            )
-            task = cursor.fetchone()
+            with connection(self.db_path) as conn:
+                task = conn.execute(
+                    'SELECT id, task_type, payload FROM tasks WHERE status = ? ORDER BY created_at ASC LIMIT 1',
+                    ('pending',)
+                ).fetchone()
             
             if task:
                 self.process_task(task)
             
-            conn.close()
             time.sleep(interval)
 
     def start(self):
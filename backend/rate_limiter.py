@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        """Token bucket allowing `rate` calls per second with bursts of `burst`"""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, otherwise return how long to wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a call is allowed under the shared limit"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a call is allowed"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
@@ -1,42 +1,55 @@
 import uuid
 from datetime import datetime
 import json
-import sqlite3
-from pathlib import Path
-from typing import Dict, Any, Optional
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from prometheus_client import Counter
+from pagination import encode_cursor, decode_cursor, page_size
+from blob_codec import encode_text, decode_text
+from db import connection
+from migrations import run_migrations, RECORDINGS_MIGRATIONS
+from status_events import status_events, recording_key, meeting_key
+
+recording_cache_lookups = Counter(
+    'recording_cache_lookups_total',
+    'Recording lookups by unique ID, by whether the in-process cache answered',
+    ['result']
+)
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a JSON merge patch (RFC 7396) the way SQLite's json_patch does"""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
 
 class RecordingManager:
-    def __init__(self, db_path: str = 'database/recordings.db'):
+    def __init__(self, db_path: str = 'database/recordings.db', cache_size: int = 0, cache_ttl: float = 5.0):
+        """
+        With `cache_size` > 0, up to that many recently read recordings are
+        kept in memory. This instance's own writes evict the entry at once;
+        `cache_ttl` bounds how long writes from other processes go unseen.
+        """
         self.db_path = db_path
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        # Bumped on every write, so a read that raced a write is not cached
+        self.cache_epoch = 0
         self._init_db()
 
     def _init_db(self):
-        """Initialize the recordings database with enhanced schema"""
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Enhanced schema with unique ID and additional metadata
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS recordings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                unique_id TEXT UNIQUE NOT NULL,
-                meeting_id TEXT NOT NULL,
-                recording_id TEXT NOT NULL,
-                room_name TEXT,
-                room_url TEXT,
-                recording_url TEXT,
-                recording_file_path TEXT,
-                status TEXT DEFAULT 'pending',
-                metadata TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(unique_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Bring the recordings database up to the current schema version"""
+        run_migrations(self.db_path, RECORDINGS_MIGRATIONS)
 
     def generate_unique_id(self) -> str:
         """Generate a unique ID for a recording"""
@@ -47,10 +60,9 @@ class RecordingManager:
         unique_id = self.generate_unique_id()
         recording_id = f"rec_{meeting_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
             cursor.execute('''
                 INSERT INTO recordings (
                     unique_id, meeting_id, recording_id, room_name, room_url, status, metadata
@@ -62,58 +74,167 @@ class RecordingManager:
                 room_name,
                 room_url,
                 'pending',
-                json.dumps({
+                encode_text(json.dumps({
                     'created_at': datetime.now().isoformat(),
                     'room_name': room_name,
                     'room_url': room_url
-                })
+                }))
             ))
             
             conn.commit()
-            
-            return {
-                'unique_id': unique_id,
-                'recording_id': recording_id,
-                'meeting_id': meeting_id
-            }
-            
-        finally:
-            conn.close()
+
+        self._invalidate(unique_id)
+        self._publish(unique_id, meeting_id, 'pending')
+        return {
+            'unique_id': unique_id,
+            'recording_id': recording_id,
+            'meeting_id': meeting_id
+        }
 
     def update_recording_status(self, unique_id: str, status: str, metadata: Optional[Dict[str, Any]] = None):
         """Update the status and metadata of a recording"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
             if metadata:
                 cursor.execute('''
                     UPDATE recordings 
                     SET status = ?, metadata = ?, updated_at = CURRENT_TIMESTAMP 
                     WHERE unique_id = ?
-                ''', (status, json.dumps(metadata), unique_id))
+                    RETURNING meeting_id
+                ''', (status, encode_text(json.dumps(metadata)), unique_id))
             else:
                 cursor.execute('''
                     UPDATE recordings 
                     SET status = ?, updated_at = CURRENT_TIMESTAMP 
                     WHERE unique_id = ?
+                    RETURNING meeting_id
                 ''', (status, unique_id))
-            
+            row = cursor.fetchone()
+
             conn.commit()
-            
+
+        self._invalidate(unique_id)
+        if row:
+            self._publish(unique_id, row[0], status)
+
+    def patch_metadata(
+        self,
+        unique_id: str,
+        changes: Dict[str, Any],
+        status: Optional[str] = None,
+        expected_status: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge `changes` into a recording's metadata in one atomic statement,
+        optionally setting `status` too. Nested objects are merged and keys
+        set to None are removed (JSON merge patch). With `expected_status`
+        nothing changes unless the recording currently has that status.
+        Returns the merged metadata, or None if nothing was updated.
+        """
+        try:
+            patched = self._patch_metadata(unique_id, changes, status, expected_status)
         finally:
-            conn.close()
+            self._invalidate(unique_id)
+        if not patched:
+            return None
+
+        metadata, meeting_id = patched
+        if status:
+            self._publish(unique_id, meeting_id, status)
+        return metadata
+
+    def _patch_metadata(
+        self,
+        unique_id: str,
+        changes: Dict[str, Any],
+        status: Optional[str],
+        expected_status: Optional[str]
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        with connection(self.db_path) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('''
+                UPDATE recordings
+                SET metadata = json_patch(COALESCE(metadata, '{}'), ?),
+                    status = COALESCE(?, status),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE unique_id = ? AND (? IS NULL OR status = ?)
+                  AND typeof(metadata) != 'blob'
+                RETURNING metadata, meeting_id
+            ''', (json.dumps(changes), status, unique_id, expected_status, expected_status)).fetchone()
+            if row:
+                return json.loads(row[0]), row[1]
+
+            # Compressed metadata cannot go through json_patch; merge it here
+            # while the write lock taken above keeps other updaters out
+            row = conn.execute('''
+                SELECT metadata, meeting_id FROM recordings
+                WHERE unique_id = ? AND (? IS NULL OR status = ?) AND typeof(metadata) = 'blob'
+            ''', (unique_id, expected_status, expected_status)).fetchone()
+            if not row:
+                return None
+
+            metadata = merge_patch(json.loads(decode_text(row[0])), changes)
+            conn.execute('''
+                UPDATE recordings
+                SET metadata = ?, status = COALESCE(?, status), updated_at = CURRENT_TIMESTAMP
+                WHERE unique_id = ?
+            ''', (encode_text(json.dumps(metadata)), status, unique_id))
+            return metadata, row[1]
+
+    def _invalidate(self, unique_id: str):
+        # Called after the write has committed
+        with self.cache_lock:
+            self.cache.pop(unique_id, None)
+            self.cache_epoch += 1
+
+    def _publish(self, unique_id: str, meeting_id: str, status: str):
+        # Also called after commit, so a subscriber that reloads sees the new status
+        status_events.publish(
+            'status',
+            {'unique_id': unique_id, 'meeting_id': meeting_id, 'status': status},
+            recording_key(unique_id),
+            meeting_key(meeting_id)
+        )
 
     def get_recording_metadata(self, unique_id: str) -> Optional[Dict[str, Any]]:
-        """Get recording metadata by unique ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        """Get recording metadata by unique ID, from the cache when enabled"""
+        if not self.cache_size:
+            return self._load_recording(unique_id)
+
+        now = time.monotonic()
+        with self.cache_lock:
+            entry = self.cache.get(unique_id)
+            if entry and now - entry[0] < self.cache_ttl:
+                self.cache.move_to_end(unique_id)
+                recording_cache_lookups.labels(result='hit').inc()
+                return pickle.loads(entry[1])
+            epoch = self.cache_epoch
+
+        recording_cache_lookups.labels(result='miss').inc()
+        recording = self._load_recording(unique_id)
+        if recording is None:
+            return None
+
+        # Kept pickled so every caller gets its own copy to mutate, at a
+        # fraction of the cost of copy.deepcopy
+        snapshot = pickle.dumps(recording)
+        with self.cache_lock:
+            if self.cache_epoch == epoch:
+                self.cache[unique_id] = (now, snapshot)
+                self.cache.move_to_end(unique_id)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return recording
+
+    def _load_recording(self, unique_id: str) -> Optional[Dict[str, Any]]:
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
             cursor.execute('''
                 SELECT unique_id, meeting_id, recording_id, room_name, room_url, 
                        recording_url, recording_file_path, status, metadata,
-                       created_at, updated_at
+                       created_at, updated_at, version
                 FROM recordings 
                 WHERE unique_id = ?
             ''', (unique_id,))
@@ -131,46 +252,108 @@ class RecordingManager:
                 'recording_url': row[5],
                 'recording_file_path': row[6],
                 'status': row[7],
-                'metadata': json.loads(row[8]) if row[8] else {},
+                'metadata': json.loads(decode_text(row[8])) if row[8] else {},
                 'created_at': row[9],
-                'updated_at': row[10]
+                'updated_at': row[10],
+                'version': row[11]
             }
-            
-        finally:
-            conn.close()
 
-    def list_recordings(self, status: Optional[str] = None) -> list:
-        """List all recordings, optionally filtered by status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+    def get_recording_version(self, unique_id: str) -> Optional[Tuple[int, str]]:
+        """(version, updated_at) of a recording without loading it, or None"""
+        with connection(self.db_path) as conn:
+            return conn.execute(
+                'SELECT version, updated_at FROM recordings WHERE unique_id = ?',
+                (unique_id,)
+            ).fetchone()
+
+    def get_latest_recording(self, meeting_id: str, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the most recent recording of a meeting, optionally with a given status"""
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
             if status:
                 cursor.execute('''
-                    SELECT unique_id, meeting_id, recording_id, status, metadata, created_at
-                    FROM recordings 
-                    WHERE status = ?
-                    ORDER BY created_at DESC
-                ''', (status,))
+                    SELECT unique_id FROM recordings 
+                    WHERE meeting_id = ? AND status = ?
+                    ORDER BY created_at DESC LIMIT 1
+                ''', (meeting_id, status))
             else:
                 cursor.execute('''
-                    SELECT unique_id, meeting_id, recording_id, status, metadata, created_at
-                    FROM recordings 
-                    ORDER BY created_at DESC
-                ''')
-            
-            recordings = []
-            for row in cursor.fetchall():
-                recordings.append({
-                    'unique_id': row[0],
-                    'meeting_id': row[1],
-                    'recording_id': row[2],
-                    'status': row[3],
-                    'metadata': json.loads(row[4]) if row[4] else {},
-                    'created_at': row[5]
-                })
+                    SELECT unique_id FROM recordings 
+                    WHERE meeting_id = ?
+                    ORDER BY created_at DESC LIMIT 1
+                ''', (meeting_id,))
             
-            return recordings
-            
-        finally:
-            conn.close() 
\ No newline at end of file
+            row = cursor.fetchone()
+
+        return self.get_recording_metadata(row[0]) if row else None
+
+    def list_recordings(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_metadata: bool = False
+    ) -> Dict[str, Any]:
+        """
+        One page of recordings, newest first, optionally filtered by status.
+        Pass the returned next_cursor to fetch the following page.
+        """
+        limit = page_size(limit)
+        columns = 'id, unique_id, meeting_id, recording_id, room_name, status, created_at, updated_at'
+        if include_metadata:
+            columns += ', metadata'
+        rows = self._page_rows(columns, status, limit, cursor)
+
+        recordings = []
+        for row in rows[:limit]:
+            recording = {
+                'unique_id': row[1],
+                'meeting_id': row[2],
+                'recording_id': row[3],
+                'room_name': row[4],
+                'status': row[5],
+                'created_at': row[6],
+                'updated_at': row[7]
+            }
+            if include_metadata:
+                recording['metadata'] = json.loads(decode_text(row[8])) if row[8] else {}
+            recordings.append(recording)
+
+        last = rows[limit - 1] if len(rows) > limit else None
+        return {
+            'recordings': recordings,
+            'next_cursor': encode_cursor(last[6], last[0]) if last else None
+        }
+
+    def list_versions(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Tuple[int, int]]:
+        """(id, version) of the rows list_recordings would return, including the look-ahead row"""
+        return self._page_rows('id, version', status, page_size(limit), cursor)
+
+    def _page_rows(self, columns: str, status: Optional[str], limit: int, cursor: Optional[str]) -> List[Tuple]:
+        after = decode_cursor(cursor)
+
+        # Saved meetings from app.py share the table but have no unique_id
+        conditions, params = ['unique_id IS NOT NULL'], []
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if after:
+            # Row-value comparison keeps the seek on the (created_at, id) index
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}"
+
+        with connection(self.db_path) as conn:
+            return conn.execute(f'''
+                SELECT {columns}
+                FROM recordings
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (*params, limit + 1)).fetchall()
@@ -0,0 +1,99 @@
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+recording_starts_waiting = Gauge(
+    'recording_starts_waiting',
+    'Recording starts queued behind the concurrency cap'
+)
+recording_start_queue_wait = Histogram(
+    'recording_start_queue_wait_seconds',
+    'Time from scheduling a recording start to its first Daily.co attempt',
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+)
+recording_start_latency = Histogram(
+    'recording_start_latency_seconds',
+    'Time from the first Daily.co attempt to a started recording, retries included',
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+)
+recording_start_attempts = Counter(
+    'recording_start_attempts_total',
+    'Daily.co recording start attempts by outcome',
+    ['outcome']
+)
+
+# Daily.co answers worth retrying: rate limiting and server errors
+RETRYABLE_STATUS = (429,)
+
+
+def is_retryable(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUS or status_code >= 500
+
+
+def retry_with_backoff(
+    send: Callable,
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0
+) -> Tuple[object, int]:
+    """
+    Call `send` until it returns a non-retryable response, sleeping with
+    exponential backoff and full jitter between attempts. Honours Retry-After
+    on 429s. Returns the last response and the number of attempts made.
+    """
+    for attempt in range(1, max_attempts + 1):
+        response = send()
+
+        if not is_retryable(response.status_code):
+            recording_start_attempts.labels(outcome='ok' if response.status_code == 200 else 'rejected').inc()
+            return response, attempt
+
+        recording_start_attempts.labels(outcome='retryable').inc()
+        if attempt == max_attempts:
+            return response, attempt
+
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+        retry_after = response.headers.get('Retry-After') if response.status_code == 429 else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(max_delay, int(retry_after)))
+
+        print(f"Recording start got {response.status_code}, retrying in {delay:.1f}s (attempt {attempt})")
+        time.sleep(delay)
+
+
+class RecordingStartScheduler:
+    def __init__(self, start_func: Callable, max_concurrent: int = 4, max_jitter: float = 2.0):
+        """
+        Run `start_func(meeting_id, room_url, queue_wait=...)` on at most
+        `max_concurrent` threads, spreading each start by up to `max_jitter`
+        seconds so a burst of meetings does not hit Daily.co in lockstep
+        """
+        self.start_func = start_func
+        self.max_jitter = max_jitter
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='recording-start')
+
+    def submit(self, meeting_id: str, room_url: str) -> Future:
+        """Schedule a recording start; the Future holds its result or exception"""
+        recording_starts_waiting.inc()
+        return self.executor.submit(self._run, meeting_id, room_url, time.monotonic())
+
+    def _run(self, meeting_id: str, room_url: str, queued_at: float):
+        recording_starts_waiting.dec()
+        time.sleep(random.uniform(0, self.max_jitter))
+
+        queue_wait = time.monotonic() - queued_at
+        recording_start_queue_wait.observe(queue_wait)
+
+        try:
+            return self.start_func(meeting_id, room_url, queue_wait=queue_wait)
+        except Exception as e:
+            # start_func records the failure on the recording itself; the
+            # Future carries it on to whoever scheduled the start
+            print(f"Scheduled recording start for {meeting_id} failed: {str(e)}")
+            raise
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
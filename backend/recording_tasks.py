@@ -2,9 +2,14 @@ import os
 import boto3
 import requests
 import json
+import time
 from datetime import datetime
 from dotenv import load_dotenv
+from botocore.config import Config
+from circuit_breaker import daily_breaker, download_breaker, s3_breaker
 from recording_manager import RecordingManager
+from recording_scheduler import recording_start_latency, retry_with_backoff
+from metadata_sync import MetadataWriteBehind
 
 # Load environment variables
 load_dotenv()
@@ -14,18 +19,38 @@ s3_client = boto3.client(
     's3',
     aws_access_key_id=os.getenv('s3_access_key'),
     aws_secret_access_key=os.getenv('s3_secret_access_key'),
-    region_name=os.getenv('AWS_REGION', 'us-east-1')
+    region_name=os.getenv('AWS_REGION', 'us-east-1'),
+    config=Config(connect_timeout=5, read_timeout=30, retries={'max_attempts': 2})
 )
 
 BUCKET_NAME = os.getenv('S3_BUCKET_NAME')
 DAILY_API_KEY = os.getenv('DAILY_API_KEY')
+DAILY_TIMEOUT = float(os.getenv('DAILY_TIMEOUT', 10))
+DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', 60))  # seconds without data before a download is abandoned
+RECORDING_START_ATTEMPTS = int(os.getenv('RECORDING_START_ATTEMPTS', 5))
+METADATA_FLUSH_INTERVAL = float(os.getenv('METADATA_FLUSH_INTERVAL', 2))
+RECORDING_CACHE_SIZE = int(os.getenv('RECORDING_CACHE_SIZE', 1000))
+RECORDING_CACHE_TTL = float(os.getenv('RECORDING_CACHE_TTL', 5))
 
-# Initialize recording manager
-recording_manager = RecordingManager()
+# Initialize recording manager, shared with app.py so its writes invalidate the read cache
+recording_manager = RecordingManager(cache_size=RECORDING_CACHE_SIZE, cache_ttl=RECORDING_CACHE_TTL)
 
-def start_meeting_recording(meeting_id: str, room_url: str):
+def upload_metadata(unique_id: str, metadata: dict):
+    """Mirror a recording's metadata to S3"""
+    s3_breaker.call(
+        s3_client.put_object,
+        Bucket=BUCKET_NAME,
+        Key=f"recordings/{unique_id}/metadata.json",
+        Body=json.dumps(metadata)
+    )
+
+# The database is the source of truth; S3 gets the latest metadata in the background
+metadata_writer = MetadataWriteBehind('recording_tasks', upload_metadata, interval=METADATA_FLUSH_INTERVAL)
+
+def start_meeting_recording(meeting_id: str, room_url: str, queue_wait: float = None):
     """
-    Start recording a meeting when it begins
+    Start recording a meeting when it begins, retrying rate limits and 5xx
+    responses from Daily.co with backoff
     """
     try:
         # Create recording entry and get unique ID
@@ -36,7 +61,9 @@ def start_meeting_recording(meeting_id: str, room_url: str):
         )
         
         # Start Daily.co recording with enhanced settings
-        response = requests.post(
+        started = time.monotonic()
+        response, attempts = retry_with_backoff(lambda: daily_breaker.call(
+            requests.post,
             f"https://api.daily.co/v1/rooms/{meeting_id}/recordings",
             headers={
                 "Authorization": f"Bearer {DAILY_API_KEY}",
@@ -59,18 +86,28 @@ def start_meeting_recording(meeting_id: str, room_url: str):
                     "include_video": True,
                     "include_participant_audio": True
                 }
-            }
-        )
+            },
+            timeout=DAILY_TIMEOUT
+        ), max_attempts=RECORDING_START_ATTEMPTS)
+        start_latency = time.monotonic() - started
+        start_stats = {
+            "queue_wait_seconds": round(queue_wait, 3) if queue_wait is not None else None,
+            "start_latency_seconds": round(start_latency, 3),
+            "attempts": attempts
+        }
         
         if response.status_code != 200:
-            recording_manager.update_recording_status(
+            metadata = recording_manager.patch_metadata(
                 recording_info['unique_id'],
-                'failed',
-                {'error': f"Failed to start recording: {response.text}"}
+                {'error': f"Failed to start recording: {response.text}", 'start_stats': start_stats},
+                status='failed'
             )
+            if metadata:
+                metadata_writer.put(recording_info['unique_id'], metadata)
             raise Exception(f"Failed to start recording: {response.text}")
+        
+        recording_start_latency.observe(start_latency)
             
-        # Store recording metadata in S3
         metadata = {
             "meeting_id": meeting_id,
             "recording_id": recording_info['recording_id'],
@@ -84,21 +121,18 @@ def start_meeting_recording(meeting_id: str, room_url: str):
                 "has_video": True,
                 "has_audio": True,
                 "layout": "gallery"
-            }
+            },
+            "start_stats": start_stats
         }
         
-        s3_client.put_object(
-            Bucket=BUCKET_NAME,
-            Key=f"recordings/{recording_info['unique_id']}/metadata.json",
-            Body=json.dumps(metadata)
-        )
-        
         # Update recording status
-        recording_manager.update_recording_status(
+        metadata = recording_manager.patch_metadata(
             recording_info['unique_id'],
-            'recording',
-            metadata
+            metadata,
+            status='recording'
         )
+        if metadata:
+            metadata_writer.put(recording_info['unique_id'], metadata)
         
         return recording_info['unique_id']
         
@@ -106,6 +140,44 @@ def start_meeting_recording(meeting_id: str, room_url: str):
         print(f"Error starting recording: {str(e)}")
         raise
 
+def stop_meeting_recording(meeting_id: str):
+    """
+    Stop recording a meeting once its room is empty
+    """
+    try:
+        response = daily_breaker.call(
+            requests.post,
+            f"https://api.daily.co/v1/rooms/{meeting_id}/recordings/stop",
+            headers={
+                "Authorization": f"Bearer {DAILY_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            timeout=DAILY_TIMEOUT
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to stop recording: {response.text}")
+        
+        # Mark the active recording as stopped; processing picks it up from here
+        recording_info = recording_manager.get_latest_recording(meeting_id, status='recording')
+        if recording_info:
+            metadata = recording_manager.patch_metadata(
+                recording_info['unique_id'],
+                {
+                    "status": "stopped",
+                    "stop_time": datetime.now().isoformat()
+                },
+                status='stopped',
+                expected_status='recording'
+            )
+            if metadata:
+                metadata_writer.put(recording_info['unique_id'], metadata)
+            return recording_info['unique_id']
+        
+    except Exception as e:
+        print(f"Error stopping recording: {str(e)}")
+        raise
+
 def process_completed_recording(recording_id: str):
     """
     Process a completed recording
@@ -117,17 +189,21 @@ def process_completed_recording(recording_id: str):
             raise Exception(f"Recording not found: {recording_id}")
         
         # Get recording from Daily.co
-        response = requests.get(
+        response = daily_breaker.call(
+            requests.get,
             f"https://api.daily.co/v1/recordings/{recording_info['recording_id']}",
-            headers={"Authorization": f"Bearer {DAILY_API_KEY}"}
+            headers={"Authorization": f"Bearer {DAILY_API_KEY}"},
+            timeout=DAILY_TIMEOUT
         )
         
         if response.status_code != 200:
-            recording_manager.update_recording_status(
+            metadata = recording_manager.patch_metadata(
                 recording_id,
-                'failed',
-                {'error': f"Failed to get recording: {response.text}"}
+                {'error': f"Failed to get recording: {response.text}"},
+                status='failed'
             )
+            if metadata:
+                metadata_writer.put(recording_id, metadata)
             raise Exception(f"Failed to get recording: {response.text}")
             
         recording_data = response.json()
@@ -135,36 +211,34 @@ def process_completed_recording(recording_id: str):
         # Download recording
         recording_url = recording_data.get('download_url')
         if recording_url:
-            recording_response = requests.get(recording_url)
+            recording_response = download_breaker.call(
+                requests.get,
+                recording_url,
+                timeout=(DAILY_TIMEOUT, DOWNLOAD_TIMEOUT)
+            )
+            if recording_response.status_code != 200:
+                raise Exception(f"Failed to download recording: {recording_response.status_code}")
             
             # Upload to S3
-            s3_client.put_object(
+            s3_breaker.call(
+                s3_client.put_object,
                 Bucket=BUCKET_NAME,
                 Key=f"recordings/{recording_id}/recording.mp4",
                 Body=recording_response.content
             )
             
-            # Update metadata
-            metadata = recording_info.get('metadata', {})
-            metadata.update({
-                "status": "completed",
-                "end_time": datetime.now().isoformat(),
-                "s3_path": f"recordings/{recording_id}/recording.mp4"
-            })
-            
-            # Update S3 metadata
-            s3_client.put_object(
-                Bucket=BUCKET_NAME,
-                Key=f"recordings/{recording_id}/metadata.json",
-                Body=json.dumps(metadata)
-            )
-            
-            # Update recording status in database
-            recording_manager.update_recording_status(
+            # Update recording status and metadata in database
+            metadata = recording_manager.patch_metadata(
                 recording_id,
-                'completed',
-                metadata
+                {
+                    "status": "completed",
+                    "end_time": datetime.now().isoformat(),
+                    "s3_path": f"recordings/{recording_id}/recording.mp4"
+                },
+                status='completed'
             )
+            if metadata:
+                metadata_writer.put(recording_id, metadata)
             
             return {
                 "unique_id": recording_id,
@@ -173,11 +247,13 @@ def process_completed_recording(recording_id: str):
     
     except Exception as e:
         print(f"Error processing recording: {str(e)}")
-        recording_manager.update_recording_status(
+        metadata = recording_manager.patch_metadata(
             recording_id,
-            'failed',
-            {'error': str(e)}
+            {'error': str(e)},
+            status='failed'
         )
+        if metadata:
+            metadata_writer.put(recording_id, metadata)
         raise
 
 def cleanup_old_recordings(days_old: int = 30):
@@ -186,7 +262,8 @@ def cleanup_old_recordings(days_old: int = 30):
     """
     try:
         # List objects in the recordings folder
-        response = s3_client.list_objects_v2(
+        response = s3_breaker.call(
+            s3_client.list_objects_v2,
             Bucket=BUCKET_NAME,
             Prefix="recordings/"
         )
@@ -199,15 +276,19 @@ def cleanup_old_recordings(days_old: int = 30):
                 if len(path_parts) >= 2:
                     unique_id = path_parts[1]
                     
+                    # Don't re-create metadata.json after it is deleted
+                    metadata_writer.discard(unique_id)
+                    
                     # Update recording status
-                    recording_manager.update_recording_status(
+                    recording_manager.patch_metadata(
                         unique_id,
-                        'deleted',
-                        {'deleted_at': datetime.now().isoformat()}
+                        {'deleted_at': datetime.now().isoformat()},
+                        status='deleted'
                     )
                 
                 # Delete from S3
-                s3_client.delete_object(
+                s3_breaker.call(
+                    s3_client.delete_object,
                     Bucket=BUCKET_NAME,
                     Key=obj['Key']
                 )
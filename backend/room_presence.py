@@ -0,0 +1,78 @@
+import time
+
+from db import connection
+from migrations import run_migrations, MEETINGS_MIGRATIONS
+
+
+class RoomPresence:
+    def __init__(self, db_path: str = 'meetings.db'):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        """Bring the participant and per-room recording guard tables up to date"""
+        run_migrations(self.db_path, MEETINGS_MIGRATIONS)
+
+    def participant_joined(self, room_name: str, session_id: str) -> bool:
+        """Record a join, returning True if this join should start the recording"""
+        with connection(self.db_path) as conn:
+            # BEGIN IMMEDIATE serialises concurrent webhook deliveries for the guard check
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR IGNORE INTO room_participants (room_name, session_id, joined_at) VALUES (?, ?, ?)',
+                (room_name, session_id, int(time.time()))
+            )
+            conn.execute('INSERT OR IGNORE INTO room_recordings (room_name) VALUES (?)', (room_name,))
+            cursor = conn.execute('''
+                UPDATE room_recordings
+                SET recording_active = 1, started_at = ?, stopped_at = NULL
+                WHERE room_name = ? AND recording_active = 0
+            ''', (int(time.time()), room_name))
+            return cursor.rowcount == 1
+
+    def participant_left(self, room_name: str, session_id: str) -> bool:
+        """Record a leave, returning True if the room is now empty and recording should stop"""
+        with connection(self.db_path) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'DELETE FROM room_participants WHERE room_name = ? AND session_id = ?',
+                (room_name, session_id)
+            )
+            cursor = conn.execute('''
+                UPDATE room_recordings
+                SET recording_active = 0, stopped_at = ?
+                WHERE room_name = ? AND recording_active = 1
+                  AND NOT EXISTS (SELECT 1 FROM room_participants WHERE room_name = ?)
+            ''', (int(time.time()), room_name, room_name))
+            return cursor.rowcount == 1
+
+    def recording_failed(self, room_name: str) -> bool:
+        """Clear the guard after a start that failed, so the next join tries again"""
+        with connection(self.db_path) as conn:
+            cursor = conn.execute('''
+                UPDATE room_recordings
+                SET recording_active = 0, stopped_at = ?
+                WHERE room_name = ? AND recording_active = 1
+            ''', (int(time.time()), room_name))
+            return cursor.rowcount == 1
+
+    def recording_wanted(self, room_name: str) -> bool:
+        """
+        Whether a room should still be recorded. False once the room has
+        emptied; rooms that never saw a join are not tracked and count as
+        wanted, since their recording started at creation.
+        """
+        with connection(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT recording_active FROM room_recordings WHERE room_name = ?',
+                (room_name,)
+            ).fetchone()
+        return row is None or bool(row[0])
+
+    def participant_count(self, room_name: str) -> int:
+        """Number of participants currently in a room"""
+        with connection(self.db_path) as conn:
+            return conn.execute(
+                'SELECT COUNT(*) FROM room_participants WHERE room_name = ?',
+                (room_name,)
+            ).fetchone()[0]
@@ -0,0 +1,193 @@
+import itertools
+import re
+from typing import Any, Dict, List, Optional
+
+from db import connection
+
+SNIPPET_TOKENS = 12
+SEARCH_TYPES = ('transcript', 'chat', 'meeting')
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 query: every word must match, the last
+    one as a prefix so results appear while the user is still typing
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def interleave(*ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge hit lists whose scores come from different FTS5 indexes. bm25
+    depends on each index's own document counts and lengths, so the scores
+    are not comparable; take each list's next best hit in turn instead.
+    """
+    merged = []
+    for hits in itertools.zip_longest(*ranked):
+        merged.extend(hit for hit in hits if hit is not None)
+    return merged
+
+
+class SearchIndex:
+    def __init__(self, segments_db: str = 'database/recordings.db', meetings_db: str = 'meetings.db'):
+        """
+        FTS5 indexes kept current by triggers: transcript and chat segments
+        next to their table, and meeting names and descriptions in meetings.db
+        """
+        self.segments_db = segments_db
+        self.meetings_db = meetings_db
+        self._init_segments_index()
+        self._init_meetings_index()
+
+    def _init_segments_index(self):
+        """Create the segment index and its insert trigger, backfilling existing rows"""
+        with connection(self.segments_db) as conn:
+            cursor = conn.cursor()
+
+            # transcript_segments is WITHOUT ROWID, so the index keeps its own copy
+            # of the text plus the key columns needed to point back at the segment
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                    text,
+                    speaker,
+                    session_id UNINDEXED,
+                    kind UNINDEXED,
+                    seq UNINDEXED,
+                    start_ms UNINDEXED,
+                    tokenize = 'porter unicode61'
+                )
+            ''')
+
+            # INSERT OR IGNORE duplicates never fire this, so retries are not double-indexed
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_insert
+                AFTER INSERT ON transcript_segments BEGIN
+                    INSERT INTO segments_fts (text, speaker, session_id, kind, seq, start_ms)
+                    VALUES (new.text, new.speaker, new.session_id, new.kind, new.seq, new.start_ms);
+                END
+            ''')
+
+            if cursor.execute('SELECT COUNT(*) FROM segments_fts').fetchone()[0] == 0:
+                cursor.execute('''
+                    INSERT INTO segments_fts (text, speaker, session_id, kind, seq, start_ms)
+                    SELECT text, speaker, session_id, kind, seq, start_ms FROM transcript_segments
+                ''')
+
+    def _init_meetings_index(self):
+        """Create the external-content meeting index and its sync triggers"""
+        with connection(self.meetings_db) as conn:
+            cursor = conn.cursor()
+
+            # meeting_id is the rowid of meetings, so the index stores no text of its own
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+                    meeting_name,
+                    description,
+                    content = 'meetings',
+                    content_rowid = 'meeting_id',
+                    tokenize = 'porter unicode61'
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS meetings_fts_insert AFTER INSERT ON meetings BEGIN
+                    INSERT INTO meetings_fts (rowid, meeting_name, description)
+                    VALUES (new.meeting_id, new.meeting_name, new.description);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS meetings_fts_delete AFTER DELETE ON meetings BEGIN
+                    INSERT INTO meetings_fts (meetings_fts, rowid, meeting_name, description)
+                    VALUES ('delete', old.meeting_id, old.meeting_name, old.description);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS meetings_fts_update
+                AFTER UPDATE OF meeting_name, description ON meetings BEGIN
+                    INSERT INTO meetings_fts (meetings_fts, rowid, meeting_name, description)
+                    VALUES ('delete', old.meeting_id, old.meeting_name, old.description);
+                    INSERT INTO meetings_fts (rowid, meeting_name, description)
+                    VALUES (new.meeting_id, new.meeting_name, new.description);
+                END
+            ''')
+
+            indexed = cursor.execute('SELECT COUNT(*) FROM meetings_fts_docsize').fetchone()[0]
+            if indexed == 0 and cursor.execute('SELECT 1 FROM meetings LIMIT 1').fetchone():
+                cursor.execute("INSERT INTO meetings_fts (meetings_fts) VALUES ('rebuild')")
+
+    def _search_segments(self, query: str, kinds: List[str], limit: int) -> List[Dict[str, Any]]:
+        with connection(self.segments_db) as conn:
+            placeholders = ', '.join('?' for _ in kinds)
+            rows = conn.execute(f'''
+                SELECT f.kind, f.session_id, s.meeting_id, f.seq, f.start_ms, f.speaker,
+                       snippet(segments_fts, 0, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}),
+                       bm25(segments_fts)
+                FROM segments_fts f
+                LEFT JOIN transcript_sessions s ON s.session_id = f.session_id
+                WHERE segments_fts MATCH ? AND f.kind IN ({placeholders})
+                ORDER BY bm25(segments_fts)
+                LIMIT ?
+            ''', (query, *kinds, limit)).fetchall()
+
+        return [
+            {
+                'type': row[0],
+                'session_id': row[1],
+                'meeting_id': row[2],
+                'seq': row[3],
+                'start_ms': row[4],
+                'speaker': row[5],
+                'snippet': row[6],
+                'score': row[7]
+            }
+            for row in rows
+        ]
+
+    def _search_meetings(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        with connection(self.meetings_db) as conn:
+            rows = conn.execute(f'''
+                SELECT m.meeting_id, m.meeting_name, m.room_name, m.start_time,
+                       snippet(meetings_fts, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}),
+                       bm25(meetings_fts)
+                FROM meetings_fts
+                JOIN meetings m ON m.meeting_id = meetings_fts.rowid
+                WHERE meetings_fts MATCH ?
+                ORDER BY bm25(meetings_fts)
+                LIMIT ?
+            ''', (query, limit)).fetchall()
+
+        return [
+            {
+                'type': 'meeting',
+                'meeting_id': row[0],
+                'meeting_name': row[1],
+                'room_name': row[2],
+                'start_time': row[3],
+                'snippet': row[4],
+                'score': row[5]
+            }
+            for row in rows
+        ]
+
+    def search(self, text: str, types: List[str] = SEARCH_TYPES, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Best `limit` hits across the requested types. Transcript and chat
+        hits share an index and are ranked together; meeting hits are
+        ranked in theirs and interleaved with them.
+        """
+        query = fts_query(text)
+        if query is None:
+            return []
+
+        ranked = []
+        kinds = [kind for kind in types if kind != 'meeting']
+        if kinds:
+            ranked.append(self._search_segments(query, kinds, limit))
+        if 'meeting' in types:
+            ranked.append(self._search_meetings(query, limit))
+        return interleave(*ranked)[:limit]
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from prometheus_client import Counter
+
+singleflight_calls = Counter(
+    'singleflight_calls_total',
+    'Calls through a singleflight group, by whether they led or joined an in-flight call',
+    ['group', 'role']
+)
+
+
+class _LeaderAborted(Exception):
+    """Handed to followers when the leading call was cancelled rather than failed"""
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        """
+        Coalesce concurrent calls with the same key into one upstream call
+        whose result, or exception, is shared by every caller. If the
+        leading caller is cancelled, a waiting caller takes over the call.
+        """
+        self.name = name
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def _join(self, key: str):
+        """Return the in-flight future for `key` and whether this caller leads it"""
+        with self.lock:
+            future = self.calls.get(key)
+            if future is not None:
+                singleflight_calls.labels(group=self.name, role='follower').inc()
+                return future, False
+            future = Future()
+            self.calls[key] = future
+            singleflight_calls.labels(group=self.name, role='leader').inc()
+            return future, True
+
+    def _finish(self, key: str, future: Future, error: BaseException = None):
+        with self.lock:
+            self.calls.pop(key, None)
+        if error is None:
+            return
+        # Cancellation and interrupts belong to the leader alone; followers
+        # retry and one of them leads a fresh call
+        future.set_exception(error if isinstance(error, Exception) else _LeaderAborted())
+
+    def do(self, key: str, func: Callable, *args, **kwargs):
+        """Run `func` unless an identical call is in flight, then share its outcome"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except _LeaderAborted:
+                continue
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: str, func: Callable, *args, **kwargs):
+        """Await coroutine function `func`, sharing in-flight calls with threads too"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # shield so one cancelled follower does not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderAborted:
+                continue
+
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
@@ -0,0 +1,150 @@
+import asyncio
+import queue
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+status_events_published = Counter(
+    'status_events_published_total',
+    'Recording and transcription status events published to live subscribers',
+    ['event']
+)
+status_event_subscribers = Gauge(
+    'status_event_subscribers',
+    'Open status event streams'
+)
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class Subscription:
+    def __init__(self, key: str, max_queued: int):
+        self.key = key
+        self.events = queue.Queue(maxsize=max_queued)
+        # Set when the subscriber fell too far behind and was dropped
+        self.closed = False
+
+    def get(self, timeout: float) -> Optional[Event]:
+        """The next (event, data), or None if nothing arrived within `timeout` seconds"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def deliver(self, item: Event) -> bool:
+        """Queue an event from any thread, returning False if the subscriber is too far behind"""
+        try:
+            self.events.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncSubscription(Subscription):
+    def __init__(self, key: str, max_queued: int, loop: asyncio.AbstractEventLoop):
+        """
+        A subscription awaited on `loop`, so an idle stream holds a coroutine
+        rather than a thread. Publishers on other threads wake it through
+        call_soon_threadsafe.
+        """
+        self.key = key
+        self.max_queued = max_queued
+        self.loop = loop
+        self.events = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+
+    async def get_async(self, timeout: float) -> Optional[Event]:
+        """The next (event, data), or None if nothing arrived within `timeout` seconds"""
+        if not self.events and not self.closed:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.events.popleft() if self.events else None
+
+    def _wake(self):
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            # The loop has shut down; nobody is waiting any more
+            self.closed = True
+
+    def deliver(self, item: Event) -> bool:
+        if len(self.events) >= self.max_queued:
+            return False
+        self.events.append(item)
+        self._wake()
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+
+class StatusBroker:
+    def __init__(self, max_queued: int = 100):
+        """
+        In-process fan-out of status changes to streaming clients. Events only
+        reach subscribers in the process that published them, which is the one
+        running the queue handlers. A subscriber with `max_queued` undelivered
+        events is dropped; it reconnects and starts again from a snapshot.
+        """
+        self.max_queued = max_queued
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, key: str) -> Subscription:
+        """Subscribe a thread that blocks on Subscription.get"""
+        return self._add(Subscription(key, self.max_queued))
+
+    def subscribe_async(self, key: str) -> AsyncSubscription:
+        """Subscribe a coroutine on the running event loop that awaits get_async"""
+        return self._add(AsyncSubscription(key, self.max_queued, asyncio.get_running_loop()))
+
+    def _add(self, subscription):
+        with self.lock:
+            self.subscribers[subscription.key].add(subscription)
+            status_event_subscribers.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self._remove(subscription)
+
+    def _remove(self, subscription: Subscription):
+        # Called with the lock held
+        subscribers = self.subscribers.get(subscription.key)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.key]
+            status_event_subscribers.dec()
+
+    def publish(self, event: str, data: Dict[str, Any], *keys: str):
+        """Deliver an event to everyone subscribed to any of `keys`"""
+        status_events_published.labels(event=event).inc()
+        with self.lock:
+            for key in keys:
+                for subscription in list(self.subscribers.get(key, ())):
+                    if not subscription.deliver((event, data)):
+                        subscription.close()
+                        self._remove(subscription)
+
+
+def recording_key(unique_id: str) -> str:
+    return f"recording:{unique_id}"
+
+
+def meeting_key(meeting_id: str) -> str:
+    return f"meeting:{meeting_id}"
+
+
+# Shared by RecordingManager, the queue handlers and the SSE endpoints
+status_events = StatusBroker()
@@ -0,0 +1,257 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_cache import LLMCache
+from db import connection
+
+# Model settings for summarising meeting transcripts
+SUMMARY_MODEL = "gpt-4"
+SUMMARY_TEMPERATURE = 0.3
+CHUNK_SUMMARY_MAX_TOKENS = 500
+REDUCE_MAX_TOKENS = 1000
+
+# Input budgets, in estimated tokens, leaving room for the prompt and the answer
+CHUNK_INPUT_TOKENS = 3000
+REDUCE_INPUT_TOKENS = 4000
+
+# Bump a version whenever its prompt or settings change. Chunk summaries are
+# cached under CHUNK_PROMPT_VERSION, so a reduce-only tweak reuses every chunk.
+CHUNK_PROMPT_VERSION = "1"
+REDUCE_PROMPT_VERSION = "1"
+
+SUMMARY_JSON_SHAPE = """{
+    "summary": "string",
+    "decisions": ["string"],
+    "action_items": [{"task": "string", "owner": "string or null"}]
+}"""
+
+CHUNK_SYSTEM_PROMPT = f"""You summarise one consecutive part of a meeting transcript. Only report what is said in this part.
+
+Always return a valid JSON object with these exact keys:
+{SUMMARY_JSON_SHAPE}
+
+Use empty lists when there are no decisions or action items."""
+
+REDUCE_SYSTEM_PROMPT = f"""You combine partial summaries of one meeting, given in the order they happened, into a single summary of the whole meeting. Merge duplicate decisions and action items, and keep the latest version when a later part changes an earlier decision.
+
+Always return a valid JSON object with these exact keys:
+{SUMMARY_JSON_SHAPE}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text, about four characters per token"""
+    return (len(text) + 3) // 4
+
+
+def split_transcript(text: str, max_tokens: int = CHUNK_INPUT_TOKENS) -> List[str]:
+    """Split a transcript at sentence boundaries into chunks of at most `max_tokens`"""
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
+
+    pieces = []
+    for sentence in sentences:
+        # A single run-on sentence longer than the budget is split by words
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence.strip())
+            continue
+        words, current = sentence.split(), []
+        for word in words:
+            if current and estimate_tokens(' '.join(current + [word])) > max_tokens:
+                pieces.append(' '.join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(' '.join(current))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append(' '.join(current))
+
+    return chunks
+
+
+def summary_completion_args(system_prompt: str, content: str, max_tokens: int) -> Dict[str, Any]:
+    """Arguments for a chat completion returning a summary JSON object"""
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        "max_tokens": max_tokens,
+        "temperature": SUMMARY_TEMPERATURE
+    }
+
+
+def parse_summary(result_str: str) -> Optional[Dict[str, Any]]:
+    """Parse a summary JSON object, returning None if the output is not valid JSON"""
+    try:
+        result = json.loads(result_str)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing summary response: {e}")
+        return None
+
+    if not isinstance(result, dict):
+        return None
+
+    action_items = []
+    for item in result.get("action_items") or []:
+        if isinstance(item, dict) and item.get("task"):
+            action_items.append({"task": item["task"], "owner": item.get("owner")})
+        elif isinstance(item, str):
+            action_items.append({"task": item, "owner": None})
+
+    return {
+        "summary": result.get("summary", ""),
+        "decisions": [d for d in result.get("decisions") or [] if isinstance(d, str)],
+        "action_items": action_items
+    }
+
+
+class MeetingSummarizer:
+    def __init__(
+        self,
+        complete: Callable,
+        cache: LLMCache,
+        db_path: str = 'database/recordings.db',
+        workers: int = 4
+    ):
+        """
+        Map-reduce summariser: `complete(**kwargs)` runs one chat completion,
+        chunk summaries are cached in `cache` by content hash, and finished
+        summaries are stored per meeting in `db_path`
+        """
+        self.complete = complete
+        self.cache = cache
+        self.db_path = db_path
+        self.workers = workers
+        self._init_db()
+
+    def _init_db(self):
+        """Create the meeting summaries table"""
+        with connection(self.db_path) as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS meeting_summaries (
+                    meeting_id TEXT PRIMARY KEY,
+                    summary TEXT,
+                    decisions TEXT,
+                    action_items TEXT,
+                    chunk_count INTEGER,
+                    prompt_version TEXT,
+                    created_at INTEGER
+                )
+            ''')
+
+    def _complete_json(self, system_prompt: str, content: str, max_tokens: int) -> Dict[str, Any]:
+        response = self.complete(**summary_completion_args(system_prompt, content, max_tokens))
+        result_str = response.choices[0].message.content.strip()
+        result = parse_summary(result_str)
+        if result is None:
+            raise ValueError(f"Summary response was not valid JSON: {result_str[:200]}")
+        return result
+
+    def summarize_chunk(self, chunk: str) -> Dict[str, Any]:
+        """Summarise one chunk, reusing a cached summary of identical content"""
+        cache_key = LLMCache.make_key(chunk, SUMMARY_MODEL, f"chunk-{CHUNK_PROMPT_VERSION}")
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self._complete_json(CHUNK_SYSTEM_PROMPT, chunk, CHUNK_SUMMARY_MAX_TOKENS)
+        self.cache.set(cache_key, result)
+        return result
+
+    def _reduce(self, partials: List[Dict[str, Any]], executor: ThreadPoolExecutor) -> Dict[str, Any]:
+        """Combine partial summaries, in rounds if they do not fit in one prompt"""
+        batches, current, current_tokens = [], [], 0
+        for partial in partials:
+            tokens = estimate_tokens(json.dumps(partial))
+            if current and current_tokens + tokens > REDUCE_INPUT_TOKENS:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(partial)
+            current_tokens += tokens
+        batches.append(current)
+
+        def reduce_batch(batch):
+            content = "\n\n".join(
+                f"Part {index + 1}:\n{json.dumps(partial)}" for index, partial in enumerate(batch)
+            )
+            return self._complete_json(REDUCE_SYSTEM_PROMPT, content, REDUCE_MAX_TOKENS)
+
+        if len(batches) == 1:
+            return reduce_batch(batches[0])
+        return self._reduce(list(executor.map(reduce_batch, batches)), executor)
+
+    def summarize(self, transcript: str) -> Dict[str, Any]:
+        """Summarise a transcript of any length into summary, decisions and action items"""
+        chunks = split_transcript(transcript)
+        if not chunks:
+            raise ValueError("Transcript is empty")
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+            partials = list(executor.map(self.summarize_chunk, chunks))
+            result = self._reduce(partials, executor)
+
+        result["chunk_count"] = len(chunks)
+        return result
+
+    def summarize_meeting(self, meeting_id: str, transcript: str) -> Dict[str, Any]:
+        """Summarise a meeting's transcript and store the result"""
+        result = self.summarize(transcript)
+
+        with connection(self.db_path) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO meeting_summaries
+                (meeting_id, summary, decisions, action_items, chunk_count, prompt_version, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                meeting_id,
+                result["summary"],
+                json.dumps(result["decisions"]),
+                json.dumps(result["action_items"]),
+                result["chunk_count"],
+                f"{CHUNK_PROMPT_VERSION}.{REDUCE_PROMPT_VERSION}",
+                int(time.time())
+            ))
+            conn.commit()
+
+        return result
+
+    def get_summary(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """Stored summary for a meeting, or None"""
+        with connection(self.db_path) as conn:
+            row = conn.execute('''
+                SELECT summary, decisions, action_items, chunk_count, prompt_version, created_at
+                FROM meeting_summaries WHERE meeting_id = ?
+            ''', (meeting_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "meeting_id": meeting_id,
+            "summary": row[0],
+            "decisions": json.loads(row[1]),
+            "action_items": json.loads(row[2]),
+            "chunk_count": row[3],
+            "prompt_version": row[4],
+            "created_at": row[5]
+        }
@@ -6,6 +6,8 @@ from datetime import datetime
 import requests
 import json
 from botocore.exceptions import ClientError
+from botocore.config import Config
+from circuit_breaker import daily_breaker, download_breaker, s3_breaker
 
 # Initialize broker
 redis_broker = RedisBroker(host="37.27.215.123", port=6379)
@@ -16,11 +18,14 @@ s3_client = boto3.client(
     's3',
     aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
     aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.getenv('AWS_REGION', 'us-east-1')
+    region_name=os.getenv('AWS_REGION', 'us-east-1'),
+    config=Config(connect_timeout=5, read_timeout=30, retries={'max_attempts': 2})
 )
 
 BUCKET_NAME = os.getenv('S3_BUCKET_NAME')
 DAILY_API_KEY = os.getenv('DAILY_API_KEY')
+DAILY_TIMEOUT = float(os.getenv('DAILY_TIMEOUT', 10))
+DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', 60))  # seconds without data before a download is abandoned
 
 @dramatiq.actor(max_retries=3)
 def start_meeting_recording(meeting_id: str, room_url: str):
@@ -32,7 +37,8 @@ def start_meeting_recording(meeting_id: str, room_url: str):
         recording_id = f"rec_{meeting_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         # Start Daily.co recording with enhanced settings
-        response = requests.post(
+        response = daily_breaker.call(
+            requests.post,
             f"https://api.daily.co/v1/rooms/{meeting_id}/recordings",
             headers={
                 "Authorization": f"Bearer {DAILY_API_KEY}",
@@ -55,7 +61,8 @@ def start_meeting_recording(meeting_id: str, room_url: str):
                     "include_video": True,
                     "include_participant_audio": True  # Record all participants' audio
                 }
-            }
+            },
+            timeout=DAILY_TIMEOUT
         )
         
         if response.status_code != 200:
@@ -77,7 +84,8 @@ def start_meeting_recording(meeting_id: str, room_url: str):
             }
         }
         
-        s3_client.put_object(
+        s3_breaker.call(
+            s3_client.put_object,
             Bucket=BUCKET_NAME,
             Key=f"recordings/{recording_id}/metadata.json",
             Body=json.dumps(metadata)
@@ -96,16 +104,19 @@ def process_completed_recording(recording_id: str):
     """
     try:
         # Get recording metadata from S3
-        metadata_obj = s3_client.get_object(
+        metadata_obj = s3_breaker.call(
+            s3_client.get_object,
             Bucket=BUCKET_NAME,
             Key=f"recordings/{recording_id}/metadata.json"
         )
         metadata = json.loads(metadata_obj['Body'].read())
         
         # Get recording from Daily.co
-        response = requests.get(
+        response = daily_breaker.call(
+            requests.get,
             f"https://api.daily.co/v1/recordings/{recording_id}",
-            headers={"Authorization": f"Bearer {DAILY_API_KEY}"}
+            headers={"Authorization": f"Bearer {DAILY_API_KEY}"},
+            timeout=DAILY_TIMEOUT
         )
         
         if response.status_code != 200:
@@ -116,10 +127,17 @@ def process_completed_recording(recording_id: str):
         # Download recording
         recording_url = recording_data.get('download_url')
         if recording_url:
-            recording_response = requests.get(recording_url)
+            recording_response = download_breaker.call(
+                requests.get,
+                recording_url,
+                timeout=(DAILY_TIMEOUT, DOWNLOAD_TIMEOUT)
+            )
+            if recording_response.status_code != 200:
+                raise Exception(f"Failed to download recording: {recording_response.status_code}")
             
             # Upload to S3
-            s3_client.put_object(
+            s3_breaker.call(
+                s3_client.put_object,
                 Bucket=BUCKET_NAME,
                 Key=f"recordings/{recording_id}/recording.mp4",
                 Body=recording_response.content
@@ -132,7 +150,8 @@ def process_completed_recording(recording_id: str):
                 "s3_path": f"recordings/{recording_id}/recording.mp4"
             })
             
-            s3_client.put_object(
+            s3_breaker.call(
+                s3_client.put_object,
                 Bucket=BUCKET_NAME,
                 Key=f"recordings/{recording_id}/metadata.json",
                 Body=json.dumps(metadata)
@@ -154,7 +173,8 @@ def cleanup_old_recordings(days_old: int = 30):
     """
     try:
         # List objects in the recordings folder
-        response = s3_client.list_objects_v2(
+        response = s3_breaker.call(
+            s3_client.list_objects_v2,
             Bucket=BUCKET_NAME,
             Prefix="recordings/"
         )
@@ -162,7 +182,8 @@ def cleanup_old_recordings(days_old: int = 30):
         for obj in response.get('Contents', []):
             # Check if object is older than days_old
             if (datetime.now() - obj['LastModified']).days > days_old:
-                s3_client.delete_object(
+                s3_breaker.call(
+                    s3_client.delete_object,
                     Bucket=BUCKET_NAME,
                     Key=obj['Key']
                 )
@@ -0,0 +1,101 @@
+import httpx
+import openai
+import pytest
+import requests
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN, is_upstream_failure
+
+
+def status_error(status):
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    return openai.APIStatusError('upstream said no', response=httpx.Response(status, request=request), body=None)
+
+
+def raiser(error):
+    def call():
+        raise error
+    return call
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('circuit_breaker.time.monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('test', window_size=4, min_calls=4, reset_timeout=30)
+
+
+def test_only_upstream_faults_count_as_failures():
+    assert is_upstream_failure(requests.ConnectionError())
+    assert is_upstream_failure(requests.Timeout())
+    assert is_upstream_failure(openai.APITimeoutError(request=httpx.Request('GET', 'https://x')))
+    assert is_upstream_failure(status_error(500))
+    assert is_upstream_failure(status_error(429))
+    assert not is_upstream_failure(status_error(400))
+    assert not is_upstream_failure(ValueError('bad prompt'))
+
+
+def test_client_errors_never_open_the_circuit(breaker):
+    for _ in range(10):
+        with pytest.raises(openai.APIStatusError):
+            breaker.call(raiser(status_error(400)))
+    assert breaker.state == CLOSED
+
+
+def test_open_half_open_and_closed_again(breaker, clock):
+    for _ in range(4):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(raiser(requests.ConnectionError()))
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.call(lambda: 'unreached')
+    assert rejected.value.retry_after == 30
+
+    # After the reset timeout a single probe goes through
+    clock[0] += 30
+    def probe():
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: 'second caller')
+        return 'ok'
+    assert breaker.call(probe) == 'ok'
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens(breaker, clock):
+    for _ in range(4):
+        with pytest.raises(TimeoutError):
+            breaker.call(raiser(TimeoutError()))
+    clock[0] += 30
+
+    with pytest.raises(openai.APIStatusError):
+        breaker.call(raiser(status_error(503)))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'unreached')
+
+
+def test_result_and_slow_call_failures(clock):
+    breaker = CircuitBreaker(
+        'results', window_size=4, min_calls=4, slow_call_seconds=5,
+        is_failure=lambda response: response >= 500
+    )
+    for _ in range(3):
+        assert breaker.call(lambda: 200) == 200
+    breaker.call(lambda: 502)
+    breaker.call(lambda: 502)
+    assert breaker.state == OPEN
+
+    slow = CircuitBreaker('slow', window_size=4, min_calls=4, slow_call_seconds=5)
+
+    def slow_call():
+        clock[0] += 6
+        return 'late'
+    for _ in range(4):
+        slow.call(slow_call)
+    assert slow.state == OPEN
@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+
+def test_asgi_export_streams_every_batch(backend, sync_app, monkeypatch):
+    monkeypatch.setattr(backend, 'EXPORT_LINES_PER_READ', 2)
+    manager = sync_app.recording_manager
+    created = {manager.create_recording('export', 'export', 'https://example.daily.co/export')['unique_id'] for _ in range(5)}
+
+    async def main():
+        client = backend.app.test_client()
+        response = await client.get('/api/export?type=recordings')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        body = await response.get_data(as_text=True)
+        invalid = await client.get('/api/export?type=bogus')
+        return body, invalid.status_code
+
+    body, invalid_status = asyncio.run(main())
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert {line['type'] for line in lines} == {'recordings'}
+    assert created <= {line['unique_id'] for line in lines}
+    assert invalid_status == 400
+
+
+def test_asgi_export_reports_failures_in_the_stream(backend, monkeypatch):
+    def failing_export(types, since, until):
+        yield json.dumps({'type': 'meetings'}) + '\n'
+        raise RuntimeError('disk went away')
+
+    monkeypatch.setattr(backend, 'export_ndjson', failing_export)
+
+    async def main():
+        response = await backend.app.test_client().get('/api/export')
+        return await response.get_data(as_text=True)
+
+    lines = [json.loads(line) for line in asyncio.run(main()).splitlines()]
+    assert lines == [{'type': 'meetings'}, {'type': 'error', 'error': 'Export failed'}]
@@ -0,0 +1,44 @@
+def revalidate(client, url):
+    """First response for url and the status of an immediate conditional re-request"""
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    again = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    return response, again
+
+
+def test_recording_is_not_modified_until_it_changes(sync_app, client):
+    manager = sync_app.recording_manager
+    unique_id = manager.create_recording('cached', 'cached', 'https://example.daily.co/cached')['unique_id']
+    url = f'/api/recordings/{unique_id}'
+
+    first, again = revalidate(client, url)
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+    manager.update_recording_status(unique_id, 'recording')
+    changed = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.get_json()['status'] == 'recording'
+    assert changed.headers['ETag'] != first.headers['ETag']
+
+
+def test_listings_are_not_modified_until_a_row_changes(sync_app, client):
+    manager = sync_app.recording_manager
+    unique_id = manager.create_recording('cached', 'cached', 'https://example.daily.co/cached')['unique_id']
+    manager.update_recording_status(unique_id, 'etag-test')
+    url = '/api/recordings?status=etag-test'
+
+    first, again = revalidate(client, url)
+    assert again.status_code == 304
+
+    manager.update_recording_status(unique_id, 'etag-test')
+    assert client.get(url, headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+
+    # The ETag covers the fields asked for, not just the rows
+    with_metadata = client.get(url + '&include=metadata')
+    assert with_metadata.headers['ETag'] != client.get(url).headers['ETag']
+
+    _, saved_again = revalidate(client, '/api/saved-recordings')
+    assert saved_again.status_code == 304
@@ -0,0 +1,44 @@
+import asyncio
+
+from db import connection
+
+
+def create_async(backend, name):
+    async def post():
+        client = backend.app.test_client()
+        response = await client.post('/api/rooms', json={'name': name, 'meeting_name': 'Standup'})
+        return response.status_code, await response.get_json()
+    return asyncio.run(post())
+
+
+def test_meeting_ids_are_unique_across_flask_and_asgi(backend, client, daily_room):
+    ids = []
+    for _ in range(3):
+        response = client.post('/api/rooms', json={'name': 'standup', 'meeting_name': 'Standup'})
+        assert response.status_code == 200
+        ids.append(response.get_json()['meeting_id'])
+
+        status, body = create_async(backend, 'standup')
+        assert status == 200
+        ids.append(body['meeting_id'])
+
+    # Same name and same second every time, yet every create got its own row
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    with connection('meetings.db') as conn:
+        stored = [row[0] for row in conn.execute(
+            f"SELECT meeting_id FROM meetings WHERE meeting_id IN ({','.join('?' * len(ids))})", ids
+        )]
+    assert sorted(stored) == ids
+
+
+def test_batch_rejects_malformed_items_individually(client, daily_room):
+    response = client.post('/api/rooms/batch', json={
+        'rooms': [{'name': 'a', 'meeting_name': 'A'}, 'not a room', {'name': 7}],
+        'mint_host_tokens': False
+    })
+    assert response.status_code in (200, 207)
+    results = response.get_json()['results']
+
+    assert results[0]['success'] and isinstance(results[0]['meeting_id'], int)
+    assert not results[1]['success'] and not results[2]['success']
@@ -0,0 +1,23 @@
+from blob_codec import COMPRESSED_MARKER, decode_text
+from db import connection
+from migrations import run_migrations, RECORDINGS_MIGRATIONS
+
+
+def test_existing_values_are_compressed_on_upgrade(tmp_path):
+    db_path = str(tmp_path / 'recordings.db')
+    run_migrations(db_path, RECORDINGS_MIGRATIONS[:4])
+    transcript = '[' + ', '.join(['"a line of the meeting transcript"'] * 100) + ']'
+    with connection(db_path) as conn:
+        conn.execute(
+            'INSERT INTO recordings (unique_id, transcript, metadata) VALUES (?, ?, ?)',
+            ('old-row', transcript, '{"small": true}')
+        )
+
+    assert run_migrations(db_path, RECORDINGS_MIGRATIONS) == len(RECORDINGS_MIGRATIONS)
+    with connection(db_path) as conn:
+        stored, metadata = conn.execute(
+            "SELECT transcript, metadata FROM recordings WHERE unique_id = 'old-row'"
+        ).fetchone()
+    assert stored.startswith(COMPRESSED_MARKER)
+    assert decode_text(stored) == transcript
+    assert metadata == '{"small": true}'
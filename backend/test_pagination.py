@@ -0,0 +1,68 @@
+import pytest
+
+from pagination import encode_cursor, decode_cursor, page_size, MAX_PAGE_SIZE
+
+
+def walk(client, url):
+    """Every item of a paginated listing, following next_cursor to the end"""
+    items, cursor = [], None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        page = response.get_json()
+        items.extend(page['recordings'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return items
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('2026-01-01 10:00:00', 42)) == ('2026-01-01 10:00:00', 42)
+    assert decode_cursor(None) is None
+    for bad in ('not base64!', encode_cursor(1, 2, 3), encode_cursor('x')):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_page_size_is_clamped():
+    assert page_size(0) == 1
+    assert page_size(-5) == 1
+    assert page_size(10 ** 6) == MAX_PAGE_SIZE
+
+
+def test_recordings_listing_pages_by_status(sync_app, client):
+    manager = sync_app.recording_manager
+    created = []
+    for _ in range(7):
+        unique_id = manager.create_recording('pager', 'pager', 'https://example.daily.co/pager')['unique_id']
+        manager.update_recording_status(unique_id, 'paging-test')
+        created.append(unique_id)
+
+    # Rows created in the same second are told apart by id
+    items = walk(client, '/api/recordings?status=paging-test&limit=3&include=metadata')
+    assert [item['unique_id'] for item in items] == created[::-1]
+    assert all('metadata' in item for item in items)
+
+    assert client.get('/api/recordings?cursor=garbage').status_code == 400
+
+
+def test_saved_recordings_listing_pages(client):
+    saved = []
+    for index in range(5):
+        response = client.post('/api/save-recording-metadata', json={
+            'participants': [f'p{index}'],
+            'transcript': [],
+            'chatMessages': [],
+            'recordingUrl': f'https://example.com/{index}.mp4',
+            'endTime': 'now'
+        })
+        assert response.status_code == 200
+        saved.append(f'https://example.com/{index}.mp4')
+
+    items = walk(client, '/api/saved-recordings?limit=2&include=participants')
+    urls = [item['recording_url'] for item in items]
+    assert len(urls) == len(set(urls))
+    assert [url for url in urls if url in saved] == saved[::-1]
+    assert items[0]['participants'] == ['p4']
+
+    assert client.get('/api/saved-recordings?include=metadata').status_code == 400
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def test_concurrent_joins_start_once(sync_app):
+    presence = sync_app.room_presence
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        starts = list(executor.map(lambda n: presence.participant_joined('busy-room', f's{n}'), range(8)))
+
+    assert starts.count(True) == 1
+    assert presence.participant_count('busy-room') == 8
+    for n in range(7):
+        assert not presence.participant_left('busy-room', f's{n}')
+    assert presence.participant_left('busy-room', 's7')
+
+
+@pytest.fixture
+def daily_calls(sync_app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(sync_app, 'stop_meeting_recording', lambda meeting_id: calls.append(('stop', meeting_id)))
+    return calls
+
+
+def test_start_skipped_when_room_empties_first(sync_app, monkeypatch, daily_calls):
+    presence = sync_app.room_presence
+    monkeypatch.setattr(sync_app, 'start_meeting_recording', lambda *a, **k: daily_calls.append(('start',)))
+
+    assert presence.participant_joined('brief-room', 'a')
+    assert presence.participant_left('brief-room', 'a')
+
+    assert sync_app.start_recording('brief-room', 'https://example.daily.co/brief-room') is None
+    assert daily_calls == []
+
+
+def test_start_stopped_when_room_empties_during_it(sync_app, monkeypatch, daily_calls):
+    presence = sync_app.room_presence
+
+    def start(meeting_id, room_url, queue_wait=None):
+        # The last participant leaves while Daily.co is starting the recording
+        presence.participant_left(meeting_id, 'a')
+        daily_calls.append(('start', meeting_id))
+        return 'rec_1'
+
+    monkeypatch.setattr(sync_app, 'start_meeting_recording', start)
+    assert presence.participant_joined('racy-room', 'a')
+
+    assert sync_app.start_recording('racy-room', 'https://example.daily.co/racy-room') == 'rec_1'
+    assert daily_calls == [('start', 'racy-room'), ('stop', 'racy-room')]
+
+
+def test_failed_start_releases_the_guard(sync_app, monkeypatch, daily_calls):
+    presence = sync_app.room_presence
+
+    def start(*args, **kwargs):
+        raise Exception('Daily.co refused')
+
+    monkeypatch.setattr(sync_app, 'start_meeting_recording', start)
+    assert presence.participant_joined('flaky-room', 'a')
+
+    with pytest.raises(Exception):
+        sync_app.start_recording('flaky-room', 'https://example.daily.co/flaky-room')
+    # The next join tries again
+    assert presence.participant_joined('flaky-room', 'b')
@@ -0,0 +1,31 @@
+from db import connection
+from migrations import run_migrations, MEETINGS_MIGRATIONS, RECORDINGS_MIGRATIONS
+from search_index import SearchIndex
+
+
+def test_sources_are_ranked_apart_and_interleaved(tmp_path):
+    segments_db, meetings_db = str(tmp_path / 'recordings.db'), str(tmp_path / 'meetings.db')
+    run_migrations(segments_db, RECORDINGS_MIGRATIONS)
+    run_migrations(meetings_db, MEETINGS_MIGRATIONS)
+    index = SearchIndex(segments_db, meetings_db)
+
+    with connection(segments_db) as conn:
+        conn.executemany(
+            "INSERT INTO transcript_segments (session_id, kind, seq, text) VALUES ('s', ?, ?, ?)",
+            [('transcript', seq, 'roadmap ' * (seq + 1) + 'and more words ' * 10) for seq in range(4)]
+            + [('chat', 0, 'unrelated chatter')]
+        )
+    with connection(meetings_db) as conn:
+        conn.executemany(
+            'INSERT INTO meetings (meeting_name, description) VALUES (?, ?)',
+            [('Roadmap review', None), ('Weekly sync', 'roadmap, hiring and a long list of other topics')]
+        )
+
+    results = index.search('roadmap')
+    assert [result['type'] for result in results] == ['transcript', 'meeting', 'transcript', 'meeting', 'transcript', 'transcript']
+    # Each source keeps its own best-first order
+    assert [result['seq'] for result in results if result['type'] == 'transcript'] == [3, 2, 1, 0]
+    assert [result['meeting_name'] for result in results if result['type'] == 'meeting'] == ['Roadmap review', 'Weekly sync']
+
+    assert len(index.search('roadmap', limit=3)) == 3
+    assert {result['type'] for result in index.search('roadmap', types=['meeting'])} == {'meeting'}
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+from status_events import StatusBroker, status_events, recording_key
+
+
+def test_async_subscription_receives_events_from_other_threads():
+    broker = StatusBroker(max_queued=2)
+
+    async def main():
+        subscription = broker.subscribe_async('k')
+        threading.Thread(target=broker.publish, args=('status', {'n': 1}, 'k')).start()
+        assert await subscription.get_async(5) == ('status', {'n': 1})
+        assert await subscription.get_async(0.01) is None
+
+        # A subscriber that falls behind is dropped and told so
+        for n in range(3):
+            broker.publish('status', {'n': n}, 'k')
+        assert subscription.closed
+        assert 'k' not in broker.subscribers
+
+    asyncio.run(main())
+
+
+def test_asgi_stream_unsubscribes_on_disconnect(backend, sync_app):
+    unique_id = sync_app.recording_manager.create_recording('sse', 'sse', 'https://example.daily.co/sse')['unique_id']
+    key = recording_key(unique_id)
+
+    async def main():
+        disconnected = asyncio.Event()
+        requested = []
+        sent = []
+
+        async def receive():
+            if not requested:
+                requested.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+            if message['type'] == 'http.response.body' and b'snapshot' in message.get('body', b''):
+                # Subscribed while the client is connected
+                assert key in status_events.subscribers
+                sync_app.recording_manager.update_recording_status(unique_id, 'recording')
+            if b'"recording"' in message.get('body', b''):
+                disconnected.set()
+
+        await asyncio.wait_for(backend.application({
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': f'/api/recordings/{unique_id}/events',
+            'raw_path': f'/api/recordings/{unique_id}/events'.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 1234),
+            'server': ('localhost', 80)
+        }, receive, send), timeout=10)
+        return sent
+
+    sent = asyncio.run(main())
+    assert sent[0]['status'] == 200
+    assert any(b'event: status' in message.get('body', b'') for message in sent)
+    assert key not in status_events.subscribers
+
+
+def test_flask_stream_ends_after_its_lifetime(sync_app, client, monkeypatch):
+    monkeypatch.setattr(sync_app, 'SSE_MAX_STREAM_SECONDS', 0.2)
+    monkeypatch.setattr(sync_app, 'SSE_KEEPALIVE_SECONDS', 0.05)
+    unique_id = sync_app.recording_manager.create_recording('sse', 'sse', 'https://example.daily.co/sse')['unique_id']
+
+    response = client.get(f'/api/recordings/{unique_id}/events')
+    body = response.get_data(as_text=True)
+
+    assert body.startswith('event: snapshot')
+    assert ': keepalive' in body
+    assert recording_key(unique_id) not in status_events.subscribers
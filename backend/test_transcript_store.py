@@ -0,0 +1,42 @@
+from db import connection
+
+
+def test_get_session_seeks_the_meeting_index(sync_app):
+    store = sync_app.transcript_store
+    store.finalize('early-session', 'indexed-meeting', {'transcript': 1})
+    with connection(store.db_path) as conn:
+        conn.execute("UPDATE transcript_sessions SET finalized_at = 1 WHERE session_id = 'early-session'")
+    store.finalize('late-session', 'indexed-meeting', {'transcript': 2, 'chat': 1})
+
+    session = store.get_session('indexed-meeting')
+    assert session['session_id'] == 'late-session'
+    assert (session['transcript_count'], session['chat_count']) == (2, 1)
+
+    with connection(store.db_path) as conn:
+        plan = ' '.join(row[-1] for row in conn.execute('''
+            EXPLAIN QUERY PLAN
+            SELECT session_id FROM transcript_sessions WHERE meeting_id = ?
+            ORDER BY finalized_at DESC LIMIT 1
+        ''', ('indexed-meeting',)))
+    assert 'idx_transcript_sessions_meeting' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_finalize_never_moves_a_session(sync_app):
+    store = sync_app.transcript_store
+    store.finalize('owned-session', 'first-meeting', {'transcript': 1})
+    store.finalize('owned-session', 'second-meeting', {'transcript': 5})
+
+    assert store.session_meeting('owned-session') == 'first-meeting'
+    assert store.get_session('second-meeting') is None
+
+
+def test_missing_segments_are_capped(sync_app):
+    store = sync_app.transcript_store
+    store.append_segments('gappy-session', [{'kind': 'transcript', 'seq': seq, 'text': 'x'} for seq in (0, 3)])
+
+    assert store.missing_segments('gappy-session', {'transcript': 6, 'chat': 1}, 10) == {
+        'transcript': [1, 2, 4, 5],
+        'chat': [0]
+    }
+    assert store.missing_segments('gappy-session', {'transcript': 100000}, 3) == {'transcript': [1, 2, 4]}
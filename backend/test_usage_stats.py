@@ -0,0 +1,48 @@
+import pytest
+
+from db import connection
+from migrations import run_migrations, MEETINGS_MIGRATIONS, RECORDINGS_MIGRATIONS
+from usage_stats import read_stats
+
+
+@pytest.fixture
+def dbs(tmp_path):
+    meetings_db, recordings_db = str(tmp_path / 'meetings.db'), str(tmp_path / 'recordings.db')
+    run_migrations(meetings_db, MEETINGS_MIGRATIONS)
+    run_migrations(recordings_db, RECORDINGS_MIGRATIONS)
+    return meetings_db, recordings_db
+
+
+def test_meeting_triggers_count_by_day(dbs):
+    meetings_db, recordings_db = dbs
+    march_1, march_2 = 1772323200, 1772409600  # midnight UTC
+    with connection(meetings_db) as conn:
+        conn.executemany('INSERT INTO meetings (meeting_name, created_at) VALUES (?, ?)', [
+            ('a', march_1 + 60), ('b', march_1 + 3600), ('c', march_2 + 60), ('no date', None)
+        ])
+        conn.execute("DELETE FROM meetings WHERE meeting_name = 'b'")
+
+    stats = read_stats(meetings_db, recordings_db)
+    assert [(day['day'], day['meetings']) for day in stats['days']] == [('2026-03-01', 1), ('2026-03-02', 1)]
+    assert read_stats(meetings_db, recordings_db, since='2026-03-02')['totals']['meetings'] == 1
+
+
+def test_recording_triggers_follow_status_changes(dbs):
+    meetings_db, recordings_db = dbs
+    with connection(recordings_db) as conn:
+        conn.execute("INSERT INTO recordings (unique_id, status, created_at) VALUES ('r1', 'pending', '2026-03-01 09:00:00')")
+        conn.execute("INSERT INTO recordings (unique_id, status, created_at) VALUES ('r2', 'pending', '2026-03-01 10:00:00')")
+        # A Daily.co webhook row waiting on transcription
+        conn.execute("INSERT INTO recordings (recording_url, created_at) VALUES ('https://x/1.mp4', '2026-03-01 11:00:00')")
+
+        conn.execute("UPDATE recordings SET status = 'recording' WHERE unique_id = 'r1'")
+        conn.execute("UPDATE recordings SET recording_started_at = datetime('now', '-90 seconds') WHERE unique_id = 'r1'")
+        conn.execute("UPDATE recordings SET status = 'stopped' WHERE unique_id = 'r1'")
+        conn.execute("DELETE FROM recordings WHERE unique_id = 'r2'")
+        conn.execute("UPDATE recordings SET transcription_status = 'completed' WHERE unique_id IS NULL")
+
+    stats = read_stats(meetings_db, recordings_db)
+    assert stats['totals']['recordings'] == {'stopped': 1}
+    assert stats['totals']['transcriptions'] == {'completed': 1}
+    assert stats['totals']['transcription_backlog'] == 0
+    assert stats['totals']['recorded_minutes'] == pytest.approx(1.5, abs=0.1)
@@ -0,0 +1,188 @@
+import sqlite3
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from db import connection
+from migrations import run_migrations, RECORDINGS_MIGRATIONS
+
+SEGMENT_KINDS = ('transcript', 'chat')
+
+SEGMENT_COLUMNS = 'seq, speaker, text, timestamp, start_ms, end_ms'
+
+
+def _segment(row) -> Dict[str, Any]:
+    return {
+        'seq': row[0],
+        'speaker': row[1],
+        'text': row[2],
+        'timestamp': row[3],
+        'start': row[4],
+        'end': row[5]
+    }
+
+
+class TranscriptStore:
+    def __init__(self, db_path: str = 'database/recordings.db'):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        """Bring the live transcript segment and session manifest tables up to date"""
+        run_migrations(self.db_path, RECORDINGS_MIGRATIONS)
+
+    def append_segments(self, session_id: str, segments: List[Dict[str, Any]]) -> int:
+        """Store a batch of segments, ignoring ones already received. Returns how many were new."""
+        now = int(time.time())
+        with connection(self.db_path) as conn:
+            cursor = conn.executemany('''
+                INSERT OR IGNORE INTO transcript_segments
+                (session_id, kind, seq, speaker, text, timestamp, start_ms, end_ms, received_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    session_id,
+                    segment['kind'],
+                    segment['seq'],
+                    segment.get('speaker'),
+                    segment['text'],
+                    segment.get('timestamp'),
+                    segment.get('start'),
+                    segment.get('end'),
+                    now
+                )
+                for segment in segments
+            ])
+            conn.commit()
+            return cursor.rowcount
+
+    def missing_segments(self, session_id: str, manifest: Dict[str, int], limit: int) -> Dict[str, List[int]]:
+        """The first `limit` sequence numbers below each manifest count that have not been received"""
+        with connection(self.db_path) as conn:
+            missing = {}
+            for kind in SEGMENT_KINDS:
+                count = manifest.get(kind, 0)
+                gaps, expected = [], 0
+                for (seq,) in conn.execute(
+                    'SELECT seq FROM transcript_segments WHERE session_id = ? AND kind = ? AND seq < ? ORDER BY seq',
+                    (session_id, kind, count)
+                ):
+                    gaps.extend(range(expected, seq)[:limit - len(gaps)])
+                    if len(gaps) >= limit:
+                        break
+                    expected = seq + 1
+                else:
+                    gaps.extend(range(expected, count)[:limit - len(gaps)])
+                if gaps:
+                    missing[kind] = gaps
+            return missing
+
+    def session_meeting(self, session_id: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+        """The meeting a session was finalized for, or None"""
+        with nullcontext(conn) if conn else connection(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT meeting_id FROM transcript_sessions WHERE session_id = ?',
+                (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def finalize(self, session_id: str, meeting_id: str, manifest: Dict[str, int], conn: Optional[sqlite3.Connection] = None):
+        """
+        Record the manifest tying a session's segments to a saved meeting.
+        A session is never moved to another meeting; finalizing it again for
+        the same one only refreshes the counts. Pass `conn` to write inside
+        the caller's transaction.
+        """
+        with nullcontext(conn) if conn else connection(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO transcript_sessions
+                (session_id, meeting_id, transcript_count, chat_count, finalized_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    transcript_count = excluded.transcript_count,
+                    chat_count = excluded.chat_count,
+                    finalized_at = excluded.finalized_at
+                WHERE meeting_id = excluded.meeting_id
+            ''', (session_id, meeting_id, manifest.get('transcript', 0), manifest.get('chat', 0), int(time.time())))
+
+    def get_segments(self, session_id: str, kind: str) -> List[Dict[str, Any]]:
+        """All segments of one kind for a session, in sequence order"""
+        with connection(self.db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT {SEGMENT_COLUMNS}
+                FROM transcript_segments
+                WHERE session_id = ? AND kind = ?
+                ORDER BY seq
+            ''', (session_id, kind)).fetchall()
+
+        return [_segment(row) for row in rows]
+
+    def get_segments_page(self, session_id: str, kind: str, after_seq: int = -1, limit: int = 100) -> List[Dict[str, Any]]:
+        """Up to `limit` segments with seq greater than `after_seq`"""
+        with connection(self.db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT {SEGMENT_COLUMNS}
+                FROM transcript_segments
+                WHERE session_id = ? AND kind = ? AND seq > ?
+                ORDER BY seq
+                LIMIT ?
+            ''', (session_id, kind, after_seq, limit)).fetchall()
+
+        return [_segment(row) for row in rows]
+
+    def get_segments_in_range(
+        self,
+        session_id: str,
+        kind: str,
+        start_ms: int,
+        end_ms: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Segments from the one in progress at `start_ms` up to `end_ms`, in
+        time order. Both bounds are index seeks, so the cost depends on the
+        window size rather than the position in the meeting.
+        """
+        with connection(self.db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT {SEGMENT_COLUMNS}
+                FROM transcript_segments
+                WHERE session_id = ? AND kind = ?
+                  AND start_ms >= COALESCE((
+                      SELECT MAX(start_ms) FROM transcript_segments
+                      WHERE session_id = ? AND kind = ? AND start_ms <= ?
+                  ), ?)
+                  AND start_ms < ?
+                ORDER BY start_ms, seq
+                LIMIT ?
+            ''', (
+                session_id, kind,
+                session_id, kind, start_ms,
+                start_ms,
+                end_ms if end_ms is not None else 2 ** 62,
+                limit
+            )).fetchall()
+
+        return [_segment(row) for row in rows]
+
+    def get_session(self, meeting_id: str):
+        """The finalized session manifest for a meeting, or None"""
+        with connection(self.db_path) as conn:
+            row = conn.execute(
+                '''
+                SELECT session_id, transcript_count, chat_count, finalized_at
+                FROM transcript_sessions WHERE meeting_id = ?
+                ORDER BY finalized_at DESC LIMIT 1
+                ''',
+                (meeting_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'session_id': row[0],
+            'transcript_count': row[1],
+            'chat_count': row[2],
+            'finalized_at': row[3]
+        }
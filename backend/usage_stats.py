@@ -0,0 +1,69 @@
+from typing import Any, Dict, Optional
+
+from db import connection
+
+# Transcription statuses still waiting on Whisper
+BACKLOG_STATUSES = ('pending',)
+
+
+def _day_range(since: Optional[str], until: Optional[str]):
+    conditions, params = [], []
+    if since:
+        conditions.append('day >= ?')
+        params.append(since)
+    if until:
+        conditions.append('day < ?')
+        params.append(until)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+
+def read_stats(
+    meetings_db: str = 'meetings.db',
+    recordings_db: str = 'database/recordings.db',
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Per-day and total usage for days in [since, until) (YYYY-MM-DD), read
+    from the rollup tables the migrations keep current. Costs one index
+    range per table, proportional to the number of days.
+    """
+    where, params = _day_range(since, until)
+    days = {}
+
+    def day(name):
+        return days.setdefault(name, {
+            'day': name,
+            'meetings': 0,
+            'recordings': {},
+            'recorded_minutes': 0.0,
+            'transcriptions': {}
+        })
+
+    with connection(meetings_db) as conn:
+        for name, meetings in conn.execute(f'SELECT day, meetings FROM meeting_daily_stats {where}', params):
+            day(name)['meetings'] = meetings
+
+    with connection(recordings_db) as conn:
+        for name, kind, status, count in conn.execute(
+            f'SELECT day, kind, status, count FROM recording_daily_stats {where}', params
+        ):
+            if count:
+                day(name)['recordings' if kind == 'recording' else 'transcriptions'][status] = count
+        for name, seconds in conn.execute(f'SELECT day, seconds FROM recording_daily_seconds {where}', params):
+            day(name)['recorded_minutes'] = round(seconds / 60, 1)
+
+    totals = {'meetings': 0, 'recordings': {}, 'recorded_minutes': 0.0, 'transcriptions': {}}
+    for entry in days.values():
+        totals['meetings'] += entry['meetings']
+        totals['recorded_minutes'] += entry['recorded_minutes']
+        for field in ('recordings', 'transcriptions'):
+            for status, count in entry[field].items():
+                totals[field][status] = totals[field].get(status, 0) + count
+    totals['recorded_minutes'] = round(totals['recorded_minutes'], 1)
+    totals['transcription_backlog'] = sum(totals['transcriptions'].get(s, 0) for s in BACKLOG_STATUSES)
+
+    return {
+        'days': [days[name] for name in sorted(days)],
+        'totals': totals
+    }
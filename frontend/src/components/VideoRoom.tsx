@@ -172,6 +172,17 @@ interface TranscriptItem {
 
 interface ChatItem extends TranscriptItem {}
 
+type SegmentKind = 'transcript' | 'chat';
+
+interface Segment extends TranscriptItem {
+  kind: SegmentKind;
+  seq: number;
+}
+
+// Transcript and chat lines are uploaded as they happen, so a closed tab loses at most a few seconds
+const SEGMENT_FLUSH_INTERVAL_MS = 5000;
+const SEGMENT_BATCH_SIZE = 50;
+
 const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
   const videoContainerRef = useRef<HTMLDivElement>(null);
   const [isRecording, setIsRecording] = useState(false);
@@ -181,6 +192,49 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
   const [chatInput, setChatInput] = useState('');
   const [participants, setParticipants] = useState<any[]>([]);
   const callRef = useRef<DailyCall | null>(null);
+  const sessionIdRef = useRef(`${Date.now()}-${Math.random().toString(36).slice(2, 10)}`);
+  const seqRef = useRef<Record<SegmentKind, number>>({ transcript: 0, chat: 0 });
+  const pendingSegmentsRef = useRef<Segment[]>([]);
+  const flushingRef = useRef(false);
+
+  const queueSegment = (kind: SegmentKind, item: TranscriptItem) => {
+    pendingSegmentsRef.current.push({ ...item, kind, seq: seqRef.current[kind]++ });
+  };
+
+  const uploadSegments = async (segments: Segment[]) => {
+    const response = await fetch(`/api/transcripts/${sessionIdRef.current}/segments`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ segments }),
+    });
+    if (!response.ok) {
+      throw new Error(`Segment upload failed with status ${response.status}`);
+    }
+  };
+
+  const flushSegments = async () => {
+    if (flushingRef.current) return;
+    flushingRef.current = true;
+    try {
+      while (pendingSegmentsRef.current.length > 0) {
+        const batch = pendingSegmentsRef.current.slice(0, SEGMENT_BATCH_SIZE);
+        await uploadSegments(batch);
+        pendingSegmentsRef.current = pendingSegmentsRef.current.slice(batch.length);
+      }
+    } catch (error) {
+      // Unsent segments stay queued for the next flush
+      console.error('Error uploading transcript segments:', error);
+    } finally {
+      flushingRef.current = false;
+    }
+  };
+
+  useEffect(() => {
+    const timer = setInterval(flushSegments, SEGMENT_FLUSH_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, []);
 
   useEffect(() => {
     if (!videoContainerRef.current) return;
@@ -200,12 +254,14 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
     callRef.current.on('transcription-message', (event: any) => {
       const { participant, text } = event;
       const timestamp = new Date().toLocaleTimeString();
-      
-      setTranscript(prev => [...prev, {
+      const item = {
         speaker: participant.user_name || 'Unknown',
         text,
         timestamp,
-      }]);
+      };
+      
+      queueSegment('transcript', item);
+      setTranscript(prev => [...prev, item]);
     });
 
     // Handle participant updates
@@ -223,15 +279,18 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
       setNotification('Recording stopped');
 
       try {
+        await flushSegments();
+
+        // Segments are already on the server, so only a manifest of counts is sent
         const recordingData = {
+          sessionId: sessionIdRef.current,
+          manifest: { ...seqRef.current },
           participants: participants.map(p => p.user_name || 'Unknown'),
-          transcript,
-          chatMessages,
           recordingUrl: event.recordingUrl,
           endTime: new Date().toISOString()
         };
 
-        const response = await fetch('/api/save-recording-metadata', {
+        const saveMetadata = () => fetch('/api/save-recording-metadata', {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
@@ -239,7 +298,24 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
           body: JSON.stringify(recordingData),
         });
 
-        const data = await response.json();
+        let response = await saveMetadata();
+        let data = await response.json();
+
+        if (response.status === 409 && data.missing) {
+          // Resend anything the server never received, then save again
+          const items: Record<SegmentKind, TranscriptItem[]> = { transcript, chat: chatMessages };
+          const missing: Segment[] = [];
+          (Object.keys(data.missing) as SegmentKind[]).forEach(kind => {
+            data.missing[kind].forEach((seq: number) => {
+              if (items[kind][seq]) missing.push({ ...items[kind][seq], kind, seq });
+            });
+          });
+          for (let i = 0; i < missing.length; i += SEGMENT_BATCH_SIZE) {
+            await uploadSegments(missing.slice(i, i + SEGMENT_BATCH_SIZE));
+          }
+          response = await saveMetadata();
+          data = await response.json();
+        }
         
         if (response.ok) {
           setNotification('Recording saved successfully');
@@ -284,6 +360,7 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
       timestamp: new Date().toLocaleTimeString(),
     };
 
+    queueSegment('chat', newMessage);
     setChatMessages(prev => [...prev, newMessage]);
     setChatInput('');
 
@@ -297,6 +374,7 @@ const VideoRoom: React.FC<VideoRoomProps> = ({ url, onRecordingSaved }) => {
 
     const handleAppMessage = (event: any) => {
       if (event.data.type === 'chat') {
+        queueSegment('chat', event.data.message);
         setChatMessages(prev => [...prev, event.data.message]);
       }
     };